@@ -10,6 +10,7 @@ from h.models import Annotation, Group
 from h.search import (
     AuthorityFilter,
     Search,
+    SearchBatch,
     TagsAggregation,
     TopLevelAnnotationsFilter,
     UsersAggregation,
@@ -18,7 +19,12 @@ from h.search import (
 
 
 class ActivityResults(
-    namedtuple("ActivityResults", ["total", "aggregations", "timeframes"])
+    namedtuple(
+        "ActivityResults",
+        ["total", "aggregations", "timeframes", "extra_results"],
+        # The results of any `extra_searches` passed to `execute()`
+        defaults=((),),
+    )
 ):
     pass
 
@@ -101,13 +107,23 @@ def check_url(request, query, unparse=parser.unparse):
 
 
 @newrelic.agent.function_trace()
-def execute(request, query, page_size):
-    search_result = _execute_search(request, query, page_size)
+def execute(request, query, page_size, extra_searches=()):
+    """
+    Run the activity page search for `query`.
+
+    :param extra_searches: `(Search, params)` tuples to run in the same
+        Elasticsearch request as the main search. Their results are returned
+        in `extra_results`, in the same order.
+    """
+    search_result, *extra_results = _execute_search(
+        request, query, page_size, extra_searches
+    )
 
     result = ActivityResults(
         total=search_result.total,
         aggregations=search_result.aggregations,
         timeframes=[],
+        extra_results=tuple(extra_results),
     )
 
     if not result.total:
@@ -167,7 +183,7 @@ def fetch_annotations(session, ids):
 
 
 @newrelic.agent.function_trace()
-def _execute_search(request, query, page_size):
+def _execute_search(request, query, page_size, extra_searches):
     # Wildcards and exact url matches are specified in the url facet so set
     # separate_wildcard_uri_keys to False.
     search = Search(request, separate_wildcard_uri_keys=False)
@@ -190,8 +206,12 @@ def _execute_search(request, query, page_size):
     query["limit"] = page_size
     query["offset"] = (page - 1) * page_size
 
-    search_result = search.run(query)
-    return search_result
+    batch = SearchBatch(request)
+    batch.add(search, query)
+    for extra_search, params in extra_searches:
+        batch.add(extra_search, params)
+
+    return batch.run()
 
 
 @newrelic.agent.function_trace()
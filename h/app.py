@@ -78,6 +78,7 @@ def includeme(config):
 
     # Core site modules
     config.include("h.assets")
+    config.include("h.cache")
     config.include("h.db")
     config.include("h.eventqueue")
     config.include("h.form")
@@ -0,0 +1,235 @@
+"""
+Process-local caches which can be invalidated across processes.
+
+Each process keeps its own copy of the data in a bounded :py:class:`TTLCache`,
+so the common case never has to leave the process. When the underlying data
+changes, the keys are invalidated in the current process and a message is
+broadcast to every other process over the realtime exchange, so they can drop
+their copies too. The TTL bounds how stale an entry can get if a broadcast is
+missed.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import newrelic.agent
+from h_pyramid_sentry import report_exception
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from h import realtime
+from h.exceptions import RealtimeMessageQueueError
+
+#: Routing key for broadcast cache invalidation messages
+ROUTING_KEY = "cache"
+
+#: All of the caches in this process, by name
+CACHES = {}
+
+# Connection used to broadcast invalidations, and the settings used to listen
+# for them. These are set up by `includeme()` and left as `None` outside of a
+# configured app (e.g. in scripts and tests).
+_connection = None
+_settings = None
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class TTLCache:
+    """
+    A bounded, thread-safe LRU cache whose entries expire after a time.
+
+    :param name: The name to register this cache under in `CACHES`. The name
+        is used to address the cache in invalidation messages and metrics.
+    :param maxsize: The maximum number of entries to keep
+    :param ttl: How long an entry stays valid for, in seconds
+    """
+
+    MISSING = object()
+    """Returned by `get()` when there's no valid entry for a key."""
+
+    def __init__(self, name, maxsize, ttl):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        CACHES[name] = self
+
+    def get(self, key):
+        """Return the value for `key`, or `TTLCache.MISSING`."""
+        _start_listener()
+
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return self.MISSING
+
+            if expires < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return self.MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store `value` for `key`, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        """Remove `keys` from the cache in this process only."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry from the cache in this process only."""
+        with self._lock:
+            self._entries.clear()
+
+    def pop_metrics(self):
+        """Return and reset the hit and miss counts since the last call."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            self.hits = self.misses = 0
+
+        return {"Hits": hits, "Misses": misses, "Size": len(self._entries)}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def invalidate(name, keys=None):
+    """
+    Invalidate `keys` of the named cache in every process.
+
+    :param name: The name of the cache
+    :param keys: The keys to invalidate, or `None` to clear the whole cache.
+        Keys must be strings, so they can be sent to other processes.
+    """
+    keys = None if keys is None else list(keys)
+    handle_invalidation({"cache": name, "keys": keys})
+
+    if _connection is None:
+        return
+
+    try:
+        realtime.publish(_connection, ROUTING_KEY, {"cache": name, "keys": keys})
+    except RealtimeMessageQueueError as err:
+        # Other processes will catch up when their entries expire
+        report_exception(err)
+
+
+def invalidate_after_commit(session, name, keys=None):
+    """
+    Invalidate `keys` of the named cache once `session` commits.
+
+    If the transaction is rolled back, the keys are only invalidated in this
+    process. See `invalidate()` for the arguments.
+    """
+    pending = session.info.setdefault("h.cache.pending", {})
+
+    if keys is None or pending.get(name, ()) is None:
+        pending[name] = None
+    else:
+        pending.setdefault(name, set()).update(keys)
+
+
+def handle_invalidation(payload):
+    """Apply an invalidation message from this or another process."""
+    cache = CACHES.get(payload["cache"])
+    if cache is None:
+        return
+
+    if payload["keys"] is None:
+        cache.clear()
+    else:
+        cache.invalidate(payload["keys"])
+
+
+@newrelic.agent.data_source_generator(name="Cache metrics")
+def cache_metrics():
+    """Report the hit, miss and size metrics of each cache to New Relic."""
+    for cache in list(CACHES.values()):
+        for metric, value in cache.pop_metrics().items():
+            yield f"Custom/Cache/{cache.name}/{metric}", value
+
+
+def _after_commit(session):
+    pending = session.info.pop("h.cache.pending", None)
+    if not pending:
+        return
+
+    for name, keys in pending.items():
+        invalidate(name, keys)
+
+
+def _after_rollback(session):
+    # The transaction may have filled caches in this process with data it
+    # wrote, so drop them here. Other processes never saw it.
+    pending = session.info.pop("h.cache.pending", None)
+    if not pending:
+        return
+
+    for name, keys in pending.items():
+        handle_invalidation({"cache": name, "keys": keys})
+
+
+def _listen(settings):
+    """Apply invalidations broadcast by other processes, forever."""
+    consumer = realtime.Consumer(
+        connection=realtime.get_connection(settings),
+        routing_key=ROUTING_KEY,
+        handler=handle_invalidation,
+    )
+    consumer.run()
+
+
+def _start_listener():
+    # The thread is started by the first lookup rather than when the app is
+    # created, so that it runs in each worker process rather than the one
+    # which created the app and forked them. Threads don't survive a fork, so
+    # a child process sees the parent's listener as dead and starts its own.
+    # pylint: disable=global-statement
+    global _listener
+
+    if _settings is None or (_listener is not None and _listener.is_alive()):
+        return
+
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = threading.Thread(
+                target=_listen,
+                args=(_settings,),
+                name="cache-invalidation",
+                daemon=True,
+            )
+            _listener.start()
+
+
+def includeme(config):  # pragma: no cover
+    # pylint: disable=global-statement
+    global _connection, _settings
+    _connection = realtime.get_connection(config.registry.settings, fail_fast=True)
+    _settings = config.registry.settings
+
+    newrelic.agent.register_data_source(cache_metrics)
+
+
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
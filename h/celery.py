@@ -34,6 +34,7 @@ celery.conf.update(
     task_acks_late=True,
     task_ignore_result=True,
     imports=(
+        "h.tasks.auth",
         "h.tasks.cleanup",
         "h.tasks.indexer",
         "h.tasks.mailer",
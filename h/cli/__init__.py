@@ -12,6 +12,7 @@ log = logging.getLogger("h")
 SUBCOMMANDS = (
     "h.cli.commands.annotation_id.annotation_id",
     "h.cli.commands.authclient.authclient",
+    "h.cli.commands.badge.badge",
     "h.cli.commands.celery.celery",
     "h.cli.commands.devdata.devdata",
     "h.cli.commands.init.init",
@@ -0,0 +1,33 @@
+import click
+
+
+@click.group()
+def badge():
+    """Manage the browser extension badge."""
+
+
+@badge.command("build-uri-filter")
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+@click.option(
+    "--error-rate",
+    type=float,
+    default=0.01,
+    show_default=True,
+    help="The false positive rate to size the filter for",
+)
+@click.pass_context
+def build_uri_filter(ctx, path, error_rate):
+    """
+    Snapshot every annotated URI into a bloom filter at PATH.
+
+    Web workers load the filter from the path in the BADGE_URI_FILTER_PATH
+    environment variable, and reload it when it changes. Run this periodically
+    to keep the filter compact and its false positive rate low.
+    """
+    request = ctx.obj["bootstrap"]()
+
+    count = request.find_service(name="annotated_uri").build_filter(
+        path, error_rate=error_rate
+    )
+
+    click.echo(f"Saved a filter of {count} URIs to {path}")
@@ -12,14 +12,31 @@ def search():
 
 
 @search.command()
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="The number of processes to index with",
+)
+@click.option(
+    "--shards",
+    type=click.IntRange(min=1),
+    help="The number of shards to split the annotations into (defaults to --workers)",
+)
+@click.option("--resume", is_flag=True, help="Continue a reindex which didn't finish")
 @click.pass_context
-def reindex(ctx):
+def reindex(ctx, workers, shards, resume):
     """
     Reindex all annotations.
 
     Creates a new search index from the data in PostgreSQL and atomically
     updates the index alias. This requires that the index is aliased already,
     and will raise an error if it is not.
+
+    The annotations are split into shards by when they were last updated and
+    indexed by a pool of worker processes. Progress is checkpointed as it
+    goes, so a reindex which fails can be continued with --resume.
     """
     os.environ["ELASTICSEARCH_CLIENT_TIMEOUT"] = "30"
 
@@ -29,7 +46,15 @@ def reindex(ctx):
 
     click.echo(f"reindexing into Elasticsearch {es_client.server_version} cluster")
 
-    indexer.reindex(request.db, es_client, request)
+    indexer.reindex(
+        request.db,
+        es_client,
+        request,
+        workers=workers,
+        shards=shards,
+        resume=resume,
+        bootstrap=ctx.obj["bootstrap"],
+    )
 
 
 @search.command("update-settings")
@@ -81,6 +81,10 @@ def configure(environ=None, settings=None):  # pylint: disable=too-many-statemen
     settings_manager.set("h.authority", "AUTHORITY")
     settings_manager.set("h.bouncer_url", "BOUNCER_URL")
 
+    # A snapshot made by `hypothesis badge build-uri-filter`, used to skip the
+    # DB for badge requests for URIs which have never been annotated.
+    settings_manager.set("h.badge.uri_filter_path", "BADGE_URI_FILTER_PATH")
+
     settings_manager.set("h.client_url", "CLIENT_URL")
 
     # ID for the OAuth authclient that the embedded client should use when
@@ -119,6 +123,22 @@ def configure(environ=None, settings=None):  # pylint: disable=too-many-statemen
     )
 
     settings_manager.set("h.websocket_url", "WEBSOCKET_URL")
+    # Batching of annotation messages in the websocket server
+    settings_manager.set(
+        "h.streamer.batch_size", "STREAMER_BATCH_SIZE", type_=int, default=1
+    )
+    settings_manager.set(
+        "h.streamer.batch_timeout_ms", "STREAMER_BATCH_TIMEOUT_MS", type_=int
+    )
+
+    # Filter searches by the `readable_by_world` flag indexed with each
+    # annotation, instead of by a list of every world readable group. Only
+    # enable this once every annotation has been reindexed with the flag.
+    settings_manager.set(
+        "h.search.filter_readable_by_world",
+        "SEARCH_FILTER_READABLE_BY_WORLD",
+        type_=asbool,
+    )
 
     # Reporting settings
     settings_manager.set("h.report.fdw_users", "REPORT_FDW_USERS", type_=aslist)
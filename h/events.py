@@ -5,3 +5,11 @@ class AnnotationEvent:
         self.request = request
         self.annotation_id = annotation_id
         self.action = action
+
+
+class AnnotationsDeletedEvent:
+    """An event representing the deletion of many annotations at once."""
+
+    def __init__(self, request, annotation_ids):
+        self.request = request
+        self.annotation_ids = annotation_ids
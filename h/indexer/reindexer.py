@@ -1,55 +1,360 @@
+import json
 import logging
+import math
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 
+import sqlalchemy as sa
+
+from h import models
 from h.search.config import (
     configure_index,
     delete_index,
     get_aliased_index,
     update_aliased_index,
 )
-from h.search.index import BatchIndexer
+from h.search.index import PG_WINDOW_SIZE, BatchIndexer
+from h.util.query import column_boundaries
 
 log = logging.getLogger(__name__)
 
+#: The setting naming the index being reindexed into. While it's set, new
+#: writes are indexed into that index as well as the current one.
+NEW_INDEX_SETTING = "reindex.new_index"
+
+#: The setting recording the progress of a reindex, so it can be resumed
+CHECKPOINT_SETTING = "reindex.checkpoint"
+
+# The request and progress queue of a worker process, set by `_init_worker()`
+_worker_request = None
+_worker_progress = None
+
+
+def reindex(  # pylint:disable=too-many-arguments
+    session, es, request, workers=1, shards=None, resume=False, bootstrap=None
+):
+    """
+    Reindex all annotations into a new index, and update the alias.
 
-def reindex(session, es, request):
-    """Reindex all annotations into a new index, and update the alias."""
+    The annotations are split into shards by their `updated` times, which are
+    indexed by a pool of worker processes. The progress of each shard is
+    checkpointed after every window of annotations, so a reindex which fails
+    part-way can be continued with `resume=True`.
+
+    :param workers: The number of worker processes. If this is 1, the shards
+        are indexed in this process.
+    :param shards: The number of shards to split the annotations into
+        (defaults to the number of workers)
+    :param resume: Whether to continue the last reindex rather than start a
+        new one
+    :param bootstrap: A picklable function which returns a new request. Each
+        worker process calls it once to get its own DB session and
+        Elasticsearch client. Required if `workers` is more than 1.
+    """
 
     current_index = get_aliased_index(es)
     if current_index is None:
         raise RuntimeError("cannot reindex if current index is not aliased")
 
+    if workers > 1 and bootstrap is None:
+        raise ValueError("bootstrap is required to reindex with multiple workers")
+
     settings = request.find_service(name="settings")
 
     # Preload userids of shadowbanned users.
     nipsa_svc = request.find_service(name="nipsa")
     nipsa_svc.fetch_all_flagged_userids()
 
-    new_index = configure_index(es)
-    log.info("configured new index %s", new_index)
-    setting_name = "reindex.new_index"
+    checkpoint = _load_checkpoint(settings)
+    if resume:
+        if checkpoint is None:
+            raise RuntimeError("there is no reindex to resume")
+
+        if checkpoint["new_index"] == current_index:
+            # The alias was swapped but the checkpoint wasn't cleared, so
+            # there's nothing left to do. Carrying on would delete the index
+            # we have just made current.
+            log.info("reindex into index %s already finished", current_index)
+            settings.delete(CHECKPOINT_SETTING)
+            request.tm.commit()
+            return
+
+        log.info("resuming reindex into index %s", checkpoint["new_index"])
+    else:
+        if checkpoint and checkpoint["new_index"] != current_index:
+            log.warning(
+                "removing index %s from an unfinished reindex", checkpoint["new_index"]
+            )
+            delete_index(es, checkpoint["new_index"])
+
+        new_index = configure_index(es)
+        log.info("configured new index %s", new_index)
+        checkpoint = _new_checkpoint(session, new_index, shards or workers)
+
+    new_index = checkpoint["new_index"]
 
     try:  # pylint:disable=too-many-try-statements
-        settings.put(setting_name, new_index)
+        settings.put(NEW_INDEX_SETTING, new_index)
+        _save_checkpoint(settings, checkpoint)
         request.tm.commit()
 
-        log.info("reindexing annotations into new index %s", new_index)
+        log.info(
+            "reindexing annotations into new index %s with %d workers",
+            new_index,
+            workers,
+        )
+        progress = _Progress(settings, request.tm, checkpoint)
+        _index_shards(request, checkpoint, workers, bootstrap, progress)
+
         indexer = BatchIndexer(
             session, es, request, target_index=new_index, op_type="create"
         )
 
-        errored = indexer.index()
+        errored = checkpoint["errored"]
         if errored:
             log.debug("failed to index %d annotations, retrying...", len(errored))
             errored = indexer.index(errored)
             if errored:
                 log.warning("failed to index %d annotations: %r", len(errored), errored)
 
+        if resume:
+            _catch_up(session, es, request, new_index, since=checkpoint["started"])
+
         log.info("making new index %s current", new_index)
         update_aliased_index(es, new_index)
 
+        # Forget the reindex before deleting anything, so it can't be resumed
+        # into what is now the current index
+        settings.delete(CHECKPOINT_SETTING)
+        request.tm.commit()
+
         log.info("removing previous index %s", current_index)
         delete_index(es, current_index)
 
     finally:
-        settings.delete(setting_name)
+        settings.delete(NEW_INDEX_SETTING)
         request.tm.commit()
+
+
+def _index_shards(request, checkpoint, workers, bootstrap, progress):
+    shards = [
+        (number, shard, checkpoint["new_index"])
+        for number, shard in enumerate(checkpoint["shards"])
+        if not shard["done"]
+    ]
+
+    if workers == 1:
+        for args in shards:
+            _index_shard(request, *args, report=progress.record)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    progress_queue = context.Queue()
+
+    # Unlike `multiprocessing.Pool`, the executor fails every outstanding
+    # shard with `BrokenProcessPool` if a worker dies without raising (e.g.
+    # when it's killed), rather than leaving us waiting for it forever
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(bootstrap, progress_queue),
+    ) as executor:
+        futures = [executor.submit(_index_shard_in_worker, *args) for args in shards]
+
+        while True:
+            try:
+                message = progress_queue.get(timeout=1)
+            except queue.Empty:
+                if all(future.done() for future in futures):
+                    break
+                continue
+
+            progress.record(*message)
+
+        # Re-raise any error from the workers
+        for future in futures:
+            future.result()
+
+
+def _init_worker(bootstrap, progress_queue):
+    global _worker_request, _worker_progress  # pylint:disable=global-statement
+
+    _worker_request = bootstrap()
+    _worker_progress = progress_queue
+
+
+def _index_shard_in_worker(number, shard, new_index):
+    def report(*message):
+        _worker_progress.put(message)
+
+    _index_shard(_worker_request, number, shard, new_index, report=report)
+
+
+def _index_shard(request, number, shard, new_index, report):
+    """
+    Index the annotations in a shard a window at a time.
+
+    `report` is called after each window with the shard's number, the start
+    of what's left of it, how many annotations were indexed, the errored
+    annotation ids, whether the shard is done and the worker's process id.
+    """
+    session = request.db
+    indexer = BatchIndexer(
+        session, request.es, request, target_index=new_index, op_type="create"
+    )
+    end = _parse_datetime(shard["end"])
+
+    starts = column_boundaries(
+        session,
+        models.Annotation.updated,
+        PG_WINDOW_SIZE,
+        where=_annotations_between(_parse_datetime(shard["start"]), end),
+    )
+    if not starts:
+        report(number, shard["end"], 0, [], True, os.getpid())
+        return
+
+    # The first window also covers anything before the first annotation,
+    # in case an annotation has been updated into the shard
+    starts[0] = _parse_datetime(shard["start"])
+
+    for i, start in enumerate(starts):
+        window_end = starts[i + 1] if i + 1 < len(starts) else end
+        where = _annotations_between(start, window_end)
+
+        errored = indexer.index(where=where)
+
+        report(
+            number,
+            _format_datetime(window_end),
+            indexer.indexed,
+            list(errored),
+            window_end == end,
+            os.getpid(),
+        )
+
+
+class _Progress:
+    """Checkpoints and logs the progress reported by workers."""
+
+    def __init__(self, settings, tm, checkpoint):
+        self._settings = settings
+        self._tm = tm
+        self._checkpoint = checkpoint
+        self._last_report = {}
+
+    def record(  # pylint:disable=too-many-arguments
+        self, number, start, count, errored, done, worker
+    ):
+        shard = self._checkpoint["shards"][number]
+        shard["start"] = start
+        shard["done"] = done
+        self._checkpoint["errored"].extend(errored)
+
+        _save_checkpoint(self._settings, self._checkpoint)
+        self._tm.commit()
+
+        now = time.monotonic()
+        then = self._last_report.get(worker, now)
+        self._last_report[worker] = now
+
+        shards_done = sum(shard["done"] for shard in self._checkpoint["shards"])
+        log.info(
+            "worker %s indexed %d annotations in shard %d, rate=%s/s, %d/%d shards done",
+            worker,
+            count,
+            number,
+            round(count / (now - then)) if now > then else "-",
+            shards_done,
+            len(self._checkpoint["shards"]),
+        )
+
+
+def _new_checkpoint(session, new_index, shard_count):
+    """Return a new checkpoint, splitting the annotations into shards."""
+    started = datetime.utcnow()
+
+    total = session.query(models.Annotation).filter(_annotation_filter()).count()
+    starts = column_boundaries(
+        session,
+        models.Annotation.updated,
+        max(math.ceil(total / shard_count), 1),
+        where=_annotation_filter(),
+    )
+
+    # The first and last shards are open-ended, so no annotations are missed
+    starts = [None] + starts[1:]
+    ends = starts[1:] + [None]
+
+    return {
+        "new_index": new_index,
+        "started": _format_datetime(started),
+        "shards": [
+            {
+                "start": _format_datetime(start),
+                "end": _format_datetime(end),
+                "done": False,
+            }
+            for start, end in zip(starts, ends)
+        ],
+        "errored": [],
+    }
+
+
+def _load_checkpoint(settings):
+    checkpoint = settings.get(CHECKPOINT_SETTING)
+    return json.loads(checkpoint) if checkpoint else None
+
+
+def _save_checkpoint(settings, checkpoint):
+    settings.put(CHECKPOINT_SETTING, json.dumps(checkpoint))
+
+
+def _catch_up(session, es, request, new_index, since):
+    """
+    Index the changes to annotations since a reindex started.
+
+    Writes aren't indexed into the new index while a reindex isn't running,
+    so this catches up with anything that changed before it was resumed.
+    """
+    since = _parse_datetime(since)
+    log.info("indexing annotations changed since %s", since)
+
+    updated_since = models.Annotation.updated >= since
+    indexer = BatchIndexer(session, es, request, target_index=new_index)
+    indexer.index(where=updated_since)
+    indexer.delete(
+        [
+            id_
+            for id_, in session.query(models.Annotation.id).filter(
+                updated_since, models.Annotation.deleted
+            )
+        ]
+    )
+
+
+def _annotation_filter():
+    return sa.not_(models.Annotation.deleted)
+
+
+def _annotations_between(start, end):
+    clauses = [_annotation_filter()]
+    if start is not None:
+        clauses.append(models.Annotation.updated >= start)
+    if end is not None:
+        clauses.append(models.Annotation.updated < end)
+
+    return sa.and_(*clauses)
+
+
+def _format_datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def _parse_datetime(value):
+    return datetime.fromisoformat(value) if value is not None else None
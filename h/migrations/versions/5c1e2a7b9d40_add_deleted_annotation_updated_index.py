@@ -0,0 +1,22 @@
+"""Add a partial index on annotation.updated for deleted annotations."""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "5c1e2a7b9d40"
+down_revision = "be612e693243"
+
+
+def upgrade():
+    op.execute("COMMIT")
+    op.create_index(
+        op.f("ix__annotation_deleted_updated"),
+        "annotation",
+        ["updated"],
+        unique=False,
+        postgresql_concurrently=True,
+        postgresql_where=sa.text("deleted is true"),
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix__annotation_deleted_updated"), table_name="annotation")
@@ -9,7 +9,7 @@ from h.models.annotation import Annotation
 from h.models.document._exceptions import ConcurrentUpdateError
 from h.models.document._meta import create_or_update_document_meta
 from h.models.document._uri import DocumentURI, create_or_update_document_uri
-from h.util.uri import normalize as uri_normalize
+from h.util.uri import normalize_many as uri_normalize_many
 
 log = logging.getLogger(__name__)
 
@@ -74,7 +74,7 @@ class Document(Base, mixins.Timestamps):
     @classmethod
     def find_by_uris(cls, session, uris):
         """Find documents by a list of uris."""
-        query_uris = [uri_normalize(u) for u in uris]
+        query_uris = uri_normalize_many(uris)
 
         matching_claims = (
             session.query(DocumentURI)
@@ -1,3 +1,4 @@
+from h import storage
 from h.presenters.document_searchindex import DocumentSearchIndexPresenter
 from h.util.datetime import utc_iso8601
 from h.util.user import split_user
@@ -11,6 +12,47 @@ class AnnotationSearchIndexPresenter:
         self.request = request
 
     def asdict(self):
+        parents_and_replies = [self.annotation.id] + self.annotation.thread_ids
+
+        ann_mod_svc = self.request.find_service(name="annotation_moderation")
+        nipsa_service = self.request.find_service(name="nipsa")
+
+        return self._asdict(
+            thread_ids=self.annotation.thread_ids,
+            hidden_ids=ann_mod_svc.all_hidden(parents_and_replies),
+            nipsa=nipsa_service.is_flagged(self.annotation.userid),
+        )
+
+    @classmethod
+    def asdicts(cls, annotations, request):
+        """
+        Present a list of annotations in a fixed number of queries.
+
+        The threads, moderation status and NIPSA status of all of the
+        annotations are looked up together, rather than one at a time as
+        `asdict()` does.
+        """
+        ids = [annotation.id for annotation in annotations]
+        thread_ids = storage.fetch_thread_ids(request.db, ids)
+
+        ann_mod_svc = request.find_service(name="annotation_moderation")
+        hidden_ids = ann_mod_svc.all_hidden(
+            ids + [id_ for replies in thread_ids.values() for id_ in replies]
+        )
+
+        nipsa_service = request.find_service(name="nipsa")
+        nipsa_userids = nipsa_service.fetch_all_flagged_userids()
+
+        return [
+            cls(annotation, request)._asdict(
+                thread_ids=thread_ids[annotation.id],
+                hidden_ids=hidden_ids,
+                nipsa=annotation.userid in nipsa_userids,
+            )
+            for annotation in annotations
+        ]
+
+    def _asdict(self, thread_ids, hidden_ids, nipsa):
         docpresenter = DocumentSearchIndexPresenter(self.annotation.document)
         userid_parts = split_user(self.annotation.userid)
 
@@ -28,10 +70,12 @@ class AnnotationSearchIndexPresenter:
             "tags": tags,
             "tags_raw": tags,
             "group": self.annotation.groupid,
+            "readable_by_world": self.annotation.group is not None
+            and self.annotation.group.is_public,
             "shared": self.annotation.shared,
             "target": self.annotation.target,
             "document": docpresenter.asdict(),
-            "thread_ids": self.annotation.thread_ids,
+            "thread_ids": thread_ids,
         }
 
         result["target"][0]["scope"] = [self.annotation.target_uri_normalized]
@@ -39,24 +83,13 @@ class AnnotationSearchIndexPresenter:
         if self.annotation.references:
             result["references"] = self.annotation.references
 
-        self._add_hidden(result)
-        self._add_nipsa(result, self.annotation.userid)
-
-        return result
-
-    def _add_hidden(self, result):
         # Mark an annotation as hidden if it and all of it's children have been
         # moderated and hidden.
-        parents_and_replies = [self.annotation.id] + self.annotation.thread_ids
-
-        ann_mod_svc = self.request.find_service(name="annotation_moderation")
-        is_hidden = len(ann_mod_svc.all_hidden(parents_and_replies)) == len(
-            parents_and_replies
+        result["hidden"] = all(
+            id_ in hidden_ids for id_ in [self.annotation.id] + thread_ids
         )
 
-        result["hidden"] = is_hidden
-
-    def _add_nipsa(self, result, user_id):
-        nipsa_service = self.request.find_service(name="nipsa")
-        if nipsa_service.is_flagged(user_id):
+        if nipsa:
             result["nipsa"] = True
+
+        return result
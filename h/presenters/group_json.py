@@ -1,5 +1,17 @@
+from itertools import chain
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from h import cache
+from h.cache import TTLCache
+from h.models import GroupScope, Organization
 from h.presenters.organization_json import OrganizationJSONPresenter
 
+# Cache of presented groups. Keys include the group's pubid and `updated`
+# timestamp, so changes to a group's own columns never hit a stale entry.
+GROUP_JSON_CACHE = TTLCache("group_json", maxsize=10000, ttl=3600)
+
 
 class GroupJSONPresenter:
     """Present a group in the JSON format returned by API requests."""
@@ -56,7 +68,44 @@ class GroupsJSONPresenter:
         self.request = request
 
     def asdicts(self, expand=None):
-        return [
-            GroupJSONPresenter(group, self.request).asdict(expand=expand)
-            for group in self.groups
-        ]
+        """
+        Return a list of dicts of the groups.
+
+        The dicts are cached across requests, so callers mustn't modify them.
+        """
+        expand = sorted(expand or [])
+        return [self._asdict(group, expand) for group in self.groups]
+
+    def _asdict(self, group, expand):
+        # A group with unflushed changes doesn't have an up-to-date `updated`
+        # timestamp to key it by
+        if group.updated is None or sa.inspect(group).modified:
+            return GroupJSONPresenter(group, self.request).asdict(expand=expand)
+
+        # Links and organization logos are URLs for the app's host
+        key = ":".join(
+            [
+                group.pubid,
+                group.updated.isoformat(),
+                self.request.application_url,
+                ",".join(expand),
+            ]
+        )
+
+        model = GROUP_JSON_CACHE.get(key)
+        if model is TTLCache.MISSING:
+            model = GroupJSONPresenter(group, self.request).asdict(expand=expand)
+            GROUP_JSON_CACHE.set(key, model)
+
+        return model
+
+
+@sa.event.listens_for(Session, "after_flush")
+def _invalidate_group_json(session, _flush_context):
+    """Clear the cached groups if a flush changed any scopes or organizations."""
+    # Changes to these don't touch the `updated` timestamp of their groups.
+    # They're rare, so it's simplest to clear everything.
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (GroupScope, Organization)):
+            cache.invalidate_after_commit(session, GROUP_JSON_CACHE.name)
+            return
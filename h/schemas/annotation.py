@@ -6,7 +6,7 @@ from dateutil.parser import parse
 from pyramid import i18n
 
 from h.schemas.base import JSONSchema, ValidationError
-from h.search.query import LIMIT_DEFAULT, LIMIT_MAX, OFFSET_MAX
+from h.search.query import LIMIT_DEFAULT, LIMIT_MAX, OFFSET_MAX, Sorter
 from h.search.util import wildcard_uri_is_valid
 from h.util import document_claims
 
@@ -326,6 +326,14 @@ class SearchParamsSchema(colander.Schema):
                     epoch. This is used for iteration through large collections
                     of results.""",
     )
+    cursor = colander.SchemaNode(
+        colander.String(),
+        missing=colander.drop,
+        description="""Returns the page of results after the one which returned
+                    this cursor. The sort field and order are taken from the
+                    cursor. Unlike offset, this is efficient however far through
+                    the results it is.""",
+    )
     limit = colander.SchemaNode(
         colander.Integer(),
         validator=colander.Range(min=0, max=LIMIT_MAX),
@@ -459,6 +467,13 @@ class SearchParamsSchema(colander.Schema):
             # offset must be set to 0 if search_after is specified.
             cstruct["offset"] = 0
 
+        if "cursor" in cstruct:
+            if not Sorter.decode_cursor(cstruct["cursor"]):
+                raise colander.Invalid(node, "cursor is not valid.")
+
+            # offset must be set to 0 if cursor is specified.
+            cstruct["offset"] = 0
+
     @staticmethod
     def _date_is_parsable(value):
         """Return True if date is parsable and False otherwise."""
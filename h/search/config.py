@@ -32,6 +32,7 @@ ANNOTATION_MAPPING = {
         "id": {"type": "keyword"},
         "nipsa": {"type": "boolean"},
         "quote": {"type": "text", "analyzer": "uni_normalizer"},
+        "readable_by_world": {"type": "boolean"},
         "references": {"type": "keyword"},
         "shared": {"type": "boolean"},
         "hidden": {"type": "boolean"},
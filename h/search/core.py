@@ -1,4 +1,3 @@
-import logging
 from collections import namedtuple
 
 import elasticsearch_dsl
@@ -7,10 +6,11 @@ from webob.multidict import MultiDict
 from h.search import query
 from h.util import metrics
 
-log = logging.getLogger(__name__)
-
 SearchResult = namedtuple(
-    "SearchResult", ["total", "annotation_ids", "reply_ids", "aggregations"]
+    "SearchResult",
+    ["total", "annotation_ids", "reply_ids", "aggregations", "cursor"],
+    # The cursor for the next page of results, if there might be one
+    defaults=(None,),
 )
 
 
@@ -72,11 +72,8 @@ class Search:
         :returns: The search results
         :rtype: SearchResult
         """
-        metrics.record_search_query_params(params, self.separate_replies)
-        total, annotation_ids, aggregations = self._search_annotations(params)
-        reply_ids = self._search_replies(annotation_ids)
-
-        return SearchResult(total, annotation_ids, reply_ids, aggregations)
+        search = self._prepare(params)
+        return self._result(search, search.execute())
 
     def clear(self):
         """Clear search modifiers, aggregators, and matchers."""
@@ -94,8 +91,8 @@ class Search:
         """Append an aggregation to the search query."""
         self._aggregations.append(aggregation)
 
-    def _search(self, modifiers, aggregations, params):
-        """Apply the modifiers, aggregations, and executes the search."""
+    def _build_search(self, modifiers, aggregations, params):
+        """Apply the modifiers and aggregations to a new search."""
         # Don't return any fields, just the metadata so set _source=False.
         search = elasticsearch_dsl.Search(
             using=self.es.conn, index=self.es.index
@@ -106,43 +103,55 @@ class Search:
         for qual in modifiers:
             search = qual(search, params)
 
-        return search.execute()
+        return search
+
+    def _prepare(self, params):
+        """Return the Elasticsearch search for the annotations matching `params`."""
+        metrics.record_search_query_params(params, self.separate_replies)
 
-    def _search_annotations(self, params):
         # If separate_replies is True, don't return any replies to annotations.
         modifiers = self._modifiers
         if self.separate_replies:
             modifiers = [query.TopLevelAnnotationsFilter()] + modifiers
 
-        response = self._search(modifiers, self._aggregations, params)
+        return self._build_search(modifiers, self._aggregations, params)
 
+    def _result(self, search, response):
+        """Return the `SearchResult` for the `response` to a `_prepare()` search."""
         total = self._get_total_hits(response)
         annotation_ids = [hit["_id"] for hit in response["hits"]["hits"]]
         aggregations = self._parse_aggregation_results(response.aggregations)
-        return (total, annotation_ids, aggregations)
+        cursor = query.Sorter.cursor(search, response)
+        reply_ids = self._search_replies(annotation_ids)
+
+        return SearchResult(total, annotation_ids, reply_ids, aggregations, cursor)
 
     def _search_replies(self, annotation_ids):
-        if not self.separate_replies:
+        if not self.separate_replies or not annotation_ids:
             return []
 
         # The only difference between a search for annotations and a search for
         # replies to annotations is the RepliesMatcher and the params passed to
-        # the modifiers.
-        response = self._search(
+        # the modifiers. The search is built once and then paged through with
+        # `search_after`, so we return every reply without re-applying the
+        # modifiers for each page.
+        search = self._build_search(
             [query.RepliesMatcher(annotation_ids)] + self._modifiers,
             [],  # Aggregations aren't used in replies.
             MultiDict({"limit": self._replies_limit}),
         )
 
-        if len(response["hits"]["hits"]) < self._get_total_hits(response):
-            log.warning(
-                "The number of reply annotations exceeded the page size "
-                "of the Elasticsearch query. We currently don't handle "
-                "this, our search API doesn't support pagination of the "
-                "reply set."
-            )
+        reply_ids = []
+        while True:
+            hits = search.execute()["hits"]["hits"]
+            reply_ids.extend(hit["_id"] for hit in hits)
 
-        return [hit["_id"] for hit in response["hits"]["hits"]]
+            if len(hits) < self._replies_limit:
+                return reply_ids
+
+            # The sort always ends with the id tiebreaker, so the last hit's
+            # sort values are a unique position to continue from.
+            search = search.extra(search_after=hits[-1]["sort"])
 
     def _parse_aggregation_results(self, aggregations):
         if not aggregations:
@@ -159,3 +168,58 @@ class Search:
         if isinstance(total, int):
             return total  # ES 6.x
         return total["value"]  # ES 7.x
+
+
+class SearchBatch:
+    """
+    Run several searches in a single Elasticsearch request.
+
+    Each search is prepared as usual and then all of them are sent to
+    Elasticsearch together with `_msearch`. Replies for searches with
+    `separate_replies` are still fetched afterwards, as they depend on the
+    results of the first query.
+
+    :param request: the request object
+    :type request: pyramid.request.Request
+    """
+
+    def __init__(self, request):
+        self._request = request
+        self._searches = []
+
+    def add(self, search, params):
+        """
+        Add a search to the batch.
+
+        :param search: The search to run
+        :type search: Search
+        :param params: The search parameters to run it with
+        :type params: webob.multidict.MultiDict
+        """
+        self._searches.append((search, params))
+
+    def run(self):
+        """
+        Execute all of the searches in the batch.
+
+        :returns: The results of each search, in the order they were added
+        :rtype: list of SearchResult
+        """
+        if len(self._searches) < 2:
+            # There's nothing to batch
+            return [search.run(params) for search, params in self._searches]
+
+        prepared = [
+            (search, search._prepare(params))  # pylint:disable=protected-access
+            for search, params in self._searches
+        ]
+
+        es = self._request.es
+        multi_search = elasticsearch_dsl.MultiSearch(using=es.conn, index=es.index)
+        for _, es_search in prepared:
+            multi_search = multi_search.add(es_search)
+
+        return [
+            search._result(es_search, response)  # pylint:disable=protected-access
+            for (search, es_search), response in zip(prepared, multi_search.execute())
+        ]
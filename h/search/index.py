@@ -2,6 +2,7 @@
 
 import logging
 import time
+from itertools import islice
 
 import sqlalchemy as sa
 from elasticsearch import helpers as es_helpers
@@ -19,6 +20,9 @@ PG_WINDOW_SIZE = 2500
 class BatchIndexer:
     """A convenience class for reindexing all annotations from the database to the search index."""
 
+    indexed = 0
+    """The number of annotations sent to the index by the last `index()` call."""
+
     def __init__(  # pylint: disable=too-many-arguments
         self, session, es_client, request, target_index=None, op_type="index"
     ):
@@ -33,7 +37,7 @@ class BatchIndexer:
         else:
             self._target_index = target_index
 
-    def index(self, annotation_ids=None, windowsize=PG_WINDOW_SIZE):
+    def index(self, annotation_ids=None, windowsize=PG_WINDOW_SIZE, where=None):
         """
         Reindex annotations.
 
@@ -41,12 +45,16 @@ class BatchIndexer:
         :type annotation_ids: collection
         :param windowsize: the number of annotations to index in between progress log statements
         :type windowsize: integer
+        :param where: an optional SQLAlchemy expression to limit which
+            annotations are reindexed when `annotation_ids` is `None`
 
         :returns: a set of errored ids
         :rtype: set
         """
         if annotation_ids is None:
-            annotations = _all_annotations(session=self.session, windowsize=windowsize)
+            annotations = _all_annotations(
+                session=self.session, windowsize=windowsize, where=where
+            )
         else:
             annotations = _filtered_annotations(
                 session=self.session, ids=annotation_ids
@@ -57,13 +65,15 @@ class BatchIndexer:
 
         indexing = es_helpers.streaming_bulk(
             self.es_client.conn,
-            annotations,
+            self._present(annotations, windowsize),
             chunk_size=2500,
             raise_on_error=False,
             expand_action_callback=self._prepare,
         )
+        self.indexed = 0
         errored = set()
         for ok, item in indexing:
+            self.indexed += 1
             if not ok:
                 status = item[self.op_type]
 
@@ -74,22 +84,64 @@ class BatchIndexer:
                 errored.add(status["_id"])
         return errored
 
-    def _prepare(self, annotation):
+    def delete(self, annotation_ids):
+        """
+        Mark annotations as deleted in the search index.
+
+        Like `SearchIndexService.delete_annotation_by_id()` this replaces each
+        annotation's document with one which only says it's deleted, but does
+        so for all of the annotations in bulk requests.
+
+        :param annotation_ids: the ids of the annotations to mark as deleted
+        :type annotation_ids: collection
+
+        :returns: a set of errored ids
+        :rtype: set
+        """
+        deleting = es_helpers.streaming_bulk(
+            self.es_client.conn,
+            annotation_ids,
+            chunk_size=2500,
+            raise_on_error=False,
+            expand_action_callback=self._prepare_deleted,
+        )
+
+        return {item["index"]["_id"] for ok, item in deleting if not ok}
+
+    def _present(self, annotations, windowsize):
+        """Yield `(annotation, data)` pairs, presenting a window at a time."""
+        annotations = iter(annotations)
+
+        while window := list(islice(annotations, windowsize)):
+            yield from zip(
+                window,
+                presenters.AnnotationSearchIndexPresenter.asdicts(window, self.request),
+            )
+
+    def _prepare(self, presented):
+        annotation, data = presented
+
+        return {self.op_type: self._operation(annotation.id)}, data
+
+    def _prepare_deleted(self, annotation_id):
+        return {"index": self._operation(annotation_id)}, {"deleted": True}
+
+    def _operation(self, annotation_id):
         operation = {
             "_index": self._target_index,
-            "_id": annotation.id,
+            "_id": annotation_id,
         }
         if self.es_client.server_version < Version("7.0.0"):
             operation["_type"] = self.es_client.mapping_type
 
-        data = presenters.AnnotationSearchIndexPresenter(
-            annotation, self.request
-        ).asdict()
+        return operation
 
-        return {self.op_type: operation}, data
 
+def _all_annotations(session, windowsize=2000, where=None):
+    filter_ = _annotation_filter()
+    if where is not None:
+        filter_ = sa.and_(filter_, where)
 
-def _all_annotations(session, windowsize=2000):
     # This is using a windowed query for loading all annotations in batches.
     # It is the most performant way of loading a big set of records from
     # the database while still supporting eagerloading of associated
@@ -98,9 +150,9 @@ def _all_annotations(session, windowsize=2000):
         session=session,
         column=models.Annotation.updated,  # implicit ASC
         windowsize=windowsize,
-        where=_annotation_filter(),
+        where=filter_,
     )
-    query = _eager_loaded_annotations(session).filter(_annotation_filter())
+    query = _eager_loaded_annotations(session).filter(filter_)
 
     for window in windows:
         yield from query.filter(window)
@@ -128,8 +180,7 @@ def _eager_loaded_annotations(session):
             models.Document.document_uris
         ),
         subqueryload(models.Annotation.document).subqueryload(models.Document.meta),
-        subqueryload(models.Annotation.moderation),
-        subqueryload(models.Annotation.thread).load_only("id"),
+        subqueryload(models.Annotation.group),
     )
 
 
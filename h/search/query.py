@@ -1,3 +1,5 @@
+import base64
+import json
 from datetime import datetime as dt
 
 from dateutil import tz
@@ -82,35 +84,45 @@ class Limiter:
 
 class Sorter:
     """
-    Sorts and returns annotations after search_after.
+    Sorts and returns annotations after search_after or cursor.
 
     Sorts annotations by sort (the key to sort by)
     and the order (the order in which to sort by).
 
     Returns annotations after search_after. search_after
     must be the value of the annotation's sort field.
+
+    Annotations with the same value in the sort field are ordered by their
+    ids, so the order is stable. This lets results be paged through with an
+    opaque cursor (see `cursor()`), which costs the same however deep it goes.
+    The cursor also records the sort field and order, so they don't need
+    passing again.
     """
 
     def __call__(self, search, params):
         sort_by = params.pop("sort", "updated")
-        # Sorting must be done on non-analyzed fields.
-        if sort_by == "user":
-            sort_by = "user_raw"
+        order = params.pop("order", "desc")
 
         # Since search_after depends on the field that the annotations are
         # being sorted by, it is set here rather than in a separate class.
         search_after = params.pop("search_after", None)
-        if search_after:
+
+        cursor = self.decode_cursor(params.pop("cursor", None))
+        if cursor:
+            sort_by, order, search_after = cursor
+        elif search_after:
             if sort_by in ["updated", "created"]:
                 search_after = self._parse_date(search_after)
+            search_after = [search_after] if search_after else None
 
-        if search_after:
-            search = search.extra(search_after=[search_after])
+        # Sorting must be done on non-analyzed fields.
+        if sort_by == "user":
+            sort_by = "user_raw"
 
-        return search.sort(
+        sort = [
             {
                 sort_by: {
-                    "order": params.pop("order", "desc"),
+                    "order": order,
                     # `unmapped_type` causes unknown fields specified as arguments to
                     # `sort` behave as if all documents contained empty values of the
                     # given type. Without this, specifying eg. `sort=foobar` throws
@@ -121,7 +133,72 @@ class Sorter:
                     "unmapped_type": "boolean",
                 }
             }
-        )
+        ]
+        # A single value `search_after` only pages by the sort field
+        if sort_by != "id" and not (search_after and len(search_after) == 1):
+            sort.append({"id": {"order": order}})
+
+        if search_after:
+            search = search.extra(search_after=search_after)
+
+        return search.sort(*sort)
+
+    @staticmethod
+    def cursor(search, response):
+        """
+        Return a cursor for the page of results after `response`.
+
+        :param search: The executed `elasticsearch_dsl.Search`
+        :param response: The response from executing `search`
+        :return: The cursor, or `None` if there are no more results
+        """
+        query = search.to_dict()
+        sort = query.get("sort", [])
+        hits = response["hits"]["hits"]
+
+        if (
+            not hits
+            # A short page must be the last one (10 is Elasticsearch's default)
+            or len(hits) < query.get("size", 10)
+            or not sort
+            or "id" not in sort[-1]
+        ):
+            return None
+
+        ((sort_by, spec),) = sort[0].items()
+        if sort_by == "user_raw":
+            sort_by = "user"
+
+        payload = json.dumps([sort_by, spec["order"], hits[-1]["sort"]])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode a cursor returned by `cursor()`.
+
+        :return: A `(sort, order, search_after)` tuple, or `None` if the cursor
+            is missing or invalid
+        """
+        if not cursor:
+            return None
+
+        try:
+            sort_by, order, search_after = json.loads(
+                base64.urlsafe_b64decode(cursor.encode("ascii"))
+            )
+        except (ValueError, TypeError, UnicodeError):
+            return None
+
+        if (
+            not isinstance(sort_by, str)
+            or order not in ("asc", "desc")
+            or not isinstance(search_after, list)
+            or len(search_after) != (1 if sort_by == "id" else 2)
+        ):
+            return None
+
+        return sort_by, order, search_after
 
     @staticmethod
     def _parse_date(str_value):
@@ -208,12 +285,25 @@ class GroupFilter:
     def __init__(self, request):
         self.user = request.user
         self.group_service = request.find_service(name="group")
+        self.filter_readable_by_world = request.registry.settings.get(
+            "h.search.filter_readable_by_world", False
+        )
 
     def __call__(self, search, params):
         # Remove parameter if passed, preventing it being passed to default query
         group_ids = popall(params, "group") or None
-        groups = self.group_service.groupids_readable_by(self.user, group_ids)
-        return search.filter("terms", group=groups)
+
+        if group_ids or not self.filter_readable_by_world:
+            groups = self.group_service.groupids_readable_by(self.user, group_ids)
+            return search.filter("terms", group=groups)
+
+        # Rather than listing every world readable group, which there can be
+        # many thousands of, use the flag indexed with each annotation
+        readable = Q("term", readable_by_world=True)
+        if member_groups := self.group_service.member_readable_groupids(self.user):
+            readable |= Q("terms", group=sorted(member_groups))
+
+        return search.filter(readable)
 
 
 class UriCombinedWildcardFilter:
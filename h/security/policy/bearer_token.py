@@ -1,9 +1,24 @@
+from itertools import chain
+
+import sqlalchemy as sa
 from pyramid.interfaces import ISecurityPolicy
 from pyramid.request import RequestLocalCache
+from sqlalchemy.orm import Session
 from zope.interface import implementer
 
+from h import cache
+from h.cache import TTLCache
+from h.models import Group, GroupMembership, User
 from h.security.identity import Identity
 from h.security.policy._identity_base import IdentityBasedPolicy
+from h.util.user import split_user
+
+# Cache of the identities of users authenticated by bearer tokens, shared by
+# every request in the process. Entries are keyed by `_identity_cache_key()`
+# and must not be modified, as they are returned to many requests. As with
+# `TOKEN_CACHE`, the TTL is short because it bounds how long a missed
+# invalidation can leave a deleted or demoted user's identity in use.
+IDENTITY_CACHE = TTLCache("bearer_token_identities", maxsize=20000, ttl=30)
 
 
 @implementer(ISecurityPolicy)
@@ -56,12 +71,83 @@ class BearerTokenPolicy(IdentityBasedPolicy):
         if token is None:
             return None
 
-        user = request.find_service(name="user").fetch(token.userid)
-        if user is None:
-            return None
+        key = _identity_cache_key(split_user(token.userid)["username"])
+
+        identity = IDENTITY_CACHE.get(key)
+        if identity is TTLCache.MISSING:
+            user = request.find_service(name="user").fetch(token.userid)
+            if user is None:
+                return None
 
-        return Identity.from_models(user=user)
+            identity = Identity.from_models(user=user)
+            IDENTITY_CACHE.set(key, identity)
+
+        return identity
 
     @staticmethod
     def _is_ws_request(request):
         return request.path == "/ws"
+
+
+def _identity_cache_key(username):
+    # Users are looked up by their normalised username alone (see
+    # `UserService.fetch()`), so that's what we key the cache by
+    return username.replace(".", "").lower()
+
+
+@sa.event.listens_for(Session, "before_flush")
+def _invalidate_identities(session, _flush_context, _instances):
+    """Invalidate the cached identities of users about to be changed by a flush."""
+    # This runs before the flush rather than after it, so we can still load
+    # the usernames of users who are about to be deleted
+    usernames = set()
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User):
+            if obj in session.new:
+                # New users can't have been cached yet
+                continue
+
+            attrs = sa.inspect(obj).attrs
+
+            if obj in session.deleted or any(
+                attr.history.has_changes()
+                for attr in (
+                    attrs._username,  # pylint: disable=protected-access
+                    attrs.authority,
+                    attrs.admin,
+                    attrs.staff,
+                    attrs.groups,
+                )
+            ):
+                usernames.update(
+                    attrs._username.history.sum()  # pylint: disable=protected-access
+                    or [obj.username]
+                )
+
+        elif isinstance(obj, Group):
+            attrs = sa.inspect(obj).attrs
+
+            if obj in session.deleted or (
+                obj not in session.new and attrs.pubid.history.has_changes()
+            ):
+                # We can't cheaply tell who is in the group, and this is rare
+                cache.invalidate_after_commit(session, IDENTITY_CACHE.name)
+                return
+
+            members = attrs.members.history
+            usernames.update(
+                user.username
+                for user in chain(members.added or (), members.deleted or ())
+            )
+
+        elif isinstance(obj, GroupMembership):
+            cache.invalidate_after_commit(session, IDENTITY_CACHE.name)
+            return
+
+    if usernames:
+        cache.invalidate_after_commit(
+            session,
+            IDENTITY_CACHE.name,
+            {_identity_cache_key(username) for username in usernames},
+        )
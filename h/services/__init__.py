@@ -6,10 +6,16 @@ from h.services.subscription import SubscriptionService
 
 def includeme(config):  # pragma: no cover
     config.register_service_factory(".annotation_json.factory", name="annotation_json")
+    config.register_service_factory(
+        ".annotated_uri.annotated_uri_factory", name="annotated_uri"
+    )
     config.register_service_factory(
         ".annotation_moderation.annotation_moderation_service_factory",
         name="annotation_moderation",
     )
+    config.register_service_factory(
+        ".annotation_purge.annotation_purge_factory", name="annotation_purge"
+    )
     config.register_service_factory(
         ".annotation_stats.annotation_stats_factory", name="annotation_stats"
     )
@@ -0,0 +1,192 @@
+import logging
+import os
+import threading
+import time
+
+import sqlalchemy as sa
+
+from h.models import DocumentURI
+from h.util.bloom_filter import BloomFilter
+from h.util.uri import normalize
+
+log = logging.getLogger(__name__)
+
+
+class AnnotatedURIFilter:
+    """
+    A process-wide bloom filter of every normalized URI we have seen.
+
+    The filter is loaded from a snapshot made by `hypothesis badge
+    build-uri-filter`. The URIs of any `DocumentURI` rows created since are
+    read periodically and kept in a set alongside it, rather than added to
+    the snapshot, so that its pages stay shared between processes. If the
+    snapshot file is replaced, the new one is loaded in its place.
+
+    URIs are only picked up when the filter refreshes, so a URI annotated in
+    the last `REFRESH_INTERVAL` seconds can be reported as never annotated.
+    """
+
+    REFRESH_INTERVAL = 30
+    """How often to look for new URIs and snapshots, in seconds."""
+
+    ID_OVERLAP = 1000
+    """
+    How many IDs before the watermark to re-read when looking for new URIs.
+
+    IDs are allocated before the transactions which use them commit, so a row
+    can appear with a lower ID than one we have already seen.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        # The snapshot and the URIs added since it, which are replaced
+        # together so that readers never see one without the other
+        self._state = None
+        self._watermark = None
+        self._mtime = None
+        self._refreshed_at = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, normalized_uri):
+        snapshot, added = self._state
+        return normalized_uri in added or normalized_uri in snapshot
+
+    def refresh(self, session):
+        """
+        Load a new snapshot or add new URIs if it's time to.
+
+        :return: Whether the filter is usable
+        """
+        if time.monotonic() - self._refreshed_at < self.REFRESH_INTERVAL:
+            return self._state is not None
+
+        # Only one thread needs to refresh, the others use the filter as is
+        if not self._lock.acquire(blocking=False):
+            return self._state is not None
+
+        try:
+            self._refreshed_at = time.monotonic()
+            self._refresh(session)
+        except Exception:  # pylint:disable=broad-except
+            log.exception("Failed to refresh the annotated URI filter")
+        finally:
+            self._lock.release()
+
+        return self._state is not None
+
+    def _refresh(self, session):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            log.warning("No annotated URI filter at %s", self.path)
+            return
+
+        if mtime == self._mtime:
+            # Adding to the set in place is safe, readers can only see more
+            _, added = self._state
+            self._watermark = self._add_new_uris(session, added, self._watermark)
+            return
+
+        # Catch up on the new snapshot before anyone can use it
+        snapshot, added = BloomFilter.load(self.path), set()
+        watermark = self._add_new_uris(session, added, snapshot.watermark)
+
+        self._state = (snapshot, added)
+        self._watermark = watermark
+        self._mtime = mtime
+
+    def _add_new_uris(self, session, added, watermark):
+        """Add URIs newer than `watermark` to `added` and return the new one."""
+        rows = session.execute(
+            sa.select(DocumentURI.id, DocumentURI.uri_normalized)
+            .where(DocumentURI.id > watermark - self.ID_OVERLAP)
+            .order_by(DocumentURI.id)
+        )
+
+        for id_, uri_normalized in rows:
+            added.add(uri_normalized)
+            watermark = max(watermark, id_)
+
+        return watermark
+
+
+class AnnotatedURIService:
+    """A service for checking whether URIs have been annotated."""
+
+    def __init__(self, session, uri_filter=None):
+        """
+        Create a new AnnotatedURIService.
+
+        :param session: The DB session
+        :param uri_filter: An `AnnotatedURIFilter` to check before the DB
+        """
+        self._session = session
+        self._uri_filter = uri_filter
+
+    def has_ever_been_annotated(self, uri):
+        """Return `True` if a given URI has ever been annotated."""
+        normalized_uri = normalize(uri)
+
+        if (
+            self._uri_filter
+            and self._uri_filter.refresh(self._session)
+            and normalized_uri not in self._uri_filter
+        ):
+            return False
+
+        # This check is written with SQL directly to guarantee an efficient
+        # query and minimize SQLAlchemy overhead. We query
+        # `document_uri.uri_normalized` instead of
+        # `annotation.target_uri_normalized` because there is an existing index
+        # on `uri_normalized`.
+        query = "SELECT EXISTS(SELECT 1 FROM document_uri WHERE uri_normalized = :uri)"
+        result = self._session.execute(query, {"uri": normalized_uri}).first()
+        return result[0] is True
+
+    def build_filter(self, path, error_rate):
+        """
+        Build a filter of every annotated URI and save it to `path`.
+
+        :param path: The file to save the filter to
+        :param error_rate: The false positive rate to size the filter for
+        :return: The number of URIs in the filter
+        """
+        count, watermark = self._session.execute(
+            sa.select(sa.func.count(), sa.func.coalesce(sa.func.max(DocumentURI.id), 0))
+        ).one()
+
+        uri_filter = BloomFilter.for_capacity(count, error_rate)
+        uri_filter.watermark = watermark
+        uri_filter.update(
+            uri
+            for (uri,) in self._session.execute(
+                sa.select(DocumentURI.uri_normalized).where(
+                    DocumentURI.id <= watermark
+                ),
+                execution_options={"stream_results": True},
+            )
+        )
+        uri_filter.save(path)
+
+        return count
+
+
+_URI_FILTERS = {}
+_URI_FILTERS_LOCK = threading.Lock()
+
+
+def _get_uri_filter(path):
+    with _URI_FILTERS_LOCK:
+        if path not in _URI_FILTERS:
+            _URI_FILTERS[path] = AnnotatedURIFilter(path)
+
+        return _URI_FILTERS[path]
+
+
+def annotated_uri_factory(_context, request):
+    path = request.registry.settings.get("h.badge.uri_filter_path")
+
+    return AnnotatedURIService(
+        request.db, uri_filter=_get_uri_filter(path) if path else None
+    )
@@ -1,6 +1,10 @@
 from datetime import datetime
 
-from h.events import AnnotationEvent
+import sqlalchemy as sa
+from zope.sqlalchemy import mark_changed
+
+from h.events import AnnotationEvent, AnnotationsDeletedEvent
+from h.models import Annotation
 
 
 class AnnotationDeleteService:
@@ -30,6 +34,59 @@ class AnnotationDeleteService:
         for ann in annotations:
             self.delete(ann)
 
+    def delete_user_annotations(self, userid):
+        """
+        Delete all of a user's annotations at once.
+
+        Unlike `delete_annotations()` this doesn't load the annotations, or
+        sync each one to Elasticsearch and the realtime API separately. They
+        are deleted by a single `UPDATE`, queued to be synced to Elasticsearch
+        by a single job and announced in a single realtime message.
+
+        :param userid: The ID of the user in "acct:USERNAME@AUTHORITY" format
+        :type userid: str
+        """
+        self._delete_where(Annotation.userid == userid)
+
+        self.request.find_service(name="search_index").queue_users_annotations(
+            userid, tag="AnnotationDeleteService.delete_user"
+        )
+
+    def delete_group_annotations(self, groupid):
+        """
+        Delete all of the annotations in a group at once.
+
+        See `delete_user_annotations()` for how this differs from
+        `delete_annotations()`.
+
+        :param groupid: The pubid of the group
+        :type groupid: str
+        """
+        self._delete_where(Annotation.groupid == groupid)
+
+        self.request.find_service(name="search_index").queue_group_annotations(
+            groupid, tag="AnnotationDeleteService.delete_group"
+        )
+
+    def _delete_where(self, where):
+        annotation_ids = (
+            self.request.db.execute(
+                sa.update(Annotation)
+                .where(where, Annotation.deleted.is_(False))
+                .values(updated=datetime.utcnow(), deleted=True)
+                .returning(Annotation.id)
+                .execution_options(synchronize_session="evaluate")
+            )
+            .scalars()
+            .all()
+        )
+        mark_changed(self.request.db)
+
+        if annotation_ids:
+            self.request.notify_after_commit(
+                AnnotationsDeletedEvent(self.request, annotation_ids)
+            )
+
 
 def annotation_delete_service_factory(_context, request):
     return AnnotationDeleteService(request)
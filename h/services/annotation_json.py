@@ -1,9 +1,12 @@
 from copy import deepcopy
+from itertools import chain
 
-from sqlalchemy.orm import subqueryload
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, subqueryload
 
-from h import storage
-from h.models import Annotation, User
+from h import cache, storage
+from h.cache import TTLCache
+from h.models import Annotation, Group, User
 from h.presenters import DocumentJSONPresenter
 from h.security import Identity, identity_permits
 from h.security.permissions import Permission
@@ -11,6 +14,11 @@ from h.session import user_info
 from h.traversal import AnnotationContext
 from h.util.datetime import utc_iso8601
 
+# Cache of the JSON presentations of annotations (without their documents),
+# keyed by annotation id. Each entry records the `updated` timestamp of the
+# annotation it was built from, so edits to an annotation miss the cache.
+ANNOTATION_JSON_CACHE = TTLCache("annotation_json", maxsize=10000, ttl=300)
+
 
 class AnnotationJSONService:
     """A service for generating API compatible JSON for annotations."""
@@ -37,9 +45,32 @@ class AnnotationJSONService:
         has only the data applicable to all users. This does not blank content
         for moderated annotations.
 
+        The presentation of an annotation is cached across requests, except
+        for the document, which can change without the annotation changing.
+
         :param annotation: Annotation to present
         :return: A dict suitable for JSON serialisation
         """
+        if annotation.id is None or sa.inspect(annotation).modified:
+            # There's no id or `updated` timestamp we can trust to key it by
+            model = self._present(annotation)
+        else:
+            entry = ANNOTATION_JSON_CACHE.get(annotation.id)
+
+            if entry is TTLCache.MISSING or entry[0] != annotation.updated:
+                entry = (annotation.updated, self._present(annotation))
+                ANNOTATION_JSON_CACHE.set(annotation.id, entry)
+
+            model = entry[1]
+
+        # Copy the model so callers can change its keys without changing the
+        # cached version
+        model = dict(model)
+        model["document"] = DocumentJSONPresenter(annotation.document).asdict()
+
+        return model
+
+    def _present(self, annotation):
         model = deepcopy(annotation.extra) or {}
 
         model.update(
@@ -50,7 +81,7 @@ class AnnotationJSONService:
                 "user": annotation.userid,
                 "uri": annotation.target_uri,
                 "text": annotation.text or "",
-                "tags": annotation.tags or [],
+                "tags": list(annotation.tags or []),
                 "group": annotation.groupid,
                 #  Convert our simple internal annotation storage format into the
                 #  legacy complex permissions dict format that is still used in
@@ -61,8 +92,7 @@ class AnnotationJSONService:
                     "update": [annotation.userid],
                     "delete": [annotation.userid],
                 },
-                "target": annotation.target,
-                "document": DocumentJSONPresenter(annotation.document).asdict(),
+                "target": deepcopy(annotation.target),
                 "links": self._links_service.get_all(annotation),
             }
         )
@@ -188,3 +218,33 @@ def factory(_context, request):
         flag_service=request.find_service(name="flag"),
         user_service=request.find_service(name="user"),
     )
+
+
+@sa.event.listens_for(Session, "after_flush")
+def _invalidate_annotation_json(session, _flush_context):
+    """Invalidate cached annotations which a flush may have changed."""
+    # Changes to these can change how every annotation is presented. They're
+    # rare, so it's simplest to clear everything.
+    for obj in session.dirty:
+        if (isinstance(obj, User) and _changed(obj, "_username", "display_name")) or (
+            isinstance(obj, Group) and _changed(obj, "readable_by")
+        ):
+            cache.invalidate_after_commit(session, ANNOTATION_JSON_CACHE.name)
+            return
+
+    # Most changes to an annotation change its `updated` timestamp, but not
+    # all of them (e.g. renaming its user)
+    annotation_ids = {
+        obj.id
+        for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, Annotation)
+    }
+    if annotation_ids:
+        cache.invalidate_after_commit(
+            session, ANNOTATION_JSON_CACHE.name, annotation_ids
+        )
+
+
+def _changed(obj, *attrs):
+    state = sa.inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
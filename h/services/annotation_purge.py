@@ -0,0 +1,139 @@
+import logging
+import time
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+from elasticsearch import helpers as es_helpers
+from packaging.version import Version
+
+from h.models import Annotation
+
+log = logging.getLogger(__name__)
+
+
+class AnnotationPurgeService:
+    """Permanently removes annotations which have been marked as deleted."""
+
+    BATCH_SIZE = 1000
+    """The number of annotations to remove in each transaction."""
+
+    SLOW_BATCH = 1.0
+    """
+    How long in seconds a batch can take before we start pausing between them.
+
+    When a batch takes longer than this the DB is probably busy, so we pause
+    for as long again before the next one to leave room for other queries.
+    """
+
+    def __init__(self, session, es_client, transaction_manager):
+        self._session = session
+        self._es = es_client
+        self._tm = transaction_manager
+
+    def purge(self, cutoff, max_batches, batch_size=BATCH_SIZE):
+        """
+        Remove annotations marked as deleted before `cutoff` a batch at a time.
+
+        Each batch is removed from Elasticsearch (where deleted annotations
+        are left as `{"deleted": true}` documents) and then from the DB, and
+        then committed. Annotations which fail to be removed from Elasticsearch
+        are left in the DB, so they'll be tried again in a later batch.
+
+        This yields after each batch with a dict of New Relic-style metrics
+        about it.
+
+        :param cutoff: Only remove annotations last updated before this time
+        :param max_batches: The most batches to remove before returning
+        :param batch_size: The number of annotations in each batch
+        """
+        for _ in range(max_batches):
+            metrics = {}
+
+            with self._timed(metrics, "Duration/Total"):
+                with self._timed(metrics, "Duration/Fetch_from_db"):
+                    annotation_ids = self._fetch_batch(cutoff, batch_size)
+
+                if not annotation_ids:
+                    self._tm.abort()
+                    return
+
+                with self._timed(metrics, "Duration/Delete_from_Elastic"):
+                    errored = self._delete_from_es(annotation_ids)
+
+                purged_ids = [id_ for id_ in annotation_ids if id_ not in errored]
+
+                with self._timed(metrics, "Duration/Delete_from_db"):
+                    if purged_ids:
+                        self._session.execute(
+                            sa.delete(Annotation)
+                            .where(Annotation.id.in_(purged_ids))
+                            .execution_options(synchronize_session=False)
+                        )
+                    self._tm.commit()
+
+            metrics["Purged"] = len(purged_ids)
+            metrics["Failed_in_Elastic"] = len(errored)
+            metrics["Paused"] = 0.0
+
+            if metrics["Duration/Total"] > self.SLOW_BATCH:
+                metrics["Paused"] = metrics["Duration/Total"]
+                time.sleep(metrics["Paused"])
+
+            yield metrics
+
+            if len(annotation_ids) < batch_size:
+                return
+
+    def _fetch_batch(self, cutoff, batch_size):
+        return (
+            self._session.execute(
+                sa.select(Annotation.id)
+                .where(Annotation.deleted.is_(True), Annotation.updated < cutoff)
+                .order_by(Annotation.updated)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+
+    def _delete_from_es(self, annotation_ids):
+        """Delete annotations from Elasticsearch and return the failed ids."""
+
+        def actions():
+            for annotation_id in annotation_ids:
+                action = {
+                    "_op_type": "delete",
+                    "_index": self._es.index,
+                    "_id": annotation_id,
+                }
+                if self._es.server_version < Version("7.0.0"):
+                    action["_type"] = self._es.mapping_type
+                yield action
+
+        errored = set()
+        for ok, item in es_helpers.streaming_bulk(
+            self._es.conn, actions(), raise_on_error=False
+        ):
+            # Annotations which were never indexed are already gone
+            if not ok and item["delete"].get("status") != 404:
+                log.warning("failed to delete annotation from Elasticsearch: %r", item)
+                errored.add(item["delete"]["_id"])
+
+        return errored
+
+    @staticmethod
+    @contextmanager
+    def _timed(metrics, key):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics[key] = round(time.perf_counter() - start, 3)
+
+
+def annotation_purge_factory(_context, request):
+    """Return an AnnotationPurgeService for the given request."""
+    return AnnotationPurgeService(
+        session=request.db, es_client=request.es, transaction_manager=request.tm
+    )
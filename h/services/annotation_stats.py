@@ -22,8 +22,19 @@ class AnnotationStatsService:
         If the logged in user has this userid, private annotations will be
         included in this count, otherwise they will not.
         """
-        params = MultiDict({"limit": 0, "user": userid})
-        return self._search(params)
+        search, params = self.user_annotation_count_search(userid)
+        return search.run(params).total
+
+    def user_annotation_count_search(self, userid):
+        """
+        Return the search behind `user_annotation_count()`, without running it.
+
+        This is for running the count alongside other searches in a
+        `SearchBatch`, where the count is the `total` of its result.
+
+        :return: A `(Search, params)` tuple
+        """
+        return self._top_level_search(), MultiDict({"limit": 0, "user": userid})
 
     def total_user_annotation_count(self, userid):
         """
@@ -45,15 +56,23 @@ class AnnotationStatsService:
 
     def group_annotation_count(self, pubid):
         """Return the count of searchable top level annotations for this group."""
-        params = MultiDict({"limit": 0, "group": pubid})
-        return self._search(params)
+        search, params = self.group_annotation_count_search(pubid)
+        return search.run(params).total
+
+    def group_annotation_count_search(self, pubid):
+        """
+        Return the search behind `group_annotation_count()`, without running it.
+
+        See `user_annotation_count_search()`.
+
+        :return: A `(Search, params)` tuple
+        """
+        return self._top_level_search(), MultiDict({"limit": 0, "group": pubid})
 
-    def _search(self, params):
+    def _top_level_search(self):
         search = Search(self.request)
         search.append_modifier(TopLevelAnnotationsFilter())
-
-        search_result = search.run(params)
-        return search_result.total
+        return search
 
 
 def annotation_stats_factory(_context, request):
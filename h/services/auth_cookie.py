@@ -1,11 +1,68 @@
 import base64
+import hashlib
 import os
+import threading
+import time
+from collections import namedtuple
 from datetime import datetime, timedelta
 
 import sqlalchemy as sa
+from h_pyramid_sentry import report_exception
+from kombu.exceptions import OperationalError
 from webob.cookies import SignedCookieProfile
 
+from h import cache
+from h.cache import TTLCache
 from h.models import AuthTicket
+from h.tasks import auth
+
+# Cache of auth ticket id hashes to the details of valid tickets, shared by
+# every request in the process so that most page views don't need to query
+# the ticket. This is kept short as other processes extend tickets too.
+TICKET_CACHE = TTLCache("auth_tickets", maxsize=20000, ttl=60)
+
+_CachedTicket = namedtuple("_CachedTicket", ["userid", "expires", "updated"])
+
+
+class TicketRefreshBuffer:
+    """
+    A process-wide buffer of auth tickets whose expiry needs extending.
+
+    Rather than writing to the DB in the request which notices that a ticket
+    should be extended, the ticket's id is added here. Once the buffer has
+    been collecting for `flush_interval` seconds or holds `maxsize` ids,
+    `add()` returns them all so they can be extended in a single batch.
+
+    :param flush_interval: The most seconds to collect ids for
+    :param maxsize: The most ids to collect before flushing
+    """
+
+    def __init__(self, flush_interval, maxsize):
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+
+        self._ticket_ids = set()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, ticket_id):
+        """Add `ticket_id`, returning the ids to extend if it's time to flush."""
+        with self._lock:
+            self._ticket_ids.add(ticket_id)
+
+            if (
+                len(self._ticket_ids) < self.maxsize
+                and time.monotonic() - self._last_flush < self.flush_interval
+            ):
+                return []
+
+            ticket_ids, self._ticket_ids = self._ticket_ids, set()
+            self._last_flush = time.monotonic()
+
+        return sorted(ticket_ids)
+
+
+TICKET_REFRESH_BUFFER = TicketRefreshBuffer(flush_interval=60, maxsize=1000)
 
 
 class AuthCookieService:
@@ -37,27 +94,22 @@ class AuthCookieService:
         if not ticket_id:
             return None
 
-        ticket = (
-            self._session.query(AuthTicket)
-            .filter(
-                AuthTicket.id == ticket_id,
-                AuthTicket.user_userid == userid,
-                AuthTicket.expires > sa.func.now(),
-            )
-            .one_or_none()
-        )
-
-        if ticket is None:
+        ticket = self._get_ticket(ticket_id)
+        if (
+            ticket is None
+            or ticket.userid != userid
+            or ticket.expires <= datetime.utcnow()
+        ):
             return None
 
         # We don't want to update the `expires` column of an auth ticket on
         # every single request, but only when the ticket hasn't been touched
         # within a the defined `TICKET_REFRESH_INTERVAL`.
         if (datetime.utcnow() - ticket.updated) > self.TICKET_REFRESH_INTERVAL:
-            ticket.expires = datetime.utcnow() + self.TICKET_TTL
+            self._refresh_ticket(ticket_id, ticket)
 
         # Update the user cache to allow quick checking if we are called again
-        self._user = ticket.user
+        self._user = self._user_service.fetch(userid)
 
         return self._user
 
@@ -94,12 +146,47 @@ class AuthCookieService:
         _, ticket_id = self._get_cookie_value()
         if ticket_id:
             self._session.query(AuthTicket).filter_by(id=ticket_id).delete()
+            invalidate_tickets_after_commit(self._session, [ticket_id])
 
         # Empty the cached user to force revalidation
         self._user = None
 
         return self._cookie.get_headers(None, max_age=0)
 
+    def _get_ticket(self, ticket_id):
+        key = ticket_cache_key(ticket_id)
+
+        ticket = TICKET_CACHE.get(key)
+        if ticket is TTLCache.MISSING:
+            row = self._session.execute(
+                sa.select(
+                    AuthTicket.user_userid, AuthTicket.expires, AuthTicket.updated
+                ).where(AuthTicket.id == ticket_id, AuthTicket.expires > sa.func.now())
+            ).one_or_none()
+            if row is None:
+                return None
+
+            ticket = _CachedTicket(*row)
+            TICKET_CACHE.set(key, ticket)
+
+        return ticket
+
+    def _refresh_ticket(self, ticket_id, ticket):
+        """Extend a ticket in this process now, and in the DB in a later batch."""
+        now = datetime.utcnow()
+        TICKET_CACHE.set(
+            ticket_cache_key(ticket_id),
+            ticket._replace(expires=now + self.TICKET_TTL, updated=now),
+        )
+
+        if ticket_ids := TICKET_REFRESH_BUFFER.add(ticket_id):
+            try:
+                auth.extend_auth_tickets.delay(ticket_ids, now + self.TICKET_TTL)
+            except OperationalError as err:
+                # We could not connect to rabbit! So carry on, the tickets
+                # will be buffered again the next time they are refreshed
+                report_exception(err)
+
     def _get_cookie_value(self):
         value = self._cookie.get_value()
         if not value:
@@ -108,6 +195,23 @@ class AuthCookieService:
         return value
 
 
+def ticket_cache_key(ticket_id):
+    """
+    Return the key for a ticket in `TICKET_CACHE`.
+
+    Keys are broadcast to other processes when they are invalidated, so we
+    use a hash rather than the ticket id itself.
+    """
+    return hashlib.sha256(ticket_id.encode("utf-8")).hexdigest()
+
+
+def invalidate_tickets_after_commit(session, ticket_ids):
+    """Invalidate the cached tickets with the given ids once `session` commits."""
+    cache.invalidate_after_commit(
+        session, TICKET_CACHE.name, {ticket_cache_key(id_) for id_ in ticket_ids}
+    )
+
+
 def factory(_context, request):
     """Return a AuthCookieService instance for the passed context and request."""
 
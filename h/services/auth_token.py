@@ -1,10 +1,25 @@
+import hashlib
+from collections import namedtuple
 from datetime import datetime
+from itertools import chain
 from typing import Optional
 
 import newrelic.agent
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
 
+from h import cache
+from h.cache import TTLCache
 from h.models import Token
 
+# Cache of token value hashes to the userid and expiry of the token, shared by
+# every request in the process so that warm tokens don't need a DB query.
+# Revoked tokens stay valid in this process until the invalidation arrives, or
+# the entry expires if it's missed, so the TTL is kept short.
+TOKEN_CACHE = TTLCache("auth_tokens", maxsize=20000, ttl=30)
+
+_CachedToken = namedtuple("_CachedToken", ["userid", "expires"])
+
 
 class LongLivedToken:
     """
@@ -33,23 +48,28 @@ class LongLivedToken:
 class AuthTokenService:
     def __init__(self, session):
         self._session = session
-        self._validate_cache = {}
 
     def validate(self, token_str) -> Optional[LongLivedToken]:
         """
         Get a validated token from the token string or None.
 
+        Tokens which exist are cached across requests in `TOKEN_CACHE` until
+        they are changed or deleted.
+
         :param token_str: the token string
         """
+        key = token_cache_key(token_str)
 
-        if token_str not in self._validate_cache:
+        cached_token = TOKEN_CACHE.get(key)
+        if cached_token is TTLCache.MISSING:
             token = self.fetch(token_str)
+            if token is None:
+                return None
 
-            self._validate_cache[token_str] = LongLivedToken(token) if token else None
+            cached_token = _CachedToken(userid=token.userid, expires=token.expires)
+            TOKEN_CACHE.set(key, cached_token)
 
-        if (
-            long_lived_token := self._validate_cache[token_str]
-        ) and long_lived_token.is_valid():
+        if (long_lived_token := LongLivedToken(cached_token)).is_valid():
             return long_lived_token
 
         return None
@@ -96,3 +116,35 @@ class AuthTokenService:
 
 def auth_token_service_factory(_context, request):
     return AuthTokenService(request.db)
+
+
+def token_cache_key(token_str):
+    """
+    Return the key for a token in `TOKEN_CACHE`.
+
+    Keys are broadcast to other processes when they are invalidated, so we
+    use a hash rather than the token itself.
+    """
+    return hashlib.sha256(token_str.encode("utf-8")).hexdigest()
+
+
+def invalidate_tokens_after_commit(session, token_strs):
+    """Invalidate the cached tokens with the given values once `session` commits."""
+    cache.invalidate_after_commit(
+        session, TOKEN_CACHE.name, {token_cache_key(value) for value in token_strs}
+    )
+
+
+@sa.event.listens_for(Session, "before_flush")
+def _invalidate_tokens(session, _flush_context, _instances):
+    """Invalidate the cached tokens about to be changed or deleted by a flush."""
+    # This runs before the flush rather than after it, so we can still load
+    # the values of tokens which are about to be deleted
+    token_strs = set()
+
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, Token):
+            token_strs.update(sa.inspect(obj).attrs.value.history.sum() or [obj.value])
+
+    if token_strs:
+        invalidate_tokens_after_commit(session, token_strs)
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import Iterator, Union
 
 import sqlalchemy as sa
 from sqlalchemy.engine import Row
@@ -76,6 +76,9 @@ class BulkAnnotationService:
 
         self._db = db_session
 
+    #: How many rows to fetch from the DB cursor at a time
+    YIELD_PER = 1000
+
     # pylint: disable=too-many-arguments
     def annotation_search(
         self,
@@ -84,9 +87,13 @@ class BulkAnnotationService:
         updated: dict,
         fields: list = None,
         limit=100000,
-    ) -> Union[List[Annotation], Row]:
+    ) -> Iterator[Union[Annotation, Row]]:
         """
-        Get a list of annotations or rows viewable by an audience of users.
+        Get an iterator of annotations or rows viewable by an audience of users.
+
+        The results are streamed from a server-side cursor a window at a time,
+        so the memory used doesn't grow with the number of results. The query
+        isn't executed until the first result is requested.
 
         Using a fields argument will switch the return type from annotation
         objects to row objects. This is more efficient if you only need a
@@ -106,16 +113,27 @@ class BulkAnnotationService:
         :raises BadFieldSpec: For poorly specified fields
         """
 
-        results = self._db.execute(
-            self._search_query(
-                authority, audience=audience, updated=updated, fields=fields
-            ).limit(limit)
-        )
+        # Build the query now so any errors are raised to the caller straight
+        # away, rather than when the results are first read
+        query = self._search_query(
+            authority, audience=audience, updated=updated, fields=fields
+        ).limit(limit)
+
+        return self._stream(query, scalars=fields is None)
+
+    def _stream(self, query, scalars):
+        # The results are read as the response is sent, which is after the
+        # request's DB session has been closed, so use a session of our own
+        with Session(bind=self._db.get_bind()) as session:
+            results = session.execute(
+                query,
+                execution_options={"stream_results": True, "yield_per": self.YIELD_PER},
+            )
 
-        if fields is None:
-            results = results.scalars()
+            if scalars:
+                results = results.scalars()
 
-        return results.all()
+            yield from results
 
     @classmethod
     def _search_query(cls, authority, audience, updated, fields=None) -> Select:
@@ -12,8 +12,10 @@ from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError, ProgrammingError
 from zope.sqlalchemy import mark_changed
 
+from h import cache
 from h.models import Group, GroupMembership, User, UserIdentity
 from h.models.group import PRIVATE_GROUP_TYPE_FLAGS
+from h.services.group import MEMBER_READABLE_CACHE
 
 
 class DBAction:
@@ -205,6 +207,12 @@ class GroupMembershipCreateAction(DBAction):
 
             raise
 
+        cache.invalidate_after_commit(
+            self.db,
+            MEMBER_READABLE_CACHE.name,
+            {f"user:{value['user_id']}" for value in values},
+        )
+
         return [Report(id_) for (id_,) in membership_rows]
 
 
@@ -1,6 +1,3 @@
-from h.models import Annotation
-
-
 class DeletePublicGroupError(Exception):
     pass
 
@@ -24,8 +21,7 @@ class DeleteGroupService:
         if group.pubid == "__world__":
             raise DeletePublicGroupError("Public group can not be deleted")
 
-        annotations = self.request.db.query(Annotation).filter_by(groupid=group.pubid)
-        self._annotation_delete_service.delete_annotations(annotations)
+        self._annotation_delete_service.delete_group_annotations(group.pubid)
 
 
 def delete_group_service_factory(_context, request):
@@ -1,10 +1,24 @@
 import re
+from collections import namedtuple
+from itertools import chain
 
-from h import models
-from h.util.db import lru_cache_in_transaction
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from h import cache, models
+from h.cache import TTLCache
 
 PARAM_PATTERN = re.compile(r"\A__feature__\[(?P<featurename>[A-Za-z0-9_-]+)\]\Z")
 
+#: A feature flag from the cached snapshot, with the ids of every user in any
+#: of its cohorts in place of the cohorts themselves
+CachedFeature = namedtuple(
+    "CachedFeature", ["name", "everyone", "admins", "staff", "cohort_user_ids"]
+)
+
+# Cache of a tuple of `CachedFeature`s for every feature, under the key "all"
+FEATURE_CACHE = TTLCache("features", maxsize=1, ttl=300)
+
 
 class UnknownFeatureError(Exception):
     pass
@@ -49,8 +63,6 @@ class FeatureService:
         self.session = session
         self.overrides = overrides
 
-        self._cached_load = lru_cache_in_transaction(self.session)(self._load)
-
     def enabled(self, name, user=None):
         """
         Determine if the named feature is enabled for the specified `user`.
@@ -68,11 +80,33 @@ class FeatureService:
 
     def all(self, user=None):
         """Return a dict mapping feature flag names to enabled states for the specified `user`."""
-        return {f.name: self._state(f, user=user) for f in self._cached_load()}
+        return {f.name: self._state(f, user=user) for f in self._load()}
 
     def _load(self):
-        """Load the feature flags from the database."""
-        return models.Feature.all(self.session)
+        """
+        Load the feature flags from the cache, or the database.
+
+        The flags and their cohorts are cached in the process, so checking
+        them doesn't usually need to query the DB.
+        """
+        features = FEATURE_CACHE.get("all")
+
+        if features is TTLCache.MISSING:
+            features = tuple(
+                CachedFeature(
+                    name=feature.name,
+                    everyone=bool(feature.everyone),
+                    admins=bool(feature.admins),
+                    staff=bool(feature.staff),
+                    cohort_user_ids=frozenset(
+                        user.id for cohort in feature.cohorts for user in cohort.members
+                    ),
+                )
+                for feature in models.Feature.all(self.session)
+            )
+            FEATURE_CACHE.set("all", features)
+
+        return features
 
     def _state(self, feature, user=None):
         # Features that are explicitly overridden are on.
@@ -90,7 +124,7 @@ class FeatureService:
                 return True
             # If the feature is in a cohort that the user is a member of, the
             # feature is on.
-            if set(feature.cohorts) & set(user.cohorts):
+            if user.id in feature.cohort_user_ids:
                 return True
         return False
 
@@ -113,3 +147,15 @@ def _feature_overrides(request):
         if match:
             overrides.append(match.group("featurename"))
     return overrides
+
+
+@sa.event.listens_for(Session, "after_flush")
+def _invalidate_features(session, _flush_context):
+    """Invalidate the cached feature flags if a flush changed any flags or cohorts."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (models.Feature, models.FeatureCohort)) or (
+            isinstance(obj, models.User)
+            and sa.inspect(obj).attrs.cohorts.history.has_changes()
+        ):
+            cache.invalidate_after_commit(session, FEATURE_CACHE.name)
+            return
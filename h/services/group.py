@@ -1,9 +1,21 @@
+from itertools import chain
+
 import sqlalchemy as sa
+from sqlalchemy.orm import Session
 
-from h.models import Group, User
+from h import cache
+from h.cache import TTLCache
+from h.models import Group, GroupMembership, User
 from h.models.group import ReadableBy
 from h.util import group as group_util
 
+# The pubids of every world readable group, under the key "world"
+WORLD_READABLE_CACHE = TTLCache("world_readable_groups", maxsize=1, ttl=300)
+
+# The pubids of the members-only groups each user is a member of, under
+# "user:<user.id>" keys
+MEMBER_READABLE_CACHE = TTLCache("member_readable_groups", maxsize=20000, ttl=300)
+
 
 class GroupService:
     def __init__(self, session, user_fetcher):
@@ -88,21 +100,59 @@ class GroupService:
 
         :type user: `h.models.user.User`
         """
-        readable = Group.readable_by == ReadableBy.world
+        world_readable = self.world_readable_groupids()
+        member_readable = self.member_readable_groupids(user)
 
-        if user is not None:
-            readable_member = sa.and_(
-                Group.readable_by == ReadableBy.members,
-                Group.members.any(User.id == user.id),
+        if group_ids:
+            return [
+                group_id
+                for group_id in dict.fromkeys(group_ids)
+                if group_id in world_readable or group_id in member_readable
+            ]
+
+        return list(world_readable) + list(member_readable)
+
+    def world_readable_groupids(self):
+        """Return a frozenset of the pubids of every world-readable group."""
+        pubids = WORLD_READABLE_CACHE.get("world")
+
+        if pubids is TTLCache.MISSING:
+            pubids = frozenset(
+                pubid
+                for (pubid,) in self.session.query(Group.pubid).filter(
+                    Group.readable_by == ReadableBy.world
+                )
             )
-            readable = sa.or_(readable, readable_member)
+            WORLD_READABLE_CACHE.set("world", pubids)
 
-        if group_ids:
-            readable = sa.and_(Group.pubid.in_(group_ids), readable)
+        return pubids
 
-        return [
-            record.pubid for record in self.session.query(Group.pubid).filter(readable)
-        ]
+    def member_readable_groupids(self, user):
+        """
+        Return the pubids of the members-only groups the user can read.
+
+        These are the groups readable by members which the user is a member
+        of. If the user is ``None``, this is an empty frozenset.
+
+        :type user: `h.models.user.User` or None
+        """
+        if user is None:
+            return frozenset()
+
+        key = f"user:{user.id}"
+        pubids = MEMBER_READABLE_CACHE.get(key)
+
+        if pubids is TTLCache.MISSING:
+            pubids = frozenset(
+                pubid
+                for (pubid,) in self.session.query(Group.pubid).filter(
+                    Group.readable_by == ReadableBy.members,
+                    Group.members.any(User.id == user.id),
+                )
+            )
+            MEMBER_READABLE_CACHE.set(key, pubids)
+
+        return pubids
 
     def groupids_created_by(self, user):
         """
@@ -124,3 +174,51 @@ def groups_factory(_context, request):
     """Return a GroupService instance for the passed context and request."""
     user_service = request.find_service(name="user")
     return GroupService(session=request.db, user_fetcher=user_service.fetch)
+
+
+@sa.event.listens_for(Session, "after_flush")
+def _invalidate_readable_groupids(session, _flush_context):
+    """Invalidate the cached readable groups affected by a flush."""
+    world_changed = False
+    members_changed = False
+    user_ids = set()
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Group):
+            attrs = sa.inspect(obj).attrs
+
+            if obj in session.new or obj in session.deleted:
+                # Deleted groups don't need removing from the members cache
+                # as there's nothing left in them to read
+                world_changed |= obj.readable_by == ReadableBy.world
+            elif (
+                attrs.readable_by.history.has_changes()
+                or attrs.pubid.history.has_changes()
+            ):
+                readable_by = set(attrs.readable_by.history.sum())
+                world_changed |= ReadableBy.world in readable_by
+                members_changed |= ReadableBy.members in readable_by
+
+            members = attrs.members.history
+            user_ids.update(
+                user.id for user in chain(members.added or (), members.deleted or ())
+            )
+
+        elif isinstance(obj, User):
+            if sa.inspect(obj).attrs.groups.history.has_changes():
+                user_ids.add(obj.id)
+
+        elif isinstance(obj, GroupMembership):
+            user_ids.add(obj.user_id)
+
+    if world_changed:
+        cache.invalidate_after_commit(session, WORLD_READABLE_CACHE.name)
+
+    if members_changed:
+        cache.invalidate_after_commit(session, MEMBER_READABLE_CACHE.name)
+    elif user_ids:
+        cache.invalidate_after_commit(
+            session,
+            MEMBER_READABLE_CACHE.name,
+            {f"user:{user_id}" for user_id in user_ids},
+        )
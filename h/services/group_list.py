@@ -1,6 +1,16 @@
-from h import models
+from itertools import chain
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from h import cache, models
+from h.cache import TTLCache
 from h.models import group
 
+# Cache of the id of each authority's world group (or `None` if it doesn't
+# have one), keyed by authority
+WORLD_GROUP_CACHE = TTLCache("world_groups", maxsize=100, ttl=300)
+
 
 class GroupListService:
     """
@@ -9,6 +19,9 @@ class GroupListService:
     This service filters groups by user session, scope, etc.
 
     ALl public methods return relevant group model objects.
+
+    Groups returned by `request_groups()` have their organization and scopes
+    loaded up front, so presenting them takes a fixed number of queries.
     """
 
     def __init__(self, session, default_authority, group_scope_service):
@@ -155,8 +168,17 @@ class GroupListService:
         :rtype: list of :class:`h.models.group`
         """
 
-        user_groups = self.user_groups(user)
-        return [group for group in user_groups if group.type == "private"]
+        if user is None:
+            return []
+
+        private_groups = (
+            self._eager_load(self._session.query(models.Group))
+            .filter_by(**group.PRIVATE_GROUP_TYPE_FLAGS._asdict())
+            .join(models.GroupMembership)
+            .filter(models.GroupMembership.user_id == user.id)
+            .all()
+        )
+        return self._sort(private_groups)
 
     def scoped_groups(self, authority, document_uri):
         if not document_uri:
@@ -169,7 +191,7 @@ class GroupListService:
 
         # Retrieve groups for these IDs
         scoped_groups = (
-            self._session.query(models.Group)
+            self._eager_load(self._session.query(models.Group))
             .filter(models.Group.id.in_(matching_scope_groupids))
             .filter(models.Group.authority == authority)
             .filter(
@@ -193,19 +215,45 @@ class GroupListService:
         An authority may not have a world group, in which case this will
         return ``None``.
 
+        The world group's id is cached for each authority, so it can usually be
+        loaded by primary key (often from the session's identity map).
+
         :type authority: string
         :rtype: :class:`h.models.group` or None
         """
-        return (
-            self._session.query(models.Group)
-            .filter_by(
-                authority=authority,
-                readable_by=group.ReadableBy.world,
-                pubid="__world__",
+        group_id = WORLD_GROUP_CACHE.get(authority)
+
+        if group_id is TTLCache.MISSING:
+            group_id = (
+                self._session.query(models.Group.id)
+                .filter_by(
+                    authority=authority,
+                    readable_by=group.ReadableBy.world,
+                    pubid="__world__",
+                )
+                .scalar()
             )
-            .one_or_none()
+            WORLD_GROUP_CACHE.set(authority, group_id)
+
+        if group_id is None:
+            return None
+
+        return self._session.get(
+            models.Group, group_id, options=self._eager_load_options()
         )
 
+    @classmethod
+    def _eager_load(cls, query):
+        return query.options(*cls._eager_load_options())
+
+    @staticmethod
+    def _eager_load_options():
+        """Return options to load what the groups API presents with groups."""
+        return [
+            sa.orm.selectinload(models.Group.organization),
+            sa.orm.selectinload(models.Group.scopes),
+        ]
+
     @staticmethod
     def _sort(groups):
         """Sort a list of groups of a single type."""
@@ -220,3 +268,16 @@ def group_list_factory(_context, request):
         default_authority=request.default_authority,
         group_scope_service=group_scope_service,
     )
+
+
+@sa.event.listens_for(Session, "after_flush")
+def _invalidate_world_group(session, _flush_context):
+    """Invalidate the cached world group of any authority a flush changed it for."""
+    authorities = {
+        obj.authority
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, models.Group) and obj.pubid == "__world__"
+    }
+
+    if authorities:
+        cache.invalidate_after_commit(session, WORLD_GROUP_CACHE.name, authorities)
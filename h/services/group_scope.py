@@ -1,6 +1,22 @@
-from h.models import GroupScope
+from collections import namedtuple
+from itertools import chain
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import NO_VALUE
+
+from h import cache
+from h.cache import TTLCache
+from h.models import Group, GroupScope
 from h.util import group_scope as scope_util
 
+#: A scope from the cached index, with the same attributes as its `GroupScope`
+IndexedScope = namedtuple("IndexedScope", ["group_id", "scope"])
+
+# Cache of origins to a dict of their scope URLs and the `IndexedScope`s for
+# each. Origins without any scopes are cached too, as most URLs have none.
+SCOPE_INDEX_CACHE = TTLCache("group_scopes", maxsize=10000, ttl=300)
+
 
 class GroupScopeService:
     def __init__(self, session):
@@ -8,24 +24,79 @@ class GroupScopeService:
 
     def fetch_by_scope(self, url):
         """
-        Return GroupScope records that match the given URL.
+        Return the scopes that match the given URL.
+
+        The scopes of each origin are cached in the process, so this doesn't
+        usually need to query the DB.
 
         :arg url: URL to find matching scopes for
         :type url: str
-        :rtype: list(:class:`~h.models.group_scope.GroupScope`)
+        :rtype: list(:class:`IndexedScope`)
         """
         origin = scope_util.parse_origin(url)
         if not origin:
             return []
-        origin_scopes = (
-            self._session.query(GroupScope).filter(GroupScope.origin == origin).all()
-        )
+
         return [
-            scope
-            for scope in origin_scopes
-            if scope_util.url_in_scope(url, [scope.scope])
+            indexed_scope
+            for scope_url, indexed_scopes in self._scope_index(origin).items()
+            if url.startswith(scope_url)
+            for indexed_scope in indexed_scopes
         ]
 
+    def _scope_index(self, origin):
+        index = SCOPE_INDEX_CACHE.get(origin)
+
+        if index is TTLCache.MISSING:
+            index = {}
+            for scope in self._session.query(GroupScope).filter(
+                GroupScope.origin == origin
+            ):
+                # Paths like "//example.com" take the scope URL to a different
+                # origin, so it can never match
+                if scope_util.parse_origin(scope.scope) != origin:
+                    continue
+
+                index.setdefault(scope.scope, []).append(
+                    IndexedScope(scope.group_id, scope.scope)
+                )
+
+            SCOPE_INDEX_CACHE.set(origin, index)
+
+        return index
+
 
 def group_scope_factory(_context, request):
     return GroupScopeService(session=request.db)
+
+
+@sa.event.listens_for(Session, "after_flush")
+def _invalidate_scope_index(session, _flush_context):
+    """Invalidate the cached scopes of any origins a flush changed."""
+    origins = set()
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, GroupScope):
+            scopes = [obj]
+        elif isinstance(obj, Group) and obj in session.deleted:
+            # Deleting a group deletes its scopes in the DB too
+            scopes = sa.inspect(obj).attrs.scopes.loaded_value
+        else:
+            continue
+
+        if scopes is NO_VALUE:
+            cache.invalidate_after_commit(session, SCOPE_INDEX_CACHE.name)
+            return
+
+        for scope in scopes:
+            # pylint:disable=protected-access
+            scope_origins = sa.inspect(scope).attrs._origin.history.sum()
+            if not scope_origins:
+                # We can't tell which origin it was in without a query
+                cache.invalidate_after_commit(session, SCOPE_INDEX_CACHE.name)
+                return
+
+            origins.update(scope_origins)
+
+    if origins:
+        cache.invalidate_after_commit(session, SCOPE_INDEX_CACHE.name, origins)
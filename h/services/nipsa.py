@@ -1,5 +1,15 @@
+from itertools import chain
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from h import cache
+from h.cache import TTLCache
 from h.models import User
 
+# Cache of a frozenset of the userids of every flagged user, under the key "all"
+NIPSA_CACHE = TTLCache("nipsa", maxsize=1, ttl=300)
+
 
 class NipsaService:
     """A service which provides access to the state of "not-in-public-site-areas" (NIPSA) flags on userids."""
@@ -8,39 +18,39 @@ class NipsaService:
         self.session = session
         self._get_search_index = get_search_index
 
-        # Cache of all userids which have been flagged.
+        # The flagged userids including any changes made with this service,
+        # which aren't in `NIPSA_CACHE` until they're committed.
         self._flagged_userids = None
 
     def fetch_all_flagged_userids(self):
         """
         Fetch the userids of all shadowbanned / NIPSA'd users.
 
-        The set of userids is cached to speed up subsequent `flagged_userids`
-        and `is_flagged` calls in the same request.
+        The set of userids is cached in the process, so this and
+        `is_flagged()` don't usually need to query the DB.
 
-        :rtype: set of unicode strings
+        :rtype: frozenset of unicode strings
         """
         if self._flagged_userids is not None:
             return self._flagged_userids
 
-        # Filter using `is_` to match the index predicate for `User.nipsa`.
-        query = self.session.query(User).filter(User.nipsa.is_(True))
-        self._flagged_userids = {u.userid for u in query}
+        flagged_userids = NIPSA_CACHE.get("all")
 
-        return self._flagged_userids
+        if flagged_userids is TTLCache.MISSING:
+            # Filter using `is_` to match the index predicate for `User.nipsa`.
+            query = self.session.query(User.username, User.authority).filter(
+                User.nipsa.is_(True)
+            )
+            flagged_userids = frozenset(
+                f"acct:{username}@{authority}" for username, authority in query
+            )
+            NIPSA_CACHE.set("all", flagged_userids)
+
+        return flagged_userids
 
     def is_flagged(self, userid):
         """Return whether the given userid is flagged as "NIPSA"."""
-
-        # Use the cache if populated.
-        if self._flagged_userids is not None:
-            return userid in self._flagged_userids
-
-        # Otherwise lookup the status for a single user, which is more efficient
-        # than populating the cache if we are only looking up the NIPSA status
-        # for a small number of users in a given task/request.
-        user = self.session.query(User).filter_by(userid=userid).one_or_none()
-        return user and user.nipsa
+        return userid in self.fetch_all_flagged_userids()
 
     def flag(self, user):
         """
@@ -51,8 +61,7 @@ class NipsaService:
         message for the user will still be published to the queue).
         """
         user.nipsa = True
-        if self._flagged_userids is not None:
-            self._flagged_userids.add(user.userid)
+        self._flagged_userids = self.fetch_all_flagged_userids() | {user.userid}
         self._reindex_users_annotations(user, tag="NipsaService.flag")
 
     def unflag(self, user):
@@ -64,12 +73,11 @@ class NipsaService:
         queue).
         """
         user.nipsa = False
-        if self._flagged_userids is not None:
-            self._flagged_userids.remove(user.userid)
+        self._flagged_userids = self.fetch_all_flagged_userids() - {user.userid}
         self._reindex_users_annotations(user, tag="NipsaService.unflag")
 
     def clear(self):
-        """Unload the cache of flagged userids, if populated."""
+        """Forget any uncommitted changes made with this service."""
         self._flagged_userids = None
 
     def _reindex_users_annotations(self, user, tag):
@@ -93,3 +101,32 @@ def nipsa_factory(_context, request):
         return request.find_service(name="search_index")
 
     return NipsaService(request.db, get_search_index)
+
+
+@sa.event.listens_for(Session, "after_flush")
+def _invalidate_flagged_userids(session, _flush_context):
+    """Invalidate the cached flagged userids if a flush changed any of them."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, User):
+            continue
+
+        attrs = sa.inspect(obj).attrs
+        # Only users who are or were flagged can change the set. If `nipsa`
+        # isn't loaded for an existing user (e.g. it expired on commit) we
+        # can't tell, so assume that they might be. New users are only
+        # flagged if it was set explicitly.
+        nipsa = attrs.nipsa.history.sum()
+        if (True in nipsa or (not nipsa and obj not in session.new)) and (
+            obj in session.new
+            or obj in session.deleted
+            or any(
+                attr.history.has_changes()
+                for attr in (
+                    attrs.nipsa,
+                    attrs._username,  # pylint: disable=protected-access
+                    attrs.authority,
+                )
+            )
+        ):
+            cache.invalidate_after_commit(session, NIPSA_CACHE.name)
+            return
@@ -1,4 +1,12 @@
+import logging
+
+import sqlalchemy as sa
+
 from h import models
+from h.services.auth_cookie import invalidate_tickets_after_commit
+from h.services.auth_token import invalidate_tokens_after_commit
+
+log = logging.getLogger(__name__)
 
 
 class UserRenameError(Exception):
@@ -23,6 +31,9 @@ class RenameUserService:
     UserRenameError if the new username is already taken by another account.
     """
 
+    BATCH_SIZE = 1000
+    """The number of annotations to update at a time in `rename()`."""
+
     def __init__(self, session, search_index):
         self.session = session
         self._search_index = search_index
@@ -57,35 +68,80 @@ class RenameUserService:
         self._update_tokens(old_userid, new_userid)
 
         self._change_annotations(old_userid, new_userid)
-        self._search_index.add_users_annotations(
-            old_userid,
-            tag="RenameUserService.rename",
-            schedule_in=30,
+
+        # Queue the annotations in the same transaction as they're renamed in,
+        # so the job sees the new userids and syncs them to Elasticsearch
+        self._search_index.queue_users_annotations(
+            new_userid, tag="RenameUserService.rename"
         )
 
     def _purge_auth_tickets(self, user):
-        self.session.query(models.AuthTicket).filter(
-            models.AuthTicket.user_id == user.id
-        ).delete()
+        ticket_ids = (
+            self.session.execute(
+                sa.delete(models.AuthTicket)
+                .where(models.AuthTicket.user_id == user.id)
+                .returning(models.AuthTicket.id)
+            )
+            .scalars()
+            .all()
+        )
 
-    def _update_tokens(self, old_userid, new_userid):
-        self.session.query(models.Token).filter(
-            models.Token.userid == old_userid
-        ).update({"userid": new_userid}, synchronize_session="fetch")
+        # Stop other processes from accepting the purged tickets from cache
+        invalidate_tickets_after_commit(self.session, ticket_ids)
 
-    def _change_annotations(self, old_userid, new_userid):
-        annotations = self._fetch_annotations(old_userid)
+    def _update_tokens(self, old_userid, new_userid):
+        token_strs = (
+            self.session.execute(
+                sa.update(models.Token)
+                .where(models.Token.userid == old_userid)
+                .values(userid=new_userid)
+                .returning(models.Token.value)
+                .execution_options(synchronize_session="evaluate")
+            )
+            .scalars()
+            .all()
+        )
 
-        for annotation in annotations:
-            annotation.userid = new_userid
+        # A bulk update doesn't go through the flush which would usually do this
+        invalidate_tokens_after_commit(self.session, token_strs)
 
-    def _fetch_annotations(self, userid):
-        return (
-            self.session.query(models.Annotation)
-            .filter(models.Annotation.userid == userid)
-            .yield_per(100)
+    def _change_annotations(self, old_userid, new_userid):
+        """
+        Change the userid of a user's annotations.
+
+        The annotations are updated by the DB a batch of `BATCH_SIZE` at a
+        time, without loading them, so each statement does a bounded amount of
+        work and the progress can be logged as it goes.
+
+        The batches all run in the caller's transaction, so this doesn't
+        shorten how long the rows are locked: every renamed annotation stays
+        locked until that transaction commits. That's deliberate, as the
+        rename of the user and of their annotations succeeds or fails as one.
+        """
+        if old_userid == new_userid:
+            # There's nothing to change, and we'd never run out of annotations
+            return
+
+        batch = (
+            sa.select(models.Annotation.id)
+            .where(models.Annotation.userid == old_userid)
+            .limit(self.BATCH_SIZE)
+            .scalar_subquery()
+        )
+        query = (
+            sa.update(models.Annotation)
+            .where(models.Annotation.id.in_(batch))
+            .values(userid=new_userid)
+            .execution_options(synchronize_session="fetch")
         )
 
+        total = 0
+        while updated := self.session.execute(query).rowcount:
+            total += updated
+            log.info(
+                "renamed %d annotations from %s to %s", total, old_userid, new_userid
+            )
+
 
 def rename_user_factory(_context, request):
     """Return a RenameUserService instance for the passed context and request."""
@@ -1,5 +1,8 @@
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from time import perf_counter
 
 from dateutil.parser import isoparse
 from sqlalchemy import and_, func, literal_column, select
@@ -25,13 +28,21 @@ class Queue:
         SYNCED_MISSING = "Synced/{tag}/Missing_from_Elastic"
         SYNCED_DIFFERENT = "Synced/{tag}/Different_in_Elastic"
         SYNCED_FORCED = "Synced/{tag}/Forced"
+        SYNCED_DELETED = "Synced/{tag}/Deleted_from_db"
         SYNCED_TAG_TOTAL = "Synced/{tag}/Total"
         SYNCED_TOTAL = "Synced/Total"
         COMPLETED_UP_TO_DATE = "Completed/{tag}/Up_to_date_in_Elastic"
         COMPLETED_DELETED = "Completed/{tag}/Deleted_from_db"
         COMPLETED_FORCED = "Completed/{tag}/Forced"
+        COMPLETED_SYNCED = "Completed/{tag}/Synced_to_Elastic"
         COMPLETED_TAG_TOTAL = "Completed/{tag}/Total"
         COMPLETED_TOTAL = "Completed/Total"
+        FAILED_TAG_TOTAL = "Failed/{tag}/Total"
+        FAILED_TOTAL = "Failed/Total"
+        DURATION = "Duration/{stage}"
+
+    BATCH_SIZE = 500
+    """The number of jobs to check and index at a time in `sync()`."""
 
     def __init__(self, db, es, batch_indexer):
         self._db = db
@@ -138,36 +149,80 @@ class Queue:
           remove the job from the queue
 
         * If the annotation is missing from Elastic or different in Elastic
-          than in the DB then re-sync the annotation into Elastic. Leave the
-          job on the queue to be re-checked and removed the next time the
-          method runs.
+          than in the DB then re-sync the annotation into Elastic and remove
+          the job from the queue once Elastic has confirmed the write. Jobs
+          whose annotations fail to index are left on the queue to be retried.
+
+        The jobs are processed in batches of `BATCH_SIZE`. The annotations of
+        every batch are looked up in Elastic in a background thread while
+        earlier batches are checked against the DB and indexed.
+
+        :return: A dict of counts of the `Queue.Result`s and the time spent in
+            each stage of the sync (`Queue.Result.DURATION`), in seconds
         """
-        jobs = self._get_jobs_from_queue(limit)
+        durations = defaultdict(float)
+
+        with self._timed(durations, "Fetch_jobs"):
+            jobs = self._get_jobs_from_queue(limit)
 
         if not jobs:
             return {}
 
         counts = defaultdict(set)
+        batches = [
+            jobs[i : i + self.BATCH_SIZE] for i in range(0, len(jobs), self.BATCH_SIZE)
+        ]
+
+        with ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sync-annotations"
+        ) as executor:
+            es_lookups = [
+                executor.submit(
+                    self._timed_call,
+                    durations,
+                    "Fetch_from_Elastic",
+                    self._get_annotations_from_es,
+                    self._ids_to_check(batch),
+                )
+                for batch in batches
+            ]
 
-        annotation_ids = {
-            URLSafeUUID.hex_to_url_safe(job.kwargs["annotation_id"])
-            for job in jobs
-            if not job.kwargs.get("force", False)
+            for batch, es_lookup in zip(batches, es_lookups):
+                self._sync_batch(batch, es_lookup, counts, durations)
+
+        return {
+            **{key: len(value) for key, value in counts.items()},
+            **{
+                Queue.Result.DURATION.format(stage=stage): round(duration, 3)
+                for stage, duration in durations.items()
+            },
         }
-        if annotation_ids:
-            annotations_from_db = self._get_annotations_from_db(annotation_ids)
-            annotations_from_es = self._get_annotations_from_es(annotation_ids)
-        else:
-            annotations_from_db = {}
-            annotations_from_es = {}
+
+    def _sync_batch(self, jobs, es_lookup, counts, durations):
+        # pylint:disable=too-many-branches
+        annotation_ids = self._ids_to_check(jobs)
+
+        with self._timed(durations, "Fetch_from_db"):
+            if annotation_ids:
+                annotations_from_db = self._get_annotations_from_db(annotation_ids)
+            else:
+                annotations_from_db = {}
+
+        with self._timed(durations, "Wait_for_Elastic"):
+            annotations_from_es = es_lookup.result()
 
         # Completed jobs that can be removed from the queue.
         job_complete = []
 
-        # IDs of annotations to (re-)add to Elasticsearch because they're
+        # Jobs for annotations to (re-)add to Elasticsearch because they're
         # either missing from Elasticsearch or are different in Elasticsearch
-        # than in the DB.
-        annotation_ids_to_sync = set()
+        # than in the DB. They are complete once the annotation is indexed.
+        jobs_to_sync = []
+
+        # Jobs for annotations which have been deleted from the DB but not
+        # from Elasticsearch. They are complete once the annotation is marked
+        # as deleted in Elasticsearch.
+        jobs_to_delete = []
 
         for job in jobs:
             annotation_id = URLSafeUUID.hex_to_url_safe(job.kwargs["annotation_id"])
@@ -175,41 +230,36 @@ class Queue:
             annotation_from_es = annotations_from_es.get(annotation_id)
 
             if job.kwargs.get("force", False):
-                annotation_ids_to_sync.add(annotation_id)
-                job_complete.append(job)
+                jobs_to_sync.append(job)
                 counts[Queue.Result.SYNCED_FORCED.format(tag=job.tag)].add(
                     annotation_id
                 )
-                counts[Queue.Result.SYNCED_TAG_TOTAL.format(tag=job.tag)].add(
-                    annotation_id
-                )
-                counts[Queue.Result.SYNCED_TOTAL].add(annotation_id)
-                counts[Queue.Result.COMPLETED_FORCED.format(tag=job.tag)].add(job.id)
-                counts[Queue.Result.COMPLETED_TAG_TOTAL.format(tag=job.tag)].add(job.id)
-                counts[Queue.Result.COMPLETED_TOTAL].add(job.id)
             elif not annotation_from_db:
-                job_complete.append(job)
-                counts[Queue.Result.COMPLETED_DELETED.format(tag=job.tag)].add(job.id)
-                counts[Queue.Result.COMPLETED_TAG_TOTAL.format(tag=job.tag)].add(job.id)
-                counts[Queue.Result.COMPLETED_TOTAL].add(job.id)
+                if annotation_from_es and not annotation_from_es.get("deleted"):
+                    jobs_to_delete.append(job)
+                    counts[Queue.Result.SYNCED_DELETED.format(tag=job.tag)].add(
+                        annotation_id
+                    )
+                else:
+                    job_complete.append(job)
+                    counts[Queue.Result.COMPLETED_DELETED.format(tag=job.tag)].add(
+                        job.id
+                    )
+                    counts[Queue.Result.COMPLETED_TAG_TOTAL.format(tag=job.tag)].add(
+                        job.id
+                    )
+                    counts[Queue.Result.COMPLETED_TOTAL].add(job.id)
+                    continue
             elif not annotation_from_es:
-                annotation_ids_to_sync.add(annotation_id)
+                jobs_to_sync.append(job)
                 counts[Queue.Result.SYNCED_MISSING.format(tag=job.tag)].add(
                     annotation_id
                 )
-                counts[Queue.Result.SYNCED_TAG_TOTAL.format(tag=job.tag)].add(
-                    annotation_id
-                )
-                counts[Queue.Result.SYNCED_TOTAL].add(annotation_id)
             elif not self._equal(annotation_from_es, annotation_from_db):
-                annotation_ids_to_sync.add(annotation_id)
+                jobs_to_sync.append(job)
                 counts[Queue.Result.SYNCED_DIFFERENT.format(tag=job.tag)].add(
                     annotation_id
                 )
-                counts[Queue.Result.SYNCED_TAG_TOTAL.format(tag=job.tag)].add(
-                    annotation_id
-                )
-                counts[Queue.Result.SYNCED_TOTAL].add(annotation_id)
             else:
                 job_complete.append(job)
                 counts[Queue.Result.COMPLETED_UP_TO_DATE.format(tag=job.tag)].add(
@@ -217,14 +267,108 @@ class Queue:
                 )
                 counts[Queue.Result.COMPLETED_TAG_TOTAL.format(tag=job.tag)].add(job.id)
                 counts[Queue.Result.COMPLETED_TOTAL].add(job.id)
+                continue
+
+            counts[Queue.Result.SYNCED_TAG_TOTAL.format(tag=job.tag)].add(annotation_id)
+            counts[Queue.Result.SYNCED_TOTAL].add(annotation_id)
+
+        if jobs_to_sync:
+            with self._timed(durations, "Index"):
+                errored = self._batch_indexer.index(self._annotation_ids(jobs_to_sync))
+
+            job_complete.extend(
+                self._completed_jobs(
+                    jobs_to_sync,
+                    errored,
+                    counts,
+                    lambda job: Queue.Result.COMPLETED_FORCED
+                    if job.kwargs.get("force", False)
+                    else Queue.Result.COMPLETED_SYNCED,
+                )
+            )
+
+        if jobs_to_delete:
+            with self._timed(durations, "Delete_from_Elastic"):
+                errored = self._batch_indexer.delete(
+                    self._annotation_ids(jobs_to_delete)
+                )
 
-        for job in job_complete:
-            self._db.delete(job)
+            job_complete.extend(
+                self._completed_jobs(
+                    jobs_to_delete,
+                    errored,
+                    counts,
+                    lambda _job: Queue.Result.COMPLETED_DELETED,
+                )
+            )
+
+        with self._timed(durations, "Delete_jobs"):
+            self._delete_jobs(job_complete)
+
+    @staticmethod
+    def _annotation_ids(jobs):
+        """Return the distinct IDs of the annotations of `jobs`."""
+        return list(
+            {URLSafeUUID.hex_to_url_safe(job.kwargs["annotation_id"]) for job in jobs}
+        )
+
+    @staticmethod
+    def _completed_jobs(jobs, errored, counts, result):
+        """
+        Count the results of syncing `jobs` and return the completed ones.
+
+        :param errored: The IDs of the annotations which failed to sync
+        :param result: A function returning the `Queue.Result` of a completed
+            job
+        """
+        completed = []
+
+        for job in jobs:
+            annotation_id = URLSafeUUID.hex_to_url_safe(job.kwargs["annotation_id"])
+
+            if annotation_id in errored:
+                counts[Queue.Result.FAILED_TAG_TOTAL.format(tag=job.tag)].add(job.id)
+                counts[Queue.Result.FAILED_TOTAL].add(job.id)
+                continue
+
+            completed.append(job)
+            counts[result(job).format(tag=job.tag)].add(job.id)
+            counts[Queue.Result.COMPLETED_TAG_TOTAL.format(tag=job.tag)].add(job.id)
+            counts[Queue.Result.COMPLETED_TOTAL].add(job.id)
 
-        if annotation_ids_to_sync:
-            self._batch_indexer.index(list(annotation_ids_to_sync))
+        return completed
 
-        return {key: len(value) for key, value in counts.items()}
+    @staticmethod
+    def _ids_to_check(jobs):
+        """Return the IDs of the annotations to compare in the DB and Elastic."""
+        return {
+            URLSafeUUID.hex_to_url_safe(job.kwargs["annotation_id"])
+            for job in jobs
+            if not job.kwargs.get("force", False)
+        }
+
+    @staticmethod
+    @contextmanager
+    def _timed(durations, stage):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            durations[stage] += perf_counter() - start
+
+    @classmethod
+    def _timed_call(cls, durations, stage, func, *args):
+        with cls._timed(durations, stage):
+            return func(*args)
+
+    def _delete_jobs(self, jobs):
+        if not jobs:
+            return
+
+        self._db.execute(
+            Job.__table__.delete().where(Job.id.in_([job.id for job in jobs]))
+        )
+        mark_changed(self._db)
 
     def _get_jobs_from_queue(self, limit):
         return (
@@ -261,21 +405,27 @@ class Queue:
         }
 
     def _get_annotations_from_es(self, annotation_ids):
-        hits = self._es.conn.search(
-            body={
-                "_source": ["updated", "user"],
-                "query": {"ids": {"values": list(annotation_ids)}},
-                "size": len(annotation_ids),
-            },
+        if not annotation_ids:
+            return {}
+
+        docs = self._es.conn.mget(
+            body={"ids": list(annotation_ids)},
             index=self._es.index,
-        )["hits"]["hits"]
+            doc_type=self._es.mapping_type,
+            _source=["updated", "user", "deleted"],
+        )["docs"]
+
+        annotations = {}
+        for doc in docs:
+            if not doc.get("found"):
+                continue
 
-        for hit in hits:
-            updated = hit["_source"].get("updated")
+            updated = doc["_source"].get("updated")
             updated = isoparse(updated).replace(tzinfo=None) if updated else None
-            hit["_source"]["updated"] = updated
+            doc["_source"]["updated"] = updated
+            annotations[doc["_id"]] = doc["_source"]
 
-        return {hit["_id"]: hit["_source"] for hit in hits}
+        return annotations
 
     @staticmethod
     def _equal(annotation_from_es, annotation_from_db):
@@ -95,6 +95,23 @@ class SearchIndexService:
             groupid, tag, force=force, schedule_in=schedule_in
         )
 
+    def queue_users_annotations(self, userid, tag, force=False):
+        """
+        Queue all of a user's annotations to be synced in this transaction.
+
+        Unlike `add_users_annotations()` the job is written to the queue in
+        the current DB transaction, so it's only kept if that commits.
+        """
+        self._queue.add_by_user(userid, tag, force=force)
+
+    def queue_group_annotations(self, groupid, tag, force=False):
+        """
+        Queue all annotations in a group to be synced in this transaction.
+
+        See `queue_users_annotations()`.
+        """
+        self._queue.add_by_group(groupid, tag, force=force)
+
     def delete_annotation_by_id(self, annotation_id, refresh=False):
         """
         Mark an annotation as deleted in the search index.
@@ -14,6 +14,7 @@ def create_app(_global_config, **settings):
     # Override the default authentication policy.
     config.set_security_policy(BearerTokenPolicy())
 
+    config.include("h.cache")
     config.include("h.db")
     config.include("h.session")
     config.include("h.services")
@@ -1,3 +1,6 @@
+import weakref
+from collections import defaultdict
+
 from h import storage
 from h.util.uri import normalize as normalize_uri
 
@@ -28,56 +31,83 @@ FILTER_SCHEMA = {
 class SocketFilter:
     KNOWN_FIELDS = {"/id", "/group", "/uri", "/references"}
 
+    # Per-worker inverted index of `(field, value)` filter rows to the sockets
+    # which subscribed to them. This is maintained by `set_filter()` and
+    # `remove()` so `matching()` only has to look at candidate sockets rather
+    # than every connected one.
+    _index = defaultdict(weakref.WeakSet)
+
     @classmethod
-    def matching(cls, sockets, annotation, session):
+    def matching(cls, annotation, session, expanded_uris=None):
         """
         Find sockets with matching filters for the given annotation.
 
         For this to work, the sockets must have first had `set_filter()` called
         on them.
 
-        :param sockets: Iterable of sockets to check
         :param annotation: Annotation to match
         :param session: DB session
+        :param expanded_uris: Normalized expansion of the annotation's target
+            URI if already known (see `h.storage.expand_uris()`)
 
         :return: A generator of matching socket objects
         """
+        if expanded_uris is None:
+            # Expand the URI to ensure we match any variants of it. This should
+            # match the normalization when searching (see `h.search.query`)
+            expanded_uris = storage.expand_uri(
+                session, annotation.target_uri, normalized=True
+            )
 
         values = {
             "/id": [annotation.id],
             "/group": [annotation.groupid],
-            # Expand the URI to ensure we match any variants of it. This should
-            # match the normalization when searching (see `h.search.query`)
-            "/uri": set(
-                storage.expand_uri(session, annotation.target_uri, normalized=True)
-            ),
+            "/uri": set(expanded_uris),
             "/references": set(annotation.references),
         }
 
-        for socket in sockets:
-            # Some sockets might not yet have the filter applied (or had a non
-            # parsable filter etc.)
-            if not hasattr(socket, "filter_rows"):
-                continue
+        # Gather the candidates up front, as the index can change while we are
+        # sending to the sockets we yield
+        matched = set()
+        for field, field_values in values.items():
+            for value in field_values:
+                sockets = cls._index.get((field, value))
+                if sockets:
+                    matched.update(sockets)
 
-            # Iterate over the filter_rows added by `set_filter()`
-            for field, value in socket.filter_rows:
-                try:  # pylint: disable=too-many-try-statements
-                    if value in values[field]:
-                        yield socket
-                        break
-                except KeyError:
-                    continue
+        yield from matched
 
     @classmethod
     def set_filter(cls, socket, filter_):
         """
         Add filtering information to a socket for use with `matching()`.
 
+        Any filter previously set on the socket is replaced.
+
         :param socket: Socket to add filtering information too
         :param filter_: Filter JSON to process
         """
+        cls.remove(socket)
+
         socket.filter_rows = tuple(cls._rows_for(filter_))
+        for row in socket.filter_rows:
+            cls._index[row].add(socket)
+
+    @classmethod
+    def remove(cls, socket):
+        """
+        Remove a socket's filtering information from the index.
+
+        :param socket: Socket to stop matching
+        """
+        for row in getattr(socket, "filter_rows", ()):
+            sockets = cls._index.get(row)
+            if sockets is None:
+                continue
+
+            sockets.discard(socket)
+            if not sockets:
+                del cls._index[row]
 
     @classmethod
     def _rows_for(cls, filter_):
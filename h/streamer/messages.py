@@ -1,10 +1,11 @@
 import logging
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from itertools import chain
 
 from gevent.queue import Full
+from sqlalchemy.orm import subqueryload
 
-from h import realtime, storage
+from h import models, realtime, storage
 from h.realtime import Consumer
 from h.security import Permission, identity_permits
 from h.streamer import websocket
@@ -50,12 +51,9 @@ def handle_message(message, registry, session, topic_handlers):
     """
     Deserialize and process a message from the reader.
 
-    For each message, `handler` is called with the deserialized message and a
-    single :py:class:`h.streamer.WebSocket` instance, and should return the
-    message to be sent to the client on that socket. The handler can return
-    `None`, to signify that no message should be sent, or a JSON-serializable
-    object. It is assumed that there is a 1:1 request-reply mapping between
-    incoming messages and messages to be sent out over the websockets.
+    For each message, `handler` is called with the deserialized message, the
+    request and the DB session. Handlers are responsible for finding the
+    :py:class:`h.streamer.WebSocket` instances the message should be sent to.
     """
     try:
         handler = topic_handlers[message.topic]
@@ -64,49 +62,133 @@ def handle_message(message, registry, session, topic_handlers):
             f"Don't know how to handle message from topic: {message.topic}"
         ) from err
 
-    # N.B. We iterate over a non-weak list of instances because there's nothing
-    # to stop connections being added or dropped during iteration, and if that
-    # happens Python will throw a "Set changed size during iteration" error.
-    sockets = list(websocket.WebSocket.instances)
-
     # The `prepare` function sets the active registry which is an implicit
     # dependency of some of the authorization logic used to look up annotation
     # and group permissions.
     with request_context(registry) as request:
-        handler(message.payload, sockets, request, session)
+        handler(message.payload, request, session)
 
 
-def handle_user_event(message, sockets, _request, _session):
+def handle_user_event(message, _request, _session):
     # for session state change events, the full session model
     # is included so that clients can update themselves without
     # further API requests
 
     reply = None
 
-    for socket in sockets:
+    # N.B. We iterate over a non-weak list of instances because there's nothing
+    # to stop connections being added or dropped during iteration, and if that
+    # happens Python will throw a "Set changed size during iteration" error.
+    for socket in list(websocket.WebSocket.instances):
         if not socket.identity or socket.identity.user.userid != message["userid"]:
             continue
 
         if reply is None:
-            reply = {
-                "type": "session-change",
-                "action": message["type"],
-                "model": message["session_model"],
-            }
+            reply = websocket.encode_json(
+                {
+                    "type": "session-change",
+                    "action": message["type"],
+                    "model": message["session_model"],
+                }
+            )
+
+        socket.send_encoded(reply)
+
+
+def handle_annotation_event(message, request, session):
+    if message["action"] == "bulk-delete":
+        annotations = storage.fetch_ordered_annotations(
+            session,
+            message["annotation_ids"],
+            query_processor=_eager_load_annotation_relations,
+        )
+        _notify_annotations_deleted(message, annotations, request, session)
+        return
+
+    annotation = storage.fetch_annotation(session, message["annotation_id"])
+
+    _notify_annotation_event(message, annotation, request, session)
+
+
+def handle_annotation_events(messages_, registry, session):
+    """
+    Process a batch of annotation event messages from the reader.
+
+    This has the same effect as calling `handle_message()` for each message,
+    but loads the annotations, their documents and URI expansions for the
+    whole batch in a fixed number of queries.
+    """
+    payloads = [message.payload for message in messages_]
+
+    annotations = {
+        annotation.id: annotation
+        for annotation in storage.fetch_ordered_annotations(
+            session,
+            list(chain.from_iterable(_annotation_ids(payload) for payload in payloads)),
+            query_processor=_eager_load_annotation_relations,
+        )
+    }
+    expanded_uris = storage.expand_uris(
+        session,
+        {annotation.target_uri for annotation in annotations.values()},
+        normalized=True,
+    )
+
+    with request_context(registry) as request:
+        for payload in payloads:
+            if payload["action"] == "bulk-delete":
+                _notify_annotations_deleted(
+                    payload,
+                    [
+                        annotations[annotation_id]
+                        for annotation_id in payload["annotation_ids"]
+                        if annotation_id in annotations
+                    ],
+                    request,
+                    session,
+                    expanded_uris=expanded_uris,
+                )
+                continue
+
+            annotation = annotations.get(payload["annotation_id"])
+
+            _notify_annotation_event(
+                payload,
+                annotation,
+                request,
+                session,
+                expanded_uris=expanded_uris.get(annotation.target_uri)
+                if annotation
+                else None,
+            )
+
 
-        socket.send_json(reply)
+def _annotation_ids(payload):
+    if payload["action"] == "bulk-delete":
+        return payload["annotation_ids"]
 
+    return [payload["annotation_id"]]
 
-def handle_annotation_event(message, sockets, request, session):
-    id_ = message["annotation_id"]
-    annotation = storage.fetch_annotation(session, id_)
 
+def _eager_load_annotation_relations(query):
+    return query.options(
+        subqueryload(models.Annotation.document), subqueryload(models.Annotation.group)
+    )
+
+
+def _notify_annotation_event(  # pylint:disable=too-many-arguments
+    message, annotation, request, session, expanded_uris=None
+):
     if annotation is None:
-        log.warning("received annotation event for missing annotation: %s", id_)
+        log.warning(
+            "received annotation event for missing annotation: %s",
+            message["annotation_id"],
+        )
         return
 
-    # Find connected clients which are interested in this annotation.
-    matching_sockets = SocketFilter.matching(sockets, annotation, session)
+    matching_sockets = _sockets_to_notify(
+        message, annotation, request, session, expanded_uris=expanded_uris
+    )
 
     try:
         # Check to see if the generator has any items
@@ -115,17 +197,69 @@ def handle_annotation_event(message, sockets, request, session):
         # Nothing matched
         return
 
-    # Create a generator which has the first socket back again
-    matching_sockets = chain(  # pylint: disable=redefined-variable-type
-        (first_socket,), matching_sockets
+    # Serialize the reply once, and send the same frame to every socket
+    reply = websocket.encode_json(
+        _generate_annotation_event(request, message, annotation)
+    )
+
+    for socket in chain((first_socket,), matching_sockets):
+        socket.send_encoded(reply)
+
+
+def _notify_annotations_deleted(
+    message, annotations, request, session, expanded_uris=None
+):
+    """
+    Notify clients of many deleted annotations at once.
+
+    Each client is sent a single notification listing every one of the
+    deleted annotations that it's allowed to know about.
+    """
+    deleted_ids = defaultdict(list)
+
+    for annotation in annotations:
+        for socket in _sockets_to_notify(
+            message,
+            annotation,
+            request,
+            session,
+            expanded_uris=expanded_uris.get(annotation.target_uri)
+            if expanded_uris
+            else None,
+        ):
+            deleted_ids[socket].append({"id": annotation.id})
+
+    for socket, payload in deleted_ids.items():
+        socket.send_encoded(
+            websocket.encode_json(
+                {
+                    "type": "annotation-notification",
+                    "options": {"action": "delete"},
+                    "payload": payload,
+                }
+            )
+        )
+
+
+def _sockets_to_notify(message, annotation, request, session, expanded_uris):
+    """Yield the connected clients which should be told about an annotation."""
+
+    # Find connected clients which are interested in this annotation.
+    matching_sockets = SocketFilter.matching(
+        annotation, session, expanded_uris=expanded_uris
     )
 
-    reply = _generate_annotation_event(request, message, annotation)
+    try:
+        # Check to see if the generator has any items
+        first_socket = next(matching_sockets)
+    except StopIteration:
+        # Nothing matched
+        return
 
     annotator_nipsad = request.find_service(name="nipsa").is_flagged(annotation.userid)
     annotation_context = AnnotationContext(annotation)
 
-    for socket in matching_sockets:
+    for socket in chain((first_socket,), matching_sockets):
         # Don't send notifications back to the person who sent them
         if message["src_client_id"] == socket.client_id:
             continue
@@ -146,7 +280,7 @@ def handle_annotation_event(message, sockets, request, session):
         ):
             continue
 
-        socket.send_json(reply)
+        yield socket
 
 
 def _generate_annotation_event(request, message, annotation):
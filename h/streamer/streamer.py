@@ -1,8 +1,10 @@
 import logging
 import os
 import sys
+import time
 
 import gevent
+from gevent.queue import Empty
 from pyramid.events import ApplicationCreated, subscriber
 
 from h.streamer import db, messages, websocket
@@ -70,12 +72,28 @@ def process_work_queue(registry, queue):
     dispatching them as appropriate. The handling of each message is wrapped in
     code that ensures the database session is appropriately committed and
     closed between messages.
+
+    If the `h.streamer.batch_size` setting is greater than one, consecutive
+    annotation messages are processed together in a single transaction. We
+    wait up to `h.streamer.batch_timeout_ms` for a batch to fill up.
     """
+    settings = registry.settings
+    session = db.get_session(settings)
 
-    session = db.get_session(registry.settings)
+    batch_size = int(settings.get("h.streamer.batch_size", 1))
+    if batch_size > 1:
+        timeout = int(settings.get("h.streamer.batch_timeout_ms", 0)) / 1000
+        batches = _batch_messages(queue, batch_size, timeout)
+    else:
+        batches = ([msg] for msg in queue)
 
-    for msg in queue:
+    for batch in batches:
         with db.read_only_transaction(session):
+            if len(batch) > 1:
+                messages.handle_annotation_events(batch, registry, session)
+                continue
+
+            msg = batch[0]
             if isinstance(msg, messages.Message):
                 messages.handle_message(msg, registry, session, TOPIC_HANDLERS)
             elif isinstance(msg, websocket.Message):
@@ -84,6 +102,44 @@ def process_work_queue(registry, queue):
                 raise UnknownMessageType(repr(msg))
 
 
+def _batch_messages(queue, batch_size, timeout):
+    """
+    Yield lists of messages from the queue in the order they were added.
+
+    Consecutive annotation messages are grouped into lists of up to
+    `batch_size`, waiting up to `timeout` seconds for more to arrive. All other
+    messages are yielded on their own.
+    """
+    pending = None
+
+    while True:
+        msg = queue.get() if pending is None else pending
+        pending = None
+        batch = [msg]
+
+        if _is_annotation_message(msg):
+            deadline = time.monotonic() + timeout
+
+            while len(batch) < batch_size:
+                try:
+                    msg = queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except Empty:
+                    break
+
+                if not _is_annotation_message(msg):
+                    # Keep this for the next batch so we preserve the order
+                    pending = msg
+                    break
+
+                batch.append(msg)
+
+        yield batch
+
+
+def _is_annotation_message(msg):
+    return isinstance(msg, messages.Message) and msg.topic == ANNOTATION_TOPIC
+
+
 def supervise(greenlets):
     try:
         gevent.joinall(greenlets, raise_error=True)
@@ -1,4 +1,3 @@
-import copy
 import json
 import logging
 import weakref
@@ -6,6 +5,7 @@ from collections import namedtuple
 
 import jsonschema
 from gevent.queue import Full
+from ws4py.messaging import TextMessage
 from ws4py.websocket import WebSocket as _WebSocket
 
 from h.streamer.filter import FILTER_SCHEMA, SocketFilter
@@ -30,9 +30,8 @@ class Message(namedtuple("Message", ["socket", "payload"])):
         # Short-circuit if message is missing an ID or has a non-numeric ID.
         if not isinstance(reply_to, (int, float)):
             return
-        data = copy.deepcopy(payload)
-        data["ok"] = ok
-        data["reply_to"] = reply_to
+        # A shallow copy is enough here, as we only serialize the result
+        data = {**payload, "ok": ok, "reply_to": reply_to}
         self.socket.send_json(data)
 
 
@@ -84,9 +83,25 @@ class WebSocket(_WebSocket):
         except KeyError:
             pass
 
+        SocketFilter.remove(self)
+
     def send_json(self, payload):
+        self.send_encoded(encode_json(payload))
+
+    def send_encoded(self, frame):
+        """
+        Send a frame pre-encoded with `encode_json()`.
+
+        This allows the same message to be sent to many sockets while only
+        serializing it once.
+        """
         if not self.terminated:
-            self.send(json.dumps(payload))
+            self._write(frame)
+
+
+def encode_json(payload):
+    """Serialize `payload` to the bytes of a WebSocket text frame."""
+    return TextMessage(json.dumps(payload)).single()
 
 
 def handle_message(message, session=None):
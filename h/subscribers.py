@@ -3,7 +3,7 @@ from kombu.exceptions import OperationalError
 from pyramid.events import BeforeRender, subscriber
 
 from h import __version__, emails, storage
-from h.events import AnnotationEvent
+from h.events import AnnotationEvent, AnnotationsDeletedEvent
 from h.exceptions import RealtimeMessageQueueError
 from h.notification import reply
 from h.tasks import mailer
@@ -64,6 +64,31 @@ def publish_annotation_event(event):
         report_exception(err)
 
 
+#: The most annotation ids to send in one "bulk-delete" realtime message
+BULK_DELETE_CHUNK_SIZE = 1000
+
+
+@subscriber(AnnotationsDeletedEvent)
+def publish_annotations_deleted_event(event):
+    """Publish messages about many deleted annotations to the queue."""
+    # Deleting a big group or user can delete any number of annotations, so
+    # bound the size of each message and the work the streamer does for it
+    annotation_ids = event.annotation_ids
+    for start in range(0, len(annotation_ids), BULK_DELETE_CHUNK_SIZE):
+        data = {
+            "action": "bulk-delete",
+            "annotation_ids": annotation_ids[start : start + BULK_DELETE_CHUNK_SIZE],
+            "src_client_id": event.request.headers.get("X-Client-Id"),
+        }
+        try:
+            event.request.realtime.publish_annotation(data)
+
+        except RealtimeMessageQueueError as err:
+            # The rest won't fit in the queue either
+            report_exception(err)
+            return
+
+
 @subscriber(AnnotationEvent)
 def send_reply_notifications(event):
     """Queue any reply notification emails triggered by an annotation event."""
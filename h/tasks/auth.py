@@ -0,0 +1,33 @@
+# pylint: disable=no-member # Instance of 'Celery' has no 'request' member
+import sqlalchemy as sa
+
+from h import models
+from h.celery import celery, get_task_logger
+
+log = get_task_logger(__name__)
+
+
+@celery.task(acks_late=False)
+def extend_auth_tickets(ticket_ids, expires):
+    """
+    Extend the expiry of a batch of recently used auth tickets.
+
+    Web processes collect the tickets which need extending and send them here
+    in batches, so that page views don't need to write to the DB. Tickets
+    which have expired or been deleted in the meantime are left alone.
+
+    :param ticket_ids: The ids of the tickets to extend
+    :param expires: The new expiry time of the tickets
+    """
+    result = celery.request.db.execute(
+        sa.update(models.AuthTicket)
+        .where(
+            models.AuthTicket.id.in_(ticket_ids),
+            models.AuthTicket.expires > sa.func.now(),
+            models.AuthTicket.expires < expires,
+        )
+        .values(expires=expires)
+        .execution_options(synchronize_session=False)
+    )
+
+    log.info("extended %d of %d auth tickets", result.rowcount, len(ticket_ids))
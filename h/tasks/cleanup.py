@@ -1,14 +1,18 @@
 # pylint: disable=no-member # Instance of 'Celery' has no 'request' member
 from datetime import datetime, timedelta
 
+import newrelic.agent
+import sqlalchemy as sa
+
 from h import models
 from h.celery import celery, get_task_logger
+from h.services.auth_token import invalidate_tokens_after_commit
 
 log = get_task_logger(__name__)
 
 
 @celery.task(acks_late=False)
-def purge_deleted_annotations():
+def purge_deleted_annotations(max_batches=100):
     """
     Remove annotations marked as deleted from the database.
 
@@ -16,11 +20,22 @@ def purge_deleted_annotations():
     buffer period should ensure that this task doesn't delete annotations
     deleted just before the task runs, which haven't yet been processed by the
     streamer.
+
+    The annotations are removed from the DB and Elasticsearch in batches, each
+    in its own transaction, and at most `max_batches` of them are removed per
+    run. Anything left over is removed by later runs.
     """
     cutoff = datetime.utcnow() - timedelta(minutes=10)
-    celery.request.db.query(models.Annotation).filter_by(deleted=True).filter(
-        models.Annotation.updated < cutoff
-    ).delete()
+    purger = celery.request.find_service(name="annotation_purge")
+
+    for metrics in purger.purge(cutoff, max_batches=max_batches):
+        log.info(metrics)
+        newrelic.agent.record_custom_metrics(
+            [
+                (f"Custom/PurgeDeletedAnnotations/{key}", value)
+                for key, value in metrics.items()
+            ]
+        )
 
 
 @celery.task(acks_late=False)
@@ -40,9 +55,18 @@ def purge_expired_authz_codes():
 @celery.task(acks_late=False)
 def purge_expired_tokens():
     now = datetime.utcnow()
-    celery.request.db.query(models.Token).filter(
-        models.Token.expires < now, models.Token.refresh_token_expires < now
-    ).delete()
+    token_strs = (
+        celery.request.db.execute(
+            sa.delete(models.Token)
+            .where(models.Token.expires < now, models.Token.refresh_token_expires < now)
+            .returning(models.Token.value)
+        )
+        .scalars()
+        .all()
+    )
+
+    # A bulk delete doesn't go through the flush which would usually do this
+    invalidate_tokens_after_commit(celery.request.db, token_strs)
 
 
 @celery.task(acks_late=False)
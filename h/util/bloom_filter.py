@@ -0,0 +1,118 @@
+"""A compact probabilistic set which can be snapshotted to a file."""
+import hashlib
+import math
+import mmap
+import os
+import struct
+
+_HEADER = struct.Struct("<8sQIQ")
+_MAGIC = b"HBLOOM01"
+
+
+class BloomFilter:
+    """
+    A set of strings which can give false positives but no false negatives.
+
+    Membership is recorded in a fixed size array of bits, so the filter uses
+    the same memory no matter how many items are added. Adding more items
+    than the filter was sized for makes false positives more likely.
+
+    Filters can be saved to a file and then loaded with `mmap`, so processes
+    which load the same file can share its pages.
+
+    :param num_bits: The size of the filter in bits
+    :param num_hashes: The number of bits to set for each item
+    :param bits: The bits of an existing filter (e.g. from `load()`)
+    :param watermark: An integer recorded alongside the filter in snapshots.
+        Callers can use this to record how up to date the filter is.
+    """
+
+    def __init__(self, num_bits, num_hashes, bits=None, watermark=0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.watermark = watermark
+
+        if bits is None:
+            bits = bytearray(math.ceil(num_bits / 8))
+        self._bits = bits
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        """
+        Create a filter with a given false positive rate at a given size.
+
+        :param capacity: The number of items the filter is expected to hold
+        :param error_rate: The acceptable false positive rate at `capacity`
+        """
+        capacity = max(capacity, 1)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+
+        return cls(num_bits, num_hashes)
+
+    def add(self, item):
+        """Add a string to the filter."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def update(self, items):
+        """Add each of an iterable of strings to the filter."""
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def save(self, path):
+        """
+        Write the filter to `path`, replacing any existing file atomically.
+
+        Processes which have already loaded the old file keep their copy.
+        """
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "wb") as handle:
+            handle.write(
+                _HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.watermark)
+            )
+            handle.write(self._bits)
+
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a filter written by `save()`.
+
+        The file is mapped copy-on-write: its pages are shared between the
+        processes which load it until an `add()` writes to one of them.
+
+        :raise ValueError: if the file isn't a saved filter
+        """
+        with open(path, "rb") as handle:
+            bits = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        if len(bits) < _HEADER.size:
+            raise ValueError(f"{path} is not a bloom filter")
+
+        magic, num_bits, num_hashes, watermark = _HEADER.unpack_from(bits)
+        if magic != _MAGIC or len(bits) != _HEADER.size + math.ceil(num_bits / 8):
+            raise ValueError(f"{path} is not a bloom filter")
+
+        return cls(
+            num_bits,
+            num_hashes,
+            bits=memoryview(bits)[_HEADER.size :],
+            watermark=watermark,
+        )
+
+    def _positions(self, item):
+        # Derive all of the positions from two hashes ("double hashing")
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        hash_1, hash_2 = struct.unpack("<QQ", digest)
+
+        for i in range(self.num_hashes):
+            yield (hash_1 + i * hash_2) % self.num_bits
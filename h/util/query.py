@@ -15,6 +15,33 @@ def column_windows(session, column, windowsize=2000, where=None):
     .filter(...) clause.
     """
 
+    def interval_for_range(start_id, end_id):
+        if end_id:
+            return sa.and_(column >= start_id, column < end_id)
+
+        return column >= start_id
+
+    intervals = column_boundaries(session, column, windowsize, where)
+
+    while intervals:
+        start = intervals.pop(0)
+        if intervals:
+            end = intervals[0]
+        else:
+            end = None
+        yield interval_for_range(start, end)
+
+
+def column_boundaries(session, column, windowsize=2000, where=None):
+    """
+    Return the values of a column which start each window of it.
+
+    These are the values of every `windowsize`'th row in order of the column,
+    starting with the first. See `column_windows()` for the arguments.
+
+    :rtype: list
+    """
+
     # This function is adapted from a recipe supplied by the SQLAlchemy
     # maintainers:
     #
@@ -23,15 +50,7 @@ def column_windows(session, column, windowsize=2000, where=None):
     # In overview: we generate a list of all the possible values of `column`
     # on the server, and then turn that list into a subquery with
     # Query#from_self(). We then use the row number of the inner query to
-    # select every `windowsize`'th row. The resulting values are then
-    # translated into an iterable of SQLAlchemy expressions suitable for use
-    # in Query#filter(...).
-
-    def interval_for_range(start_id, end_id):
-        if end_id:
-            return sa.and_(column >= start_id, column < end_id)
-
-        return column >= start_id
+    # select every `windowsize`'th row.
 
     query = session.query(
         column, sa.func.row_number().over(order_by=column).label("rownum")
@@ -50,12 +69,4 @@ def column_windows(session, column, windowsize=2000, where=None):
             )
         )
 
-    intervals = [id for id, in query]
-
-    while intervals:
-        start = intervals.pop(0)
-        if intervals:
-            end = intervals[0]
-        else:
-            end = None
-        yield interval_for_range(start, end)
+    return [id for id, in query]
@@ -61,6 +61,7 @@ elsewhere in the Hypothesis application. URI expansion is handled by
 :py:func:`h.storage.expand_uri`.
 """
 import re
+from functools import lru_cache
 from urllib.parse import (
     SplitResult,
     parse_qsl,
@@ -141,20 +142,28 @@ UNRESERVED_QUERY_VALUE = "-._~:@!$'()*,="
 # redirect your browser to https://via.hypothes.is/https://example.com.
 VIA_PREFIX = "https://via.hypothes.is/"
 
+# The prefixes of proxied URLs which `normalize()` strips VIA_PREFIX from.
+_PROXIED_PREFIXES = tuple(VIA_PREFIX + scheme + ":" for scheme in URL_SCHEMES)
 
+# The number of URIs to remember the normalized form of in each process.
+NORMALIZE_CACHE_SIZE = 10000
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize(uristr):
     """
     Translate the given URI into a normalized form.
 
+    Results are memoized, as the same URIs tend to be normalized over and
+    over. The uncached function is available as ``normalize.__wrapped__``.
+
     :type uristr: unicode
     :rtype: unicode
     """
 
     # Strip proxy prefix for proxied URLs
-    for scheme in URL_SCHEMES:
-        if uristr.startswith(VIA_PREFIX + scheme + ":"):
-            uristr = uristr[len(VIA_PREFIX) :]
-            break
+    if uristr.startswith(_PROXIED_PREFIXES):
+        uristr = uristr[len(VIA_PREFIX) :]
 
     # Try to extract the scheme
     uri = urlsplit(uristr)
@@ -178,6 +187,29 @@ def normalize(uristr):
     return uri.geturl()
 
 
+def normalize_many(uristrs):
+    """
+    Translate each of the given URIs into a normalized form.
+
+    This is equivalent to ``[normalize(uristr) for uristr in uristrs]``, but
+    each distinct URI is only normalized once.
+
+    :type uristrs: iterable of unicode
+    :rtype: list of unicode
+    """
+    normalized = {}
+    results = []
+
+    for uristr in uristrs:
+        try:
+            results.append(normalized[uristr])
+        except KeyError:
+            normalized[uristr] = result = normalize(uristr)
+            results.append(result)
+
+    return results
+
+
 def origin(url):
     """
     Return a copy of ``url`` with the path, query string and fragment removed.
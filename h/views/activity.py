@@ -48,7 +48,12 @@ class SearchController:
             page_size = PAGE_SIZE
 
         # Fetch results.
-        results = query.execute(self.request, query_params, page_size=page_size)
+        results = query.execute(
+            self.request,
+            query_params,
+            page_size=page_size,
+            extra_searches=self._extra_searches(),
+        )
 
         groups_suggestions = []
 
@@ -81,6 +86,16 @@ class SearchController:
             "zero_message": _("No annotations matched your search."),
         }
 
+    def _extra_searches(self):
+        """
+        Return any searches to run in the same request as the main search.
+
+        Their results are in `extra_results` of the main search's results.
+
+        :return: A list of `(Search, params)` tuples
+        """
+        return []
+
 
 @view_defaults(
     route_name="group_read",
@@ -209,18 +224,27 @@ class GroupSearchController(SearchController):
 
         return result
 
+    def _extra_searches(self):
+        # If the search is for more than just the group, the count for the
+        # stats panel is different, so search for it too.
+        if len(self.parsed_query_params) > 1:
+            return [
+                self.request.find_service(
+                    name="annotation_stats"
+                ).group_annotation_count_search(self.group.pubid)
+            ]
+        return []
+
     def _get_total_annotations_in_group(self, result, _request):
         """
         Get number of annotations in group.
 
         If the search result already has this number don't run a query, just re-use it.
         """
-        group_annotation_count = result["search_results"].total
-        if len(self.parsed_query_params) > 1:
-            group_annotation_count = self.request.find_service(
-                name="annotation_stats"
-            ).group_annotation_count(self.group.pubid)
-        return group_annotation_count
+        search_results = result["search_results"]
+        if search_results.extra_results:
+            return search_results.extra_results[0].total
+        return search_results.total
 
     @view_config(request_method="POST", request_param="group_join")
     def join(self):
@@ -391,18 +415,27 @@ class UserSearchController(SearchController):
 
         return result
 
+    def _extra_searches(self):
+        # If the search is for more than just the user, the count for the
+        # stats panel is different, so search for it too.
+        if len(self.parsed_query_params) > 1:
+            return [
+                self.request.find_service(
+                    name="annotation_stats"
+                ).user_annotation_count_search(self.user.userid)
+            ]
+        return []
+
     def _get_total_user_annotations(self, result, _request):
         """
         Get number of annotations that the user has made.
 
         If the search result already has this number don't run a query, just re-use it.
         """
-        user_annotation_count = result["search_results"].total
-        if len(self.parsed_query_params) > 1:
-            user_annotation_count = self.request.find_service(
-                name="annotation_stats"
-            ).user_annotation_count(self.user.userid)
-        return user_annotation_count
+        search_results = result["search_results"]
+        if search_results.extra_results:
+            return search_results.extra_results[0].total
+        return search_results.total
 
     @view_config(request_param="back")
     def back(self):
@@ -9,6 +9,10 @@ def get_ndjson_response(results: Optional[Iterable]) -> Response:
     """
     Create a streaming response for an NDJSON based end-point.
 
+    The results are encoded and sent a line at a time as the response is
+    written, so they don't all need to be held in memory at once. As the
+    response has no content length, it's sent with chunked encoding.
+
     :param results: Iterable series of responses to convert to JSON
     """
     if results is None:
@@ -20,13 +24,30 @@ def get_ndjson_response(results: Optional[Iterable]) -> Response:
     results = iter(results)
 
     try:
-        results = chain([next(results)], results)
+        first = next(results)
     except StopIteration:
-        results = []  # pylint: disable=redefined-variable-type
+        _close(results)
+        return Response(status=200, content_type="application/x-ndjson")
 
     # An NDJSON response is required
     return Response(
-        app_iter=((json.dumps(result) + "\n").encode("utf-8") for result in results),
+        app_iter=_encode_lines(chain([first], results), results),
         status=200,
         content_type="application/x-ndjson",
     )
+
+
+def _encode_lines(results, source):
+    try:
+        for result in results:
+            yield (json.dumps(result) + "\n").encode("utf-8")
+    finally:
+        # The server closes the app iter when the response is done with, even
+        # if it isn't read to the end. Pass that on so any DB cursor the
+        # results are being read from is released.
+        _close(source)
+
+
+def _close(iterator):
+    if hasattr(iterator, "close"):
+        iterator.close()
@@ -4,22 +4,9 @@ from pyramid import httpexceptions
 from webob.multidict import MultiDict
 
 from h import search
-from h.util.uri import normalize
 from h.util.view import json_view
 
 
-def _has_uri_ever_been_annotated(db, uri):
-    """Return `True` if a given URI has ever been annotated."""
-
-    # This check is written with SQL directly to guarantee an efficient query
-    # and minimize SQLAlchemy overhead. We query `document_uri.uri_normalized`
-    # instead of `annotation.target_uri_normalized` because there is an existing
-    # index on `uri_normalized`.
-    query = "SELECT EXISTS(SELECT 1 FROM document_uri WHERE uri_normalized = :uri)"
-    result = db.execute(query, {"uri": normalize(uri)}).first()
-    return result[0] is True
-
-
 def _regex_or(options):
     """Create a regex pattern matching any of the provided strings."""
 
@@ -103,7 +90,7 @@ def badge(request):
         # much we can do about this, but browsers will still individually
         # respect the caching headers.
 
-    elif not _has_uri_ever_been_annotated(request.db, uri):
+    elif not request.find_service(name="annotated_uri").has_ever_been_annotated(uri):
         # Do a cheap check to see if this URI has ever been annotated. If not,
         # and most haven't, then we can skip the costs of a blocklist lookup or
         # search request. In addition to the Elasticsearch query, the search request
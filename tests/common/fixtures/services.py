@@ -3,6 +3,7 @@ from unittest.mock import create_autospec
 import pytest
 
 from h.services import BulkAnnotationService
+from h.services.annotated_uri import AnnotatedURIService
 from h.services.annotation_delete import AnnotationDeleteService
 from h.services.annotation_json import AnnotationJSONService
 from h.services.annotation_moderation import AnnotationModerationService
@@ -32,6 +33,7 @@ from h.services.user_update import UserUpdateService
 
 __all__ = (
     "mock_service",
+    "annotated_uri_service",
     "annotation_delete_service",
     "annotation_json_service",
     "auth_cookie_service",
@@ -78,6 +80,11 @@ def mock_service(pyramid_config):
     return mock_service
 
 
+@pytest.fixture
+def annotated_uri_service(mock_service):
+    return mock_service(AnnotatedURIService, name="annotated_uri")
+
+
 @pytest.fixture
 def annotation_delete_service(mock_service):
     return mock_service(AnnotationDeleteService, name="annotation_delete")
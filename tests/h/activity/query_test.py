@@ -338,6 +338,27 @@ class TestExecute:
 
         assert search.run.call_args[0][0]["foo"] == "bar"
 
+    def test_it_runs_the_extra_searches_in_the_same_batch(
+        self, pyramid_request, search, SearchBatch
+    ):
+        SearchBatch.return_value.run.return_value = [
+            search.run.return_value,
+            mock.sentinel.extra_result,
+        ]
+        result = execute(
+            pyramid_request,
+            MultiDict(),
+            self.PAGE_SIZE,
+            extra_searches=[(mock.sentinel.extra_search, mock.sentinel.params)],
+        )
+
+        SearchBatch.assert_called_once_with(pyramid_request)
+        assert SearchBatch.return_value.add.call_args_list == [
+            mock.call(search, mock.ANY),
+            mock.call(mock.sentinel.extra_search, mock.sentinel.params),
+        ]
+        assert result.extra_results == (mock.sentinel.extra_result,)
+
     def test_it_returns_the_search_result_if_there_are_no_matches(
         self, pyramid_request, search
     ):
@@ -582,6 +603,10 @@ class TestExecute:
     def Search(self, patch, search):
         return patch("h.activity.query.Search", return_value=search)
 
+    @pytest.fixture
+    def SearchBatch(self, patch):
+        return patch("h.activity.query.SearchBatch")
+
     @pytest.fixture
     def TagsAggregation(self, patch):
         return patch("h.activity.query.TagsAggregation")
@@ -0,0 +1,244 @@
+from unittest import mock
+
+import pytest
+
+from h import cache
+from h.cache import TTLCache
+from h.exceptions import RealtimeMessageQueueError
+
+
+class TestTTLCache:
+    def test_it_registers_itself(self, ttl_cache):
+        assert cache.CACHES["test"] is ttl_cache
+
+    def test_get_returns_MISSING_for_unknown_keys(self, ttl_cache):
+        assert ttl_cache.get("unknown") is TTLCache.MISSING
+
+    def test_get_returns_the_stored_value(self, ttl_cache):
+        ttl_cache.set("key", "value")
+
+        assert ttl_cache.get("key") == "value"
+
+    def test_it_can_store_None(self, ttl_cache):
+        ttl_cache.set("key", None)
+
+        assert ttl_cache.get("key") is None
+
+    def test_entries_expire(self, ttl_cache, time):
+        time.monotonic.return_value = 1000
+        ttl_cache.set("key", "value")
+
+        time.monotonic.return_value = 1061
+
+        assert ttl_cache.get("key") is TTLCache.MISSING
+        assert not ttl_cache
+
+    def test_it_evicts_the_least_recently_used_entry(self, ttl_cache):
+        ttl_cache.set("a", 1)
+        ttl_cache.set("b", 2)
+        ttl_cache.set("c", 3)
+        ttl_cache.get("a")
+
+        ttl_cache.set("d", 4)
+
+        assert len(ttl_cache) == 3
+        assert ttl_cache.get("b") is TTLCache.MISSING
+        assert ttl_cache.get("a") == 1
+
+    def test_invalidate(self, ttl_cache):
+        ttl_cache.set("a", 1)
+        ttl_cache.set("b", 2)
+
+        ttl_cache.invalidate(["a", "unknown"])
+
+        assert ttl_cache.get("a") is TTLCache.MISSING
+        assert ttl_cache.get("b") == 2
+
+    def test_clear(self, ttl_cache):
+        ttl_cache.set("a", 1)
+
+        ttl_cache.clear()
+
+        assert not ttl_cache
+
+    def test_pop_metrics(self, ttl_cache):
+        ttl_cache.set("a", 1)
+        ttl_cache.get("a")
+        ttl_cache.get("b")
+        ttl_cache.get("c")
+
+        assert ttl_cache.pop_metrics() == {"Hits": 1, "Misses": 2, "Size": 1}
+        assert ttl_cache.pop_metrics() == {"Hits": 0, "Misses": 0, "Size": 1}
+
+    @pytest.fixture
+    def time(self, patch):
+        return patch("h.cache.time")
+
+
+class TestStartListener:
+    def test_get_starts_the_listener(self, ttl_cache, threading, settings):
+        ttl_cache.get("a")
+
+        threading.Thread.assert_called_once_with(
+            target=cache._listen,  # pylint:disable=protected-access
+            args=(settings,),
+            name="cache-invalidation",
+            daemon=True,
+        )
+        threading.Thread.return_value.start.assert_called_once_with()
+
+    @pytest.mark.usefixtures("settings")
+    def test_it_only_starts_the_listener_once(self, ttl_cache, threading):
+        threading.Thread.return_value.is_alive.return_value = True
+
+        ttl_cache.get("a")
+        ttl_cache.get("b")
+
+        threading.Thread.assert_called_once()
+
+    @pytest.mark.usefixtures("settings")
+    def test_it_starts_a_new_listener_if_the_last_one_is_not_running(
+        self, ttl_cache, threading
+    ):
+        # e.g. in a worker forked from the process which started it
+        threading.Thread.return_value.is_alive.return_value = False
+
+        ttl_cache.get("a")
+        ttl_cache.get("b")
+
+        assert threading.Thread.call_count == 2
+
+    def test_it_does_not_start_the_listener_outside_an_app(self, ttl_cache, threading):
+        ttl_cache.get("a")
+
+        threading.Thread.assert_not_called()
+
+    @pytest.fixture
+    def settings(self):
+        with mock.patch.object(cache, "_settings", mock.sentinel.settings):
+            yield mock.sentinel.settings
+
+    @pytest.fixture(autouse=True)
+    def threading(self, patch):
+        with mock.patch.object(cache, "_listener", None):
+            yield patch("h.cache.threading")
+
+
+class TestInvalidate:
+    def test_it_invalidates_locally(self, ttl_cache):
+        ttl_cache.set("a", 1)
+
+        cache.invalidate("test", ["a"])
+
+        assert ttl_cache.get("a") is TTLCache.MISSING
+
+    def test_it_clears_the_cache_with_no_keys(self, ttl_cache):
+        ttl_cache.set("a", 1)
+
+        cache.invalidate("test")
+
+        assert not ttl_cache
+
+    def test_it_does_not_publish_without_a_connection(self, realtime):
+        cache.invalidate("test", ["a"])
+
+        realtime.publish.assert_not_called()
+
+    def test_it_publishes_the_invalidation(self, realtime, connection):
+        cache.invalidate("test", {"a"})
+
+        realtime.publish.assert_called_once_with(
+            connection, "cache", {"cache": "test", "keys": ["a"]}
+        )
+
+    @pytest.mark.usefixtures("connection")
+    def test_it_reports_publishing_errors(self, realtime, report_exception):
+        error = RealtimeMessageQueueError()
+        realtime.publish.side_effect = error
+
+        cache.invalidate("test", ["a"])
+
+        report_exception.assert_called_once_with(error)
+
+    @pytest.fixture
+    def connection(self):
+        with mock.patch.object(cache, "_connection", mock.sentinel.connection):
+            yield mock.sentinel.connection
+
+    @pytest.fixture
+    def report_exception(self, patch):
+        return patch("h.cache.report_exception")
+
+
+class TestInvalidateAfterCommit:
+    def test_it_invalidates_on_commit(self, db_session, ttl_cache):
+        ttl_cache.set("a", 1)
+        ttl_cache.set("b", 2)
+        ttl_cache.set("c", 3)
+
+        cache.invalidate_after_commit(db_session, "test", ["a"])
+        cache.invalidate_after_commit(db_session, "test", ["b"])
+        assert ttl_cache.get("a") == 1
+
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert ttl_cache.get("a") is TTLCache.MISSING
+        assert ttl_cache.get("b") is TTLCache.MISSING
+        assert ttl_cache.get("c") == 3
+
+    def test_it_clears_on_commit_if_any_call_has_no_keys(self, db_session, ttl_cache):
+        ttl_cache.set("a", 1)
+
+        cache.invalidate_after_commit(db_session, "test")
+        cache.invalidate_after_commit(db_session, "test", ["b"])
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert not ttl_cache
+
+    def test_it_only_invalidates_locally_on_rollback(
+        self, db_session, ttl_cache, realtime
+    ):
+        ttl_cache.set("a", 1)
+        ttl_cache.set("b", 2)
+
+        cache.invalidate_after_commit(db_session, "test", ["a"])
+        cache._after_rollback(db_session)  # pylint:disable=protected-access
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert ttl_cache.get("a") is TTLCache.MISSING
+        assert ttl_cache.get("b") == 2
+        realtime.publish.assert_not_called()
+
+
+class TestHandleInvalidation:
+    def test_it_invalidates_keys(self, ttl_cache):
+        ttl_cache.set("a", 1)
+
+        cache.handle_invalidation({"cache": "test", "keys": ["a"]})
+
+        assert ttl_cache.get("a") is TTLCache.MISSING
+
+    def test_it_ignores_unknown_caches(self):
+        cache.handle_invalidation({"cache": "unknown", "keys": None})
+
+
+class TestCacheMetrics:
+    def test_it(self, ttl_cache):
+        ttl_cache.get("a")
+
+        metrics = list(cache.cache_metrics.__wrapped__())
+
+        assert ("Custom/Cache/test/Misses", 1) in metrics
+        assert ("Custom/Cache/test/Size", 0) in metrics
+
+
+@pytest.fixture
+def ttl_cache():
+    ttl_cache = TTLCache("test", maxsize=3, ttl=60)
+    yield ttl_cache
+    del cache.CACHES["test"]
+
+
+@pytest.fixture
+def realtime(patch):
+    return patch("h.cache.realtime")
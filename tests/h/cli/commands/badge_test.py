@@ -0,0 +1,27 @@
+from unittest import mock
+
+import pytest
+
+from h.cli.commands import badge
+
+
+class TestBuildURIFilter:
+    def test_it(self, cli, cliconfig, annotated_uri_service):
+        annotated_uri_service.build_filter.return_value = 42
+
+        result = cli.invoke(
+            badge.build_uri_filter,
+            ["uris.bloom", "--error-rate", "0.001"],
+            obj=cliconfig,
+        )
+
+        assert not result.exit_code
+        annotated_uri_service.build_filter.assert_called_once_with(
+            "uris.bloom", error_rate=0.001
+        )
+        assert "42 URIs" in result.output
+
+
+@pytest.fixture
+def cliconfig(pyramid_request):
+    return {"bootstrap": mock.Mock(return_value=pyramid_request)}
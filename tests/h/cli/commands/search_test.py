@@ -17,9 +17,35 @@ class TestReindexCommand:
 
         assert not result.exit_code
         reindex.assert_called_once_with(
-            pyramid_request.db, pyramid_request.es, pyramid_request
+            pyramid_request.db,
+            pyramid_request.es,
+            pyramid_request,
+            workers=1,
+            shards=None,
+            resume=False,
+            bootstrap=cliconfig["bootstrap"],
         )
 
+    def test_it_passes_the_options_to_reindex(self, cli, cliconfig, reindex):
+        result = cli.invoke(
+            search.reindex,
+            ["--workers", "4", "--shards", "16", "--resume"],
+            obj=cliconfig,
+        )
+
+        assert not result.exit_code
+        _, kwargs = reindex.call_args
+        assert kwargs["workers"] == 4
+        assert kwargs["shards"] == 16
+        assert kwargs["resume"]
+
+    @pytest.mark.parametrize("option", ("--workers", "--shards"))
+    def test_it_rejects_fewer_than_one(self, cli, cliconfig, reindex, option):
+        result = cli.invoke(search.reindex, [option, "0"], obj=cliconfig)
+
+        assert result.exit_code
+        reindex.assert_not_called()
+
     @pytest.fixture
     def reindex(self, patch):
         index = patch("h.cli.commands.search.indexer")
@@ -17,6 +17,15 @@ from h.config import configure
             "h_pyramid_sentry.init.environment",
             "test-env",
         ),
+        (None, None, "h.streamer.batch_size", 1),
+        ("STREAMER_BATCH_SIZE", "50", "h.streamer.batch_size", 50),
+        ("STREAMER_BATCH_TIMEOUT_MS", "20", "h.streamer.batch_timeout_ms", 20),
+        (
+            "SEARCH_FILTER_READABLE_BY_WORLD",
+            "true",
+            "h.search.filter_readable_by_world",
+            True,
+        ),
         # There are many other settings that can be updated from env vars.
         # These are not currently tested.
     ],
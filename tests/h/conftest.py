@@ -11,7 +11,7 @@ from pyramid.request import apply_request_extensions
 from sqlalchemy.orm import sessionmaker
 from webob.multidict import MultiDict
 
-from h import db
+from h import cache, db
 from h.models import Organization
 from h.settings import database_url
 from tests.common import factories as common_factories
@@ -75,6 +75,14 @@ def autopatcher(request, target, **kwargs):
     return obj
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Stop process-local cache entries from leaking between tests."""
+    yield
+    for cache_ in cache.CACHES.values():
+        cache_.clear()
+
+
 @pytest.fixture
 def cli():
     runner = click.testing.CliRunner()
@@ -1,8 +1,20 @@
+import json
+import logging
+import queue
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
 from unittest import mock
 
 import pytest
+from h_matchers import Any
 
-from h.indexer.reindexer import reindex
+from h.indexer.reindexer import (
+    CHECKPOINT_SETTING,
+    _index_shard_in_worker,
+    _init_worker,
+    reindex,
+)
+from h.models import Annotation
 
 
 @pytest.mark.usefixtures(
@@ -15,70 +27,223 @@ from h.indexer.reindexer import reindex
     "settings_service",
 )
 class TestReindex:
+    @pytest.mark.usefixtures("annotations")
     def test_sets_op_type_to_create(
-        self, pyramid_request, mock_es_client, BatchIndexer
+        self, db_session, pyramid_request, mock_es_client, BatchIndexer
     ):
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
 
         _, kwargs = BatchIndexer.call_args
         assert kwargs["op_type"] == "create"
 
-    def test_indexes_annotations(self, pyramid_request, mock_es_client, batchindexer):
-        """Should call .index() on the batch indexer instance."""
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+    def test_indexes_annotations(
+        self, db_session, pyramid_request, mock_es_client, batchindexer, annotations
+    ):
+        reindex(db_session, mock_es_client, pyramid_request)
+
+        batchindexer.index.assert_called_once_with(where=Any())
+        assert indexed_ids(db_session, batchindexer) == annotation_ids(annotations)
+
+    @pytest.mark.usefixtures("annotations")
+    def test_logs_the_number_of_annotations_indexed(
+        self, db_session, pyramid_request, mock_es_client, batchindexer, caplog
+    ):
+        batchindexer.indexed = 3
+
+        with caplog.at_level(logging.INFO, logger="h.indexer.reindexer"):
+            reindex(db_session, mock_es_client, pyramid_request)
+
+        assert "indexed 3 annotations in shard 0" in caplog.text
+
+    def test_indexes_each_shard(
+        self, db_session, pyramid_request, mock_es_client, batchindexer, annotations
+    ):
+        reindex(db_session, mock_es_client, pyramid_request, shards=2)
+
+        assert batchindexer.index.call_count == 2
+        assert indexed_ids(db_session, batchindexer) == annotation_ids(annotations)
+
+    def test_indexes_shards_a_window_at_a_time(
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        batchindexer,
+        annotations,
+        monkeypatch,
+    ):
+        monkeypatch.setattr("h.indexer.reindexer.PG_WINDOW_SIZE", 2)
+
+        reindex(db_session, mock_es_client, pyramid_request)
+
+        assert batchindexer.index.call_count == 2
+        assert indexed_ids(db_session, batchindexer) == annotation_ids(annotations)
+
+    @pytest.mark.usefixtures("annotations")
+    def test_indexes_shards_in_worker_processes(
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        multiprocessing,
+        ProcessPoolExecutor,
+        executor,
+    ):
+        context = multiprocessing.get_context.return_value
+        context.Queue.return_value.get.side_effect = queue.Empty
+
+        reindex(
+            db_session,
+            mock_es_client,
+            pyramid_request,
+            workers=2,
+            shards=3,
+            bootstrap=mock.sentinel.bootstrap,
+        )
+
+        multiprocessing.get_context.assert_called_once_with("spawn")
+        ProcessPoolExecutor.assert_called_once_with(
+            2,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(mock.sentinel.bootstrap, context.Queue.return_value),
+        )
+        assert executor.submit.call_args_list == [
+            mock.call(_index_shard_in_worker, number, Any.dict(), "hypothesis-abcd1234")
+            for number in range(3)
+        ]
+        assert executor.submit.return_value.result.call_count == 3
+
+    @pytest.mark.usefixtures("annotations")
+    def test_it_raises_if_a_worker_process_dies(
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        multiprocessing,
+        executor,
+        update_aliased_index,
+    ):
+        multiprocessing.get_context.return_value.Queue.return_value.get.side_effect = (
+            queue.Empty
+        )
+        executor.submit.return_value.result.side_effect = BrokenProcessPool
+
+        with pytest.raises(BrokenProcessPool):
+            reindex(
+                db_session,
+                mock_es_client,
+                pyramid_request,
+                workers=2,
+                bootstrap=mock.sentinel.bootstrap,
+            )
+
+        update_aliased_index.assert_not_called()
+
+    @pytest.mark.usefixtures("executor")
+    def test_it_records_progress_from_worker_processes(
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        multiprocessing,
+        settings_service,
+        batchindexer,
+    ):
+        context = multiprocessing.get_context.return_value
+        context.Queue.return_value.get.side_effect = [
+            (0, None, 3, ["abc123"], True, 1234),
+            queue.Empty,
+        ]
+
+        reindex(
+            db_session,
+            mock_es_client,
+            pyramid_request,
+            workers=2,
+            bootstrap=mock.sentinel.bootstrap,
+        )
+
+        assert saved_checkpoint(settings_service)["shards"][0]["done"]
+        batchindexer.index.assert_called_once_with(["abc123"])
 
-        batchindexer.index.assert_called_once_with()
+    def test_it_requires_bootstrap_for_multiple_workers(
+        self, db_session, pyramid_request, mock_es_client
+    ):
+        with pytest.raises(ValueError):
+            reindex(db_session, mock_es_client, pyramid_request, workers=2)
 
+    @pytest.mark.usefixtures("annotations")
     def test_retries_failed_annotations(
-        self, pyramid_request, mock_es_client, batchindexer
+        self, db_session, pyramid_request, mock_es_client, batchindexer
     ):
         """Should call .index() a second time with any failed annotation IDs."""
-        batchindexer.index.return_value = ["abc123", "def456"]
+        batchindexer.index.side_effect = [{"abc123", "def456"}, set()]
 
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
 
         assert batchindexer.index.mock_calls == [
-            mock.call(),
-            mock.call(["abc123", "def456"]),
+            mock.call(where=Any()),
+            mock.call(Any.list.containing(["abc123", "def456"]).only()),
         ]
 
-    def test_creates_new_index(self, pyramid_request, mock_es_client, configure_index):
+    @pytest.mark.usefixtures("annotations")
+    def test_checkpoints_the_progress_of_each_shard(
+        self, db_session, pyramid_request, mock_es_client, settings_service
+    ):
+        reindex(db_session, mock_es_client, pyramid_request, shards=2)
+
+        assert saved_checkpoint(settings_service) == {
+            "new_index": "hypothesis-abcd1234",
+            "started": Any.string(),
+            "shards": [
+                {"start": Any.string(), "end": Any.string(), "done": True},
+                {"start": None, "end": None, "done": True},
+            ],
+            "errored": [],
+        }
+
+    def test_creates_new_index(
+        self, db_session, pyramid_request, mock_es_client, configure_index
+    ):
         """Creates a new target index."""
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
 
         configure_index.assert_called_once_with(mock_es_client)
 
     def test_passes_new_index_to_indexer(
-        self, pyramid_request, mock_es_client, configure_index, BatchIndexer
+        self, db_session, pyramid_request, mock_es_client, BatchIndexer
     ):
         """Pass the name of the new index as target_index to indexer."""
-        configure_index.return_value = "hypothesis-abcd1234"
-
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
 
         _, kwargs = BatchIndexer.call_args
         assert kwargs["target_index"] == "hypothesis-abcd1234"
 
     def test_updates_alias_when_reindexed(
-        self, pyramid_request, mock_es_client, configure_index, update_aliased_index
+        self, db_session, pyramid_request, mock_es_client, update_aliased_index
     ):
         """Call update_aliased_index on the client with the new index name."""
-        configure_index.return_value = "hypothesis-abcd1234"
-
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
 
         update_aliased_index.assert_called_once_with(
             mock_es_client, "hypothesis-abcd1234"
         )
 
+    @pytest.mark.usefixtures("annotations")
     def test_does_not_update_alias_if_indexing_fails(
-        self, pyramid_request, mock_es_client, batchindexer, update_aliased_index
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        batchindexer,
+        update_aliased_index,
     ):
         """Don't call update_aliased_index if index() fails..."""
         batchindexer.index.side_effect = RuntimeError("fail")
 
         try:
-            reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+            reindex(db_session, mock_es_client, pyramid_request)
         except RuntimeError:
             pass
 
@@ -91,46 +256,96 @@ class TestReindex:
             reindex(mock.sentinel.session, mock_es_client, mock.sentinel.request)
 
     def test_stores_new_index_name_in_settings(
-        self, pyramid_request, mock_es_client, settings_service, configure_index
+        self, db_session, pyramid_request, mock_es_client, settings_service
     ):
-        configure_index.return_value = "hypothesis-abcd1234"
-
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
 
-        settings_service.put.assert_called_once_with(
-            "reindex.new_index", "hypothesis-abcd1234"
-        )
+        settings_service.put.assert_any_call("reindex.new_index", "hypothesis-abcd1234")
 
     def test_deletes_index_name_setting(
-        self, pyramid_request, mock_es_client, settings_service
+        self, db_session, pyramid_request, mock_es_client, settings_service
     ):
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
 
-        settings_service.delete.assert_called_once_with("reindex.new_index")
+        settings_service.delete.assert_any_call("reindex.new_index")
+
+    def test_deletes_checkpoint_setting(
+        self, db_session, pyramid_request, mock_es_client, settings_service
+    ):
+        reindex(db_session, mock_es_client, pyramid_request)
 
+        settings_service.delete.assert_any_call(CHECKPOINT_SETTING)
+
+    @pytest.mark.usefixtures("annotations")
     def test_deletes_index_name_setting_when_exception_raised(
-        self, pyramid_request, mock_es_client, settings_service, batchindexer
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        settings_service,
+        batchindexer,
     ):
         batchindexer.index.side_effect = RuntimeError("boom!")
 
         with pytest.raises(RuntimeError):
-            reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+            reindex(db_session, mock_es_client, pyramid_request)
 
         settings_service.delete.assert_called_once_with("reindex.new_index")
 
+    def test_clears_the_checkpoint_before_deleting_the_old_index(
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        settings_service,
+        delete_index,
+    ):
+        calls = mock.Mock()
+        calls.attach_mock(settings_service.delete, "delete_setting")
+        calls.attach_mock(pyramid_request.tm.commit, "commit")
+        calls.attach_mock(delete_index, "delete_index")
+
+        reindex(db_session, mock_es_client, pyramid_request)
+
+        cleared = calls.mock_calls.index(mock.call.delete_setting(CHECKPOINT_SETTING))
+        assert calls.mock_calls[cleared + 1 : cleared + 3] == [
+            mock.call.commit(),
+            mock.call.delete_index(mock_es_client, Any()),
+        ]
+
     def test_deletes_old_index(
-        self, pyramid_request, mock_es_client, delete_index, get_aliased_index
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        delete_index,
+        get_aliased_index,
     ):
         get_aliased_index.return_value = "original_index"
 
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
 
         delete_index.assert_called_once_with(mock_es_client, "original_index")
 
+    def test_deletes_the_index_of_an_unfinished_reindex(
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        delete_index,
+        settings_service,
+        checkpoint,
+    ):
+        settings_service.get.return_value = json.dumps(checkpoint)
+
+        reindex(db_session, mock_es_client, pyramid_request)
+
+        delete_index.assert_any_call(mock_es_client, checkpoint["new_index"])
+
     def test_populates_nipsa_cache(
-        self, pyramid_request, mock_es_client, nipsa_service
+        self, db_session, pyramid_request, mock_es_client, nipsa_service
     ):
-        reindex(mock.sentinel.session, mock_es_client, pyramid_request)
+        reindex(db_session, mock_es_client, pyramid_request)
         nipsa_service.fetch_all_flagged_userids.assert_called_once_with()
 
     @pytest.fixture
@@ -139,7 +354,9 @@ class TestReindex:
 
     @pytest.fixture
     def configure_index(self, patch):
-        return patch("h.indexer.reindexer.configure_index")
+        func = patch("h.indexer.reindexer.configure_index")
+        func.return_value = "hypothesis-abcd1234"
+        return func
 
     @pytest.fixture
     def get_aliased_index(self, patch):
@@ -156,18 +373,248 @@ class TestReindex:
         return patch("h.indexer.reindexer.update_aliased_index")
 
     @pytest.fixture
-    def batchindexer(self, BatchIndexer):
-        indexer = BatchIndexer.return_value
-        indexer.index.return_value = []
-        return indexer
+    def multiprocessing(self, patch):
+        return patch("h.indexer.reindexer.multiprocessing")
 
     @pytest.fixture
-    def settings_service(self, pyramid_config):
-        service = mock.Mock()
-        pyramid_config.register_service(service, name="settings")
-        return service
+    def ProcessPoolExecutor(self, patch):
+        return patch("h.indexer.reindexer.ProcessPoolExecutor")
 
     @pytest.fixture
-    def pyramid_request(self, pyramid_request):
-        pyramid_request.tm = mock.Mock()
-        return pyramid_request
+    def executor(self, ProcessPoolExecutor):
+        executor = ProcessPoolExecutor.return_value.__enter__.return_value
+        executor.submit.return_value.done.return_value = True
+        return executor
+
+
+@pytest.mark.usefixtures(
+    "BatchIndexer",
+    "delete_index",
+    "nipsa_service",
+    "get_aliased_index",
+    "update_aliased_index",
+)
+class TestReindexResume:
+    def test_it_indexes_the_unfinished_shards(
+        self, db_session, pyramid_request, mock_es_client, batchindexer, annotations
+    ):
+        reindex(db_session, mock_es_client, pyramid_request, resume=True)
+
+        # The unfinished shard, the earlier failures, then catching up with
+        # changes since the start
+        assert batchindexer.index.mock_calls == [
+            mock.call(where=Any()),
+            mock.call(["abc123"]),
+            mock.call(where=Any()),
+        ]
+        assert indexed_ids(db_session, batchindexer) == annotation_ids(annotations[1:])
+
+    def test_it_doesnt_create_a_new_index(
+        self, db_session, pyramid_request, mock_es_client, configure_index
+    ):
+        reindex(db_session, mock_es_client, pyramid_request, resume=True)
+
+        configure_index.assert_not_called()
+
+    def test_it_indexes_into_the_index_being_resumed(
+        self, db_session, pyramid_request, mock_es_client, BatchIndexer, checkpoint
+    ):
+        reindex(db_session, mock_es_client, pyramid_request, resume=True)
+
+        for _, kwargs in BatchIndexer.call_args_list:
+            assert kwargs["target_index"] == checkpoint["new_index"]
+
+    def test_it_retries_annotations_which_failed_before(
+        self, db_session, pyramid_request, mock_es_client, batchindexer, checkpoint
+    ):
+        reindex(db_session, mock_es_client, pyramid_request, resume=True)
+
+        batchindexer.index.assert_any_call(checkpoint["errored"])
+
+    def test_it_marks_annotations_deleted_since_the_start_as_deleted(
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        factories,
+        batchindexer,
+    ):
+        deleted = factories.Annotation(deleted=True, updated=datetime(2021, 1, 1))
+        factories.Annotation(deleted=True, updated=datetime(2019, 1, 1))
+        db_session.flush()
+
+        reindex(db_session, mock_es_client, pyramid_request, resume=True)
+
+        batchindexer.delete.assert_called_once_with([deleted.id])
+
+    def test_it_only_clears_the_checkpoint_if_the_alias_was_already_swapped(
+        self,
+        db_session,
+        pyramid_request,
+        mock_es_client,
+        settings_service,
+        get_aliased_index,
+        batchindexer,
+        update_aliased_index,
+        delete_index,
+        checkpoint,
+    ):
+        get_aliased_index.return_value = checkpoint["new_index"]
+
+        reindex(db_session, mock_es_client, pyramid_request, resume=True)
+
+        settings_service.delete.assert_called_once_with(CHECKPOINT_SETTING)
+        pyramid_request.tm.commit.assert_called_once_with()
+        batchindexer.index.assert_not_called()
+        update_aliased_index.assert_not_called()
+        delete_index.assert_not_called()
+
+    def test_it_raises_if_there_is_nothing_to_resume(
+        self, db_session, pyramid_request, mock_es_client, settings_service
+    ):
+        settings_service.get.return_value = None
+
+        with pytest.raises(RuntimeError):
+            reindex(db_session, mock_es_client, pyramid_request, resume=True)
+
+    @pytest.fixture
+    def annotations(self, factories, db_session):
+        annotations = [
+            factories.Annotation(updated=datetime(2020, 1, 1)),
+            factories.Annotation(updated=datetime(2020, 6, 1)),
+            factories.Annotation(updated=datetime(2020, 7, 1)),
+        ]
+        db_session.flush()
+        return annotations
+
+    @pytest.fixture
+    def checkpoint(self, checkpoint):
+        checkpoint["shards"] = [
+            {"start": None, "end": "2020-06-01T00:00:00", "done": True},
+            {"start": "2020-06-01T00:00:00", "end": None, "done": False},
+        ]
+        checkpoint["started"] = "2020-12-01T00:00:00"
+        checkpoint["errored"] = ["abc123"]
+        return checkpoint
+
+    @pytest.fixture(autouse=True)
+    def settings_service(self, settings_service, checkpoint):
+        settings_service.get.return_value = json.dumps(checkpoint)
+        return settings_service
+
+    @pytest.fixture
+    def BatchIndexer(self, patch):
+        return patch("h.indexer.reindexer.BatchIndexer")
+
+    @pytest.fixture
+    def configure_index(self, patch):
+        return patch("h.indexer.reindexer.configure_index")
+
+    @pytest.fixture
+    def get_aliased_index(self, patch):
+        func = patch("h.indexer.reindexer.get_aliased_index")
+        func.return_value = "foobar"
+        return func
+
+    @pytest.fixture
+    def delete_index(self, patch):
+        return patch("h.indexer.reindexer.delete_index")
+
+    @pytest.fixture
+    def update_aliased_index(self, patch):
+        return patch("h.indexer.reindexer.update_aliased_index")
+
+
+class TestWorkers:
+    def test_they_index_shards_with_their_own_request(
+        self, pyramid_request, db_session, patch
+    ):
+        BatchIndexer = patch("h.indexer.reindexer.BatchIndexer")
+        BatchIndexer.return_value.index.return_value = set()
+        progress_queue = mock.create_autospec(queue.Queue, instance=True)
+        bootstrap = mock.Mock(return_value=pyramid_request)
+        pyramid_request.es = mock.sentinel.es
+
+        _init_worker(bootstrap, progress_queue)
+        _index_shard_in_worker(
+            3, {"start": None, "end": None, "done": False}, "new_index"
+        )
+
+        bootstrap.assert_called_once_with()
+        BatchIndexer.assert_called_once_with(
+            db_session,
+            mock.sentinel.es,
+            pyramid_request,
+            target_index="new_index",
+            op_type="create",
+        )
+        progress_queue.put.assert_called_once_with(
+            (3, None, Any.int(), [], True, Any.int())
+        )
+
+
+def annotation_ids(annotations):
+    return sorted(annotation.id for annotation in annotations)
+
+
+def indexed_ids(db_session, batchindexer):
+    """Return the ids of the annotations that were indexed with `where`."""
+    ids = []
+    for call in batchindexer.index.call_args_list:
+        if "where" in call.kwargs:
+            ids.extend(
+                id_
+                for id_, in db_session.query(Annotation.id).filter(call.kwargs["where"])
+            )
+    return sorted(ids)
+
+
+def saved_checkpoint(settings_service):
+    return json.loads(
+        [
+            call.args[1]
+            for call in settings_service.put.call_args_list
+            if call.args[0] == CHECKPOINT_SETTING
+        ][-1]
+    )
+
+
+@pytest.fixture
+def annotations(factories, db_session):
+    annotations = factories.Annotation.create_batch(3)
+    factories.Annotation(deleted=True)
+    db_session.flush()
+    return annotations
+
+
+@pytest.fixture
+def checkpoint():
+    return {
+        "new_index": "hypothesis-unfinished",
+        "started": "2020-01-01T00:00:00",
+        "shards": [],
+        "errored": [],
+    }
+
+
+@pytest.fixture
+def settings_service(pyramid_config):
+    service = mock.Mock()
+    service.get.return_value = None
+    pyramid_config.register_service(service, name="settings")
+    return service
+
+
+@pytest.fixture
+def batchindexer(BatchIndexer):
+    indexer = BatchIndexer.return_value
+    indexer.index.return_value = set()
+    indexer.indexed = 0
+    return indexer
+
+
+@pytest.fixture
+def pyramid_request(pyramid_request, mock_es_client):
+    pyramid_request.tm = mock.Mock()
+    pyramid_request.es = mock_es_client
+    return pyramid_request
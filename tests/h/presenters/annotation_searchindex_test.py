@@ -19,6 +19,7 @@ class TestAnnotationSearchIndexPresenter:
             text="It is magical!",
             tags=["magic"],
             groupid="__world__",
+            group=mock.Mock(is_public=True),
             shared=True,
             references=["referenced-id-1", "referenced-id-2"],
             thread_ids=["thread-id-1", "thread-id-2"],
@@ -42,6 +43,7 @@ class TestAnnotationSearchIndexPresenter:
             "tags": ["magic"],
             "tags_raw": ["magic"],
             "group": "__world__",
+            "readable_by_world": True,
             "shared": True,
             "target": annotation.target,
             "document": {"foo": "bar"},
@@ -50,6 +52,32 @@ class TestAnnotationSearchIndexPresenter:
             "hidden": False,
         }
 
+    @pytest.mark.parametrize(
+        "group,readable_by_world",
+        ((mock.Mock(is_public=True), True), (mock.Mock(is_public=False), False)),
+    )
+    def test_it_marks_annotations_readable_by_world(
+        self, pyramid_request, group, readable_by_world
+    ):
+        annotation = mock.MagicMock(userid="acct:luke@hypothes.is", group=group)
+
+        annotation_dict = AnnotationSearchIndexPresenter(
+            annotation, pyramid_request
+        ).asdict()
+
+        assert annotation_dict["readable_by_world"] == readable_by_world
+
+    def test_it_marks_annotations_without_a_group_unreadable_by_world(
+        self, pyramid_request
+    ):
+        annotation = mock.MagicMock(userid="acct:luke@hypothes.is", group=None)
+
+        annotation_dict = AnnotationSearchIndexPresenter(
+            annotation, pyramid_request
+        ).asdict()
+
+        assert not annotation_dict["readable_by_world"]
+
     @pytest.mark.parametrize("is_moderated", [True, False])
     @pytest.mark.parametrize("replies_moderated", [True, False])
     def test_it_marks_annotation_hidden_correctly(
@@ -100,3 +128,84 @@ class TestAnnotationSearchIndexPresenter:
         )
         class_.return_value.asdict.return_value = {}
         return class_
+
+
+@pytest.mark.usefixtures("nipsa_service", "DocumentSearchIndexPresenter")
+class TestAnnotationSearchIndexPresenterAsdicts:
+    def test_it_matches_asdict(self, pyramid_request, annotations, nipsa_service):
+        nipsa_service.fetch_all_flagged_userids.return_value = set()
+
+        results = AnnotationSearchIndexPresenter.asdicts(annotations, pyramid_request)
+
+        assert results == [
+            AnnotationSearchIndexPresenter(annotation, pyramid_request).asdict()
+            for annotation in annotations
+        ]
+
+    def test_it_looks_up_threads_together(
+        self, pyramid_request, annotations, storage, moderation_service
+    ):
+        storage.fetch_thread_ids.return_value = {
+            annotations[0].id: ["reply-1"],
+            annotations[1].id: ["reply-2", "reply-3"],
+        }
+
+        results = AnnotationSearchIndexPresenter.asdicts(annotations, pyramid_request)
+
+        storage.fetch_thread_ids.assert_called_once_with(
+            pyramid_request.db, [annotation.id for annotation in annotations]
+        )
+        moderation_service.all_hidden.assert_called_once_with(
+            [annotations[0].id, annotations[1].id, "reply-1", "reply-2", "reply-3"]
+        )
+        assert [result["thread_ids"] for result in results] == [
+            ["reply-1"],
+            ["reply-2", "reply-3"],
+        ]
+
+    def test_it_marks_annotations_hidden(
+        self, pyramid_request, annotations, storage, moderation_service
+    ):
+        storage.fetch_thread_ids.return_value = {
+            annotations[0].id: ["reply-1"],
+            annotations[1].id: ["reply-2"],
+        }
+        moderation_service.all_hidden.return_value = {
+            annotations[0].id,
+            annotations[1].id,
+            "reply-1",
+        }
+
+        results = AnnotationSearchIndexPresenter.asdicts(annotations, pyramid_request)
+
+        assert [result["hidden"] for result in results] == [True, False]
+
+    def test_it_marks_annotations_nipsaed(
+        self, pyramid_request, annotations, nipsa_service
+    ):
+        nipsa_service.fetch_all_flagged_userids.return_value = {annotations[1].userid}
+
+        results = AnnotationSearchIndexPresenter.asdicts(annotations, pyramid_request)
+
+        nipsa_service.is_flagged.assert_not_called()
+        assert "nipsa" not in results[0]
+        assert results[1]["nipsa"]
+
+    @pytest.fixture
+    def annotations(self, factories, db_session):
+        annotations = factories.Annotation.create_batch(2)
+        factories.Annotation(references=[annotations[0].id])
+        db_session.flush()
+        return annotations
+
+    @pytest.fixture
+    def storage(self, patch):
+        return patch("h.presenters.annotation_searchindex.storage")
+
+    @pytest.fixture
+    def DocumentSearchIndexPresenter(self, patch):
+        class_ = patch(
+            "h.presenters.annotation_searchindex.DocumentSearchIndexPresenter"
+        )
+        class_.return_value.asdict.return_value = {}
+        return class_
@@ -1,9 +1,14 @@
-from unittest.mock import sentinel
+from datetime import datetime
 
 import pytest
 from h_matchers import Any
 
-from h.presenters.group_json import GroupJSONPresenter, GroupsJSONPresenter
+from h import cache
+from h.presenters.group_json import (
+    GROUP_JSON_CACHE,
+    GroupJSONPresenter,
+    GroupsJSONPresenter,
+)
 
 
 @pytest.mark.usefixtures("group_links_service")
@@ -144,14 +149,100 @@ class TestGroupsJSONPresenter:
         group = factories.Group()
         presenter = GroupsJSONPresenter(groups=[group], request=pyramid_request)
 
-        result = presenter.asdicts(expand=sentinel.expand)
+        result = presenter.asdicts(expand=["scopes", "organization"])
 
         GroupJSONPresenter.assert_called_once_with(group, pyramid_request)
         GroupJSONPresenter.return_value.asdict.assert_called_once_with(
-            expand=sentinel.expand
+            expand=["organization", "scopes"]
         )
         assert result == [GroupJSONPresenter.return_value.asdict.return_value]
 
-    @pytest.fixture(autouse=True)
+    def test_it_caches_flushed_groups(
+        self, factories, pyramid_request, db_session, GroupJSONPresenter
+    ):
+        groups = factories.Group.create_batch(2)
+        db_session.flush()
+
+        GroupsJSONPresenter(groups, pyramid_request).asdicts()
+        result = GroupsJSONPresenter(groups, pyramid_request).asdicts()
+
+        assert GroupJSONPresenter.call_count == 2
+        assert result == [GroupJSONPresenter.return_value.asdict.return_value] * 2
+
+    @pytest.mark.parametrize(
+        "change",
+        (
+            lambda group, _request: setattr(group, "updated", datetime.utcnow()),
+            lambda _group, request: setattr(
+                request, "application_url", "http://other.example.com"
+            ),
+        ),
+    )
+    def test_it_doesnt_use_stale_entries(
+        self, factories, pyramid_request, db_session, GroupJSONPresenter, change
+    ):
+        group = factories.Group()
+        db_session.flush()
+        GroupsJSONPresenter([group], pyramid_request).asdicts()
+
+        change(group, pyramid_request)
+        db_session.flush()
+        GroupsJSONPresenter([group], pyramid_request).asdicts()
+
+        assert GroupJSONPresenter.call_count == 2
+
+    def test_it_caches_each_expansion_separately(
+        self, factories, pyramid_request, db_session, GroupJSONPresenter
+    ):
+        group = factories.Group()
+        db_session.flush()
+
+        GroupsJSONPresenter([group], pyramid_request).asdicts()
+        GroupsJSONPresenter([group], pyramid_request).asdicts(expand=["scopes"])
+
+        assert GroupJSONPresenter.call_count == 2
+
+    def test_it_doesnt_cache_groups_with_unflushed_changes(
+        self, factories, pyramid_request, db_session, GroupJSONPresenter
+    ):
+        group = factories.Group()
+        db_session.flush()
+        group.name = "Changed"
+
+        GroupsJSONPresenter([group], pyramid_request).asdicts()
+        GroupsJSONPresenter([group], pyramid_request).asdicts()
+
+        assert GroupJSONPresenter.call_count == 2
+
+    @pytest.mark.parametrize("factory", ("GroupScope", "Organization"))
+    def test_it_clears_the_cache_when_scopes_or_organizations_change(
+        self, factories, pyramid_request, db_session, factory
+    ):
+        group = factories.Group()
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        GroupsJSONPresenter([group], pyramid_request).asdicts()
+
+        getattr(factories, factory)()
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert not GROUP_JSON_CACHE
+
+    def test_it_doesnt_clear_the_cache_for_other_changes(
+        self, factories, pyramid_request, db_session
+    ):
+        group = factories.Group()
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        GroupsJSONPresenter([group], pyramid_request).asdicts()
+
+        factories.User()
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert len(GROUP_JSON_CACHE) == 1
+
+    @pytest.fixture
     def GroupJSONPresenter(self, patch):
         return patch("h.presenters.group_json.GroupJSONPresenter")
@@ -83,57 +83,199 @@ class TestConsumer:
 
 
 class TestPublisher:
-    def test_publish_annotation(self, producer, publisher, exchange):
+    def test_publish_annotation(self, publisher, batch_publisher):
         payload = {"action": "create", "annotation": {"id": "foobar"}}
 
         publisher.publish_annotation(payload)
 
-        producer.publish.assert_called_once_with(
-            payload,
-            exchange=exchange,
-            declare=[exchange],
-            routing_key="annotation",
-            retry=True,
-            retry_policy=RETRY_POLICY_VERY_QUICK,
-        )
+        batch_publisher.publish.assert_called_once_with("annotation", payload)
 
-    def test_publish_user(self, producer, publisher, exchange):
+    def test_publish_user(self, publisher, batch_publisher):
         payload = {"action": "create", "user": {"id": "foobar"}}
 
         publisher.publish_user(payload)
 
-        producer.publish.assert_called_once_with(
-            payload,
-            exchange=exchange,
-            declare=[exchange],
-            routing_key="user",
-            retry=True,
-            retry_policy=RETRY_POLICY_VERY_QUICK,
-        )
+        batch_publisher.publish.assert_called_once_with("user", payload)
 
-    @pytest.mark.parametrize("exception", (OperationalError, LimitExceeded))
     def test_it_raises_RealtimeMessageQueueError_on_errors(
-        self, publisher, producer, exception
+        self, publisher, batch_publisher
     ):
-        producer.publish.side_effect = exception
+        batch_publisher.publish.side_effect = RealtimeMessageQueueError
 
         with pytest.raises(RealtimeMessageQueueError):
             publisher.publish_user({})
 
     @pytest.fixture
-    def producer(self, patch):
-        producer_pool = patch("h.realtime.producer_pool")
-        with producer_pool["foobar"].acquire() as pool:
-            yield pool
+    def batch_publisher(self, pyramid_request):
+        batch_publisher = mock.create_autospec(
+            realtime.BatchPublisher, instance=True, spec_set=True
+        )
+        pyramid_request.registry[realtime.PUBLISHER_KEY] = batch_publisher
+        return batch_publisher
 
     @pytest.fixture
-    def publisher(self, pyramid_request):
+    def publisher(
+        self, pyramid_request, batch_publisher
+    ):  # pylint:disable=unused-argument
         return realtime.Publisher(pyramid_request)
 
+
+class TestBatchPublisher:
+    def test_publish_queues_the_message_for_the_background_thread(
+        self, publisher, producer, threading
+    ):
+        publisher.publish("annotation", {"id": "foobar"})
+
+        threading.Thread.assert_called_once_with(
+            target=publisher._run,  # pylint:disable=protected-access
+            name="realtime-publisher",
+            daemon=True,
+        )
+        threading.Thread.return_value.start.assert_called_once_with()
+        producer.publish.assert_not_called()
+        assert publisher.pop_metrics()["Queue_depth"] == 1
+
+    def test_publish_only_starts_one_thread(self, publisher, threading):
+        threading.Thread.return_value.is_alive.return_value = True
+
+        publisher.publish("annotation", {})
+        publisher.publish("annotation", {})
+
+        threading.Thread.assert_called_once()
+
+    def test_publish_restarts_the_thread_if_its_not_running(self, publisher, threading):
+        # For example in a process forked after the first publish
+        threading.Thread.return_value.is_alive.return_value = False
+
+        publisher.publish("annotation", {})
+        publisher.publish("annotation", {})
+
+        assert threading.Thread.call_count == 2
+
+    def test_publish_raises_if_the_queue_is_full(self, publisher):
+        for _ in range(3):
+            publisher.publish("annotation", {})
+
+        with pytest.raises(RealtimeMessageQueueError):
+            publisher.publish("annotation", {})
+
+        assert publisher.pop_metrics()["Dropped"] == 1
+
+    def test_flush_publishes_the_queued_messages(self, publisher, producer, exchange):
+        publisher.publish("annotation", {"id": "foobar"})
+        publisher.publish("user", {"userid": "acct:someone@example.com"})
+
+        publisher.flush()
+
+        assert producer.publish.call_args_list == [
+            mock.call(
+                payload,
+                exchange=exchange,
+                declare=[exchange],
+                routing_key=routing_key,
+                retry=True,
+                retry_policy=RETRY_POLICY_VERY_QUICK,
+            )
+            for routing_key, payload in (
+                ("annotation", {"id": "foobar"}),
+                ("user", {"userid": "acct:someone@example.com"}),
+            )
+        ]
+
+    def test_flush_publishes_in_batches(self, publisher, producer_pool):
+        for _ in range(3):
+            publisher.publish("annotation", {})
+
+        publisher.flush()
+
+        # One batch of two and one batch of one
+        assert producer_pool["foobar"].acquire.call_count == 2
+
+    def test_flush_does_nothing_with_no_messages(self, publisher, producer):
+        publisher.flush()
+
+        producer.publish.assert_not_called()
+
+    @pytest.mark.parametrize("exception", (OperationalError, LimitExceeded))
+    def test_flush_drops_the_batch_on_errors(
+        self, publisher, producer, report_exception, exception
+    ):
+        producer.publish.side_effect = [None, exception]
+        for _ in range(2):
+            publisher.publish("annotation", {})
+
+        publisher.flush()
+
+        report_exception.assert_called_once_with(Any.instance_of(exception))
+        metrics = publisher.pop_metrics()
+        assert metrics["Published"] == 1
+        assert metrics["Dropped"] == 1
+        assert not metrics["Queue_depth"]
+
+    def test_run_carries_on_after_unexpected_errors(
+        self, publisher, producer, report_exception
+    ):
+        class StopRunning(BaseException):
+            pass
+
+        error = ValueError()
+        producer.publish.side_effect = [error, StopRunning]
+        for _ in range(3):
+            publisher.publish("annotation", {})
+
+        with pytest.raises(StopRunning):
+            publisher._run()  # pylint:disable=protected-access
+
+        report_exception.assert_called_once_with(error)
+        assert publisher.pop_metrics()["Dropped"] == 3
+
+    @pytest.mark.usefixtures("producer")
+    def test_pop_metrics(self, publisher):
+        publisher.publish("annotation", {})
+        publisher.publish("annotation", {})
+        publisher.flush()
+        publisher.publish("annotation", {})
+
+        assert publisher.pop_metrics() == {
+            "Queue_depth": 1,
+            "Published": 2,
+            "Dropped": 0,
+            "Latency": Any.float(),
+        }
+        assert publisher.pop_metrics() == {
+            "Queue_depth": 1,
+            "Published": 0,
+            "Dropped": 0,
+            "Latency": 0.0,
+        }
+
+    @pytest.fixture
+    def publisher(self):
+        return realtime.BatchPublisher(
+            mock.sentinel.connection, max_queued=3, batch_size=2
+        )
+
+    @pytest.fixture
+    def producer_pool(self, patch):
+        return patch("h.realtime.producer_pool")
+
+    @pytest.fixture
+    def producer(self, producer_pool):
+        with producer_pool["foobar"].acquire() as producer:
+            return producer
+
     @pytest.fixture
     def exchange(self):
         return realtime.get_exchange()
 
+    @pytest.fixture(autouse=True)
+    def threading(self, patch):
+        return patch("h.realtime.threading")
+
+    @pytest.fixture(autouse=True)
+    def report_exception(self, patch):
+        return patch("h.realtime.report_exception")
+
 
 class TestGetExchange:
     def test_returns_the_exchange(self):
@@ -175,6 +317,14 @@ class TestGetConnection:
             Any.string(), transport_options=RETRY_POLICY_QUICK
         )
 
+    def test_it_adds_confirm_publish(self, Connection):
+        realtime.get_connection({}, fail_fast=True, confirm_publish=True)
+
+        Connection.assert_called_once_with(
+            Any.string(),
+            transport_options={**RETRY_POLICY_QUICK, "confirm_publish": True},
+        )
+
     @pytest.fixture
     def Connection(self, patch):
         return patch("h.realtime.kombu.Connection")
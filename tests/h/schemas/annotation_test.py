@@ -2,6 +2,7 @@ from copy import deepcopy
 from unittest import mock
 
 import pytest
+from elasticsearch_dsl import Search
 from webob.multidict import MultiDict, NestedMultiDict
 
 from h.schemas import ValidationError
@@ -12,7 +13,7 @@ from h.schemas.annotation import (
     URLMigrationSchema,
 )
 from h.schemas.util import validate_query_params
-from h.search.query import LIMIT_DEFAULT, LIMIT_MAX, OFFSET_MAX
+from h.search.query import LIMIT_DEFAULT, LIMIT_MAX, OFFSET_MAX, Sorter
 
 
 def create_annotation_schema_validate(request, data):
@@ -722,6 +723,24 @@ class TestSearchParamsSchema:
         assert not params["offset"]
         assert params["search_after"] == "2009-02-16"
 
+    def test_raises_if_invalid_cursor(self, schema):
+        input_params = NestedMultiDict(MultiDict({"cursor": "invalid"}))
+
+        with pytest.raises(ValidationError):
+            validate_query_params(schema, input_params)
+
+    def test_sets_offset_to_0_if_cursor(self, schema):
+        cursor = Sorter.cursor(
+            Search().sort({"updated": {"order": "desc"}}, "id")[0:1],
+            {"hits": {"hits": [{"sort": [1514764800000, "abc"]}]}},
+        )
+        input_params = NestedMultiDict(MultiDict({"cursor": cursor, "offset": 5}))
+
+        params = validate_query_params(schema, input_params)
+
+        assert not params["offset"]
+        assert params["cursor"] == cursor
+
     @pytest.mark.parametrize(
         "wildcard_uri", ("https://localhost:3000*", "file://localhost*/foo.pdf")
     )
@@ -11,6 +11,7 @@ from h.services.search_index._queue import Queue
 def group_service(pyramid_config):
     group_service = mock.create_autospec(GroupService, instance=True, spec_set=True)
     group_service.groupids_readable_by.return_value = ["__world__"]
+    group_service.member_readable_groupids.return_value = frozenset()
     pyramid_config.register_service(group_service, name="group")
     return group_service
 
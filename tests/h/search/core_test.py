@@ -6,6 +6,7 @@ Tests for filtering/matching/aggregating on specific annotation fields are in
 """
 
 import datetime
+from unittest import mock
 
 import pytest
 from h_matchers import Any
@@ -278,26 +279,74 @@ class TestSearchWithSeparateReplies:
         # separate_replies=True.
         assert result.reply_ids == [reply.id]
 
-    def test_only_200_replies_are_included(self, pyramid_request, Annotation):
+    def test_all_replies_are_included(self, pyramid_request, Annotation):
         """
-        No more than 200 replies can be included in reply_ids.
+        Every reply is included in reply_ids, however many there are.
 
-        200 is the total maximum number of replies (to all annotations in
-        annotation_ids) that can be included in reply_ids.
+        Replies are fetched in pages of _replies_limit (200) until there are
+        no more.
         """
         annotation = Annotation(shared=True)
-        oldest_reply = Annotation(references=[annotation.id], shared=True)
-
-        # Create three more replies so that the oldest reply will be pushed out
-        # of reply_ids. (We only need 3, not 200, because we're going to use
-        # the _replies_limit test seam to limit it to 3 replies instead of 200.
-        # This is just to make the test faster.)
-        for _ in range(3):
-            Annotation(references=[annotation.id], shared=True)
+        # Create enough replies to fill more than one page. (We only need 7,
+        # not 400, because we're going to use the _replies_limit test seam to
+        # page 3 replies at a time instead of 200. This is just to make the
+        # test faster.)
+        replies = [
+            Annotation(references=[annotation.id], shared=True) for _ in range(7)
+        ]
 
         result = search.Search(
             pyramid_request, separate_replies=True, _replies_limit=3
         ).run(MultiDict({}))
 
-        assert len(result.reply_ids) == 3
-        assert oldest_reply.id not in result.reply_ids
+        assert sorted(result.reply_ids) == sorted(reply.id for reply in replies)
+
+
+@pytest.mark.usefixtures("group_service", "nipsa_service")
+class TestSearchBatch:
+    def test_it_returns_the_results_of_each_search_in_order(
+        self, pyramid_request, Annotation
+    ):
+        annotation = Annotation(shared=True)
+        reply = Annotation(references=[annotation.id], shared=True)
+        other_annotation = Annotation(shared=True)
+
+        batch = search.SearchBatch(pyramid_request)
+        batch.add(search.Search(pyramid_request, separate_replies=True), MultiDict({}))
+        batch.add(search.Search(pyramid_request), MultiDict({"limit": 0}))
+        first, second = batch.run()
+
+        assert (
+            first.annotation_ids
+            == Any.list.containing([annotation.id, other_annotation.id]).only()
+        )
+        assert first.reply_ids == [reply.id]
+        assert second.total == 3
+
+    def test_it_sends_the_searches_in_one_request(self, pyramid_request, Annotation):
+        Annotation(shared=True)
+
+        batch = search.SearchBatch(pyramid_request)
+        for _ in range(3):
+            batch.add(search.Search(pyramid_request), MultiDict({}))
+
+        with mock.patch.object(
+            pyramid_request.es.conn, "msearch", wraps=pyramid_request.es.conn.msearch
+        ) as msearch:
+            results = batch.run()
+
+        msearch.assert_called_once()
+        assert [result.total for result in results] == [1, 1, 1]
+
+    def test_it_runs_a_single_search_on_its_own(self, pyramid_request):
+        search_ = mock.create_autospec(search.Search, instance=True, spec_set=True)
+        params = MultiDict({})
+
+        batch = search.SearchBatch(pyramid_request)
+        batch.add(search_, params)
+
+        assert batch.run() == [search_.run.return_value]
+        search_.run.assert_called_once_with(params)
+
+    def test_it_returns_nothing_with_no_searches(self, pyramid_request):
+        assert not search.SearchBatch(pyramid_request).run()
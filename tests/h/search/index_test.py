@@ -5,6 +5,7 @@ from unittest.mock import sentinel
 import elasticsearch
 import pytest
 
+from h.models import Annotation
 from h.search.index import BatchIndexer
 
 
@@ -97,6 +98,45 @@ class TestBatchIndexer:
             assert result.get("user") == ann.userid
             assert result.get("uri") == ann.target_uri
 
+    def test_it_presents_annotations_a_window_at_a_time(
+        self, batch_indexer, factories, es_helpers, AnnotationSearchIndexPresenter
+    ):
+        annotations = factories.Annotation.create_batch(3)
+        AnnotationSearchIndexPresenter.asdicts.side_effect = lambda window, _: [
+            {"id": annotation.id} for annotation in window
+        ]
+
+        batch_indexer.index([annotation.id for annotation in annotations], 2)
+        actions = list(es_helpers.streaming_bulk.call_args[0][1])
+
+        assert [
+            len(call[0][0])
+            for call in AnnotationSearchIndexPresenter.asdicts.call_args_list
+        ] == [2, 1]
+        assert sorted(data["id"] for _, data in actions) == sorted(
+            annotation.id for annotation in annotations
+        )
+
+    def test_it_indexes_annotations_matching_where(
+        self, batch_indexer, factories, es_helpers, AnnotationSearchIndexPresenter
+    ):
+        annotations = factories.Annotation.create_batch(2)
+        factories.Annotation(userid="acct:someone_else@example.com")
+        AnnotationSearchIndexPresenter.asdicts.side_effect = lambda window, _: [
+            {"id": annotation.id} for annotation in window
+        ]
+
+        batch_indexer.index(
+            where=Annotation.userid.in_(
+                [annotation.userid for annotation in annotations]
+            )
+        )
+        actions = list(es_helpers.streaming_bulk.call_args[0][1])
+
+        assert sorted(data["id"] for _, data in actions) == sorted(
+            annotation.id for annotation in annotations
+        )
+
     def test_it_returns_errored_annotation_ids(self, batch_indexer, factories):
         annotations = factories.Annotation.create_batch(3)
         expected_errored_ids = {annotations[0].id, annotations[2].id}
@@ -112,6 +152,39 @@ class TestBatchIndexer:
 
         assert errored == expected_errored_ids
 
+    def test_it_counts_the_annotations_it_indexed(self, batch_indexer, factories):
+        factories.Annotation.create_batch(3)
+
+        batch_indexer.index()
+
+        assert batch_indexer.indexed == 3
+
+    def test_delete_marks_annotations_as_deleted(
+        self, batch_indexer, factories, get_indexed_ann
+    ):
+        annotations = factories.Annotation.create_batch(3)
+        batch_indexer.index()
+
+        errored = batch_indexer.delete(
+            [annotation.id for annotation in annotations[:2]]
+        )
+
+        assert not errored
+        for annotation in annotations[:2]:
+            assert get_indexed_ann(annotation.id) == {"deleted": True}
+        assert get_indexed_ann(annotations[2].id) != {"deleted": True}
+
+    def test_delete_returns_errored_annotation_ids(self, batch_indexer):
+        elasticsearch.helpers.streaming_bulk = mock.Mock()
+        elasticsearch.helpers.streaming_bulk.return_value = [
+            (False, {"index": {"error": "some error", "_id": "id_1"}}),
+            (True, {}),
+        ]
+
+        errored = batch_indexer.delete(["id_1", "id_2"])
+
+        assert errored == {"id_1"}
+
     def test_it_does_not_error_if_annotations_already_indexed(
         self, db_session, es_client, factories, pyramid_request
     ):
@@ -140,6 +213,18 @@ class TestBatchIndexer:
         assert errored == expected_errored_ids
 
 
+@pytest.fixture
+def es_helpers(patch):
+    es_helpers = patch("h.search.index.es_helpers")
+    es_helpers.streaming_bulk.return_value = []
+    return es_helpers
+
+
+@pytest.fixture
+def AnnotationSearchIndexPresenter(patch):
+    return patch("h.search.index.presenters.AnnotationSearchIndexPresenter")
+
+
 @pytest.fixture
 def batch_indexer(  # pylint:disable=unused-argument
     db_session, es_client, pyramid_request, moderation_service
@@ -1,9 +1,12 @@
 # pylint: disable=too-many-lines
+import base64
 import datetime
+import json
 
 import elasticsearch_dsl
 import pytest
 import webob
+from h_matchers import Any
 
 from h.search import Search, query
 
@@ -243,6 +246,110 @@ class TestSorter:
 
         assert result.annotation_ids == [ann_ids[2]]
 
+    @pytest.mark.parametrize(
+        "sort_key,expected_sort",
+        (
+            (None, [{"updated": Any.dict()}, {"id": {"order": "desc"}}]),
+            ("user", [{"user_raw": Any.dict()}, {"id": {"order": "desc"}}]),
+            ("id", [{"id": Any.dict()}]),
+        ),
+    )
+    def test_it_breaks_ties_by_id(self, es_dsl_search, sort_key, expected_sort):
+        params = webob.multidict.MultiDict({"sort": sort_key} if sort_key else {})
+
+        q = query.Sorter()(es_dsl_search, params).to_dict()
+
+        assert q["sort"] == expected_sort
+
+    def test_it_does_not_break_ties_with_a_single_search_after(self, es_dsl_search):
+        params = webob.multidict.MultiDict({"search_after": "2018"})
+
+        q = query.Sorter()(es_dsl_search, params).to_dict()
+
+        assert q["sort"] == [{"updated": Any.dict()}]
+
+    def test_it_uses_the_sort_and_search_after_from_the_cursor(self, es_dsl_search):
+        cursor = self.encode_cursor(["created", "asc", [1514764800000, "abc"]])
+        params = webob.multidict.MultiDict(
+            {"cursor": cursor, "sort": "updated", "order": "desc"}
+        )
+
+        q = query.Sorter()(es_dsl_search, params).to_dict()
+
+        assert q["sort"] == [
+            {"created": {"order": "asc", "unmapped_type": "boolean"}},
+            {"id": {"order": "asc"}},
+        ]
+        assert q["search_after"] == [1514764800000, "abc"]
+
+    @pytest.mark.parametrize(
+        "cursor",
+        (
+            "not base64!",
+            "bm90IGpzb24",
+            pytest.param(None, id="wrong shape"),
+        ),
+    )
+    def test_it_ignores_invalid_cursors(self, es_dsl_search, cursor):
+        if cursor is None:
+            cursor = self.encode_cursor(["created", "sideways", [1, "abc"]])
+
+        q = query.Sorter()(
+            es_dsl_search, webob.multidict.MultiDict({"cursor": cursor})
+        ).to_dict()
+
+        assert "search_after" not in q
+        assert q["sort"][0] == {"updated": Any.dict()}
+
+    def test_cursor_round_trips(self, es_dsl_search):
+        search = query.Sorter()(
+            es_dsl_search[0:2], webob.multidict.MultiDict({"sort": "user"})
+        )
+        response = {"hits": {"hits": [{"sort": ["a", "1"]}, {"sort": ["b", "2"]}]}}
+
+        cursor = query.Sorter.cursor(search, response)
+
+        assert query.Sorter.decode_cursor(cursor) == ("user", "desc", ["b", "2"])
+
+    @pytest.mark.parametrize(
+        "hits,params",
+        (
+            ([], {}),
+            ([{"sort": ["a", "1"]}], {}),
+            ([{"sort": ["a"]}, {"sort": ["b"]}], {"search_after": "x", "sort": "user"}),
+        ),
+    )
+    def test_there_is_no_cursor_after_the_last_page(self, es_dsl_search, hits, params):
+        search = query.Sorter()(es_dsl_search[0:2], webob.multidict.MultiDict(params))
+
+        assert query.Sorter.cursor(search, {"hits": {"hits": hits}}) is None
+
+    def test_it_pages_through_annotations_with_the_cursor(self, Annotation, search):
+        dt = datetime.datetime
+        # Annotations with the same updated time are ordered by id
+        ann_ids = [
+            Annotation(id="1", updated=dt(2018, 1, 1)).id,
+            Annotation(id="2", updated=dt(2017, 1, 1)).id,
+            Annotation(id="3", updated=dt(2017, 1, 1)).id,
+            Annotation(id="4", updated=dt(2016, 1, 1)).id,
+        ]
+        search.append_modifier(query.Limiter())
+
+        pages = []
+        params = {"limit": 2, "order": "desc"}
+        while True:
+            result = search.run(webob.multidict.MultiDict(params))
+            pages.append(result.annotation_ids)
+            if not result.cursor:
+                break
+            params = {"limit": 2, "cursor": result.cursor}
+
+        assert pages == [[ann_ids[0], ann_ids[2]], [ann_ids[1], ann_ids[3]], []]
+
+    @staticmethod
+    def encode_cursor(payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
     def test_it_ignores_search_after_if_invalid_date_format(self, search, Annotation):
         dt = datetime.datetime
 
@@ -375,11 +482,36 @@ class TestGroupFilter:
 
         assert sorted(result.annotation_ids) == sorted(annotation_ids)
 
+    @pytest.mark.usefixtures("filter_readable_by_world")
+    def test_it_can_match_by_the_readable_by_world_flag(
+        self, search, Annotation, group_service, factories, pyramid_request
+    ):
+        open_group = factories.OpenGroup()
+        member_group, other_group = factories.Group.create_batch(2)
+        group_service.member_readable_groupids.return_value = {member_group.pubid}
+        Annotation(groupid=other_group.pubid, group=other_group, shared=True)
+        annotation_ids = [
+            Annotation(groupid=open_group.pubid, group=open_group).id,
+            Annotation(groupid=member_group.pubid, group=member_group).id,
+        ]
+
+        result = search.run(webob.multidict.MultiDict({}))
+
+        group_service.groupids_readable_by.assert_not_called()
+        group_service.member_readable_groupids.assert_called_once_with(
+            pyramid_request.user
+        )
+        assert sorted(result.annotation_ids) == sorted(annotation_ids)
+
     @pytest.fixture
     def search(self, pyramid_request, search):
         search.append_modifier(query.GroupFilter(pyramid_request))
         return search
 
+    @pytest.fixture
+    def filter_readable_by_world(self, pyramid_settings):
+        pyramid_settings["h.search.filter_readable_by_world"] = True
+
     @pytest.fixture
     def groups(self, factories):
         return factories.OpenGroup.create_batch(2)
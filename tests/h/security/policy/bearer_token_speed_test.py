@@ -0,0 +1,94 @@
+import random
+import time
+
+import pytest
+import sqlalchemy as sa
+
+from h import models
+from h.security.policy.bearer_token import IDENTITY_CACHE, BearerTokenPolicy
+from h.services.auth_token import TOKEN_CACHE, AuthTokenService
+from h.services.user import UserService
+
+AUTHORITY = "example.com"
+
+
+class FakeRequest:
+    """Just enough of a Pyramid request for `BearerTokenPolicy`."""
+
+    path = "/api/search"
+    GET = {}
+
+    def __init__(self, session, token):
+        self.headers = {"Authorization": f"Bearer {token}"}
+        # Each request gets new services, as a real request would
+        self._services = {
+            "auth_token": AuthTokenService(session),
+            "user": UserService(default_authority=AUTHORITY, session=session),
+        }
+
+    def find_service(self, name):
+        return self._services[name]
+
+    def add_finished_callback(self, callback):
+        ...
+
+
+@pytest.mark.skip("Only of use during development")
+class TestBearerTokenPolicySpeed:  # pragma: no cover
+    @pytest.mark.parametrize("reps", (1000, 20000))
+    @pytest.mark.parametrize("cold", (True, False))
+    def test_speed(self, db_session, tokens, reps, cold):
+        if not cold:
+            # Fill the caches as earlier requests would have
+            for token in tokens:
+                BearerTokenPolicy().identity(FakeRequest(db_session, token))
+
+        queries = 0
+
+        def count_query(*_args):
+            nonlocal queries
+            queries += 1
+
+        sa.event.listen(db_session.bind, "before_cursor_execute", count_query)
+        try:
+            start = time.perf_counter()
+            for _ in range(reps):
+                if cold:
+                    TOKEN_CACHE.clear()
+                    IDENTITY_CACHE.clear()
+
+                request = FakeRequest(db_session, random.choice(tokens))
+                assert BearerTokenPolicy().identity(request) is not None
+            millis = (time.perf_counter() - start) * 1000
+        finally:
+            sa.event.remove(db_session.bind, "before_cursor_execute", count_query)
+
+        print(
+            f"{'cold' if cold else 'warm'} x {reps}: {millis} ms, "
+            f"{millis / reps} ms/request, {queries / reps} queries/request"
+        )
+
+    @pytest.fixture
+    def tokens(self, db_session):
+        """Insert users with a token each and a few groups, returning the tokens."""
+        users = [
+            models.User(username=f"user{i}", authority=AUTHORITY) for i in range(1000)
+        ]
+        db_session.add_all(users)
+        for i in range(0, len(users), 10):
+            db_session.add(
+                models.Group(
+                    name=f"Group {i}",
+                    authority=AUTHORITY,
+                    creator=users[i],
+                    members=users[i : i + 10],
+                )
+            )
+        tokens = [
+            models.Token(userid=user.userid, value=f"6879-speed-test-{user.username}")
+            for user in users
+        ]
+        db_session.add_all(tokens)
+        db_session.flush()
+
+        return [token.value for token in tokens]
@@ -2,8 +2,9 @@ from unittest.mock import sentinel
 
 import pytest
 
+from h import cache
 from h.security import Identity
-from h.security.policy.bearer_token import BearerTokenPolicy
+from h.security.policy.bearer_token import IDENTITY_CACHE, BearerTokenPolicy
 
 
 @pytest.mark.usefixtures("user_service", "auth_token_service")
@@ -28,6 +29,24 @@ class TestBearerTokenPolicy:
 
         auth_token_service.get_bearer_token.assert_called_once()
 
+    def test_identity_caches_the_identity_across_requests(
+        self, pyramid_request, user_service
+    ):
+        first = BearerTokenPolicy().identity(pyramid_request)
+        second = BearerTokenPolicy().identity(pyramid_request)
+
+        user_service.fetch.assert_called_once()
+        assert second == first
+
+    def test_identity_caches_by_normalised_username(
+        self, pyramid_request, auth_token_service, user_service
+    ):
+        BearerTokenPolicy().identity(pyramid_request)
+        auth_token_service.validate.return_value.userid = "acct:Some.User@example.com"
+        BearerTokenPolicy().identity(pyramid_request)
+
+        user_service.fetch.assert_called_once()
+
     def test_identity_for_webservice(self, pyramid_request, auth_token_service):
         pyramid_request.path = "/ws"
         pyramid_request.GET["access_token"] = sentinel.access_token
@@ -57,3 +76,84 @@ class TestBearerTokenPolicy:
         user_service.fetch.return_value = None
 
         assert BearerTokenPolicy().identity(pyramid_request) is None
+        assert not IDENTITY_CACHE
+
+    @pytest.fixture(autouse=True)
+    def auth_token_service(self, auth_token_service):
+        auth_token_service.validate.return_value.userid = "acct:someuser@example.com"
+        return auth_token_service
+
+
+class TestIdentityCacheInvalidation:
+    def test_changing_a_user_invalidates_their_identity(self, user, db_session):
+        user.admin = True
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert IDENTITY_CACHE.get("someuser") is cache.TTLCache.MISSING
+
+    def test_renaming_a_user_invalidates_their_identity(self, user, db_session):
+        user.username = "new_username"
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert IDENTITY_CACHE.get("someuser") is cache.TTLCache.MISSING
+
+    def test_deleting_a_user_invalidates_their_identity(self, user, db_session):
+        db_session.delete(user)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert IDENTITY_CACHE.get("someuser") is cache.TTLCache.MISSING
+
+    @pytest.mark.parametrize("join", (True, False))
+    def test_changing_memberships_invalidates_the_identity(
+        self, user, db_session, factories, join
+    ):
+        group = factories.Group()
+        if not join:
+            group.members.append(user)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        IDENTITY_CACHE.set("someuser", sentinel.identity)
+
+        if join:
+            group.members.append(user)
+        else:
+            group.members.remove(user)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert IDENTITY_CACHE.get("someuser") is cache.TTLCache.MISSING
+
+    def test_deleting_a_group_invalidates_every_identity(
+        self, user, db_session, factories
+    ):
+        group = factories.Group()
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        IDENTITY_CACHE.set("otheruser", sentinel.identity)
+
+        db_session.delete(group)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert not IDENTITY_CACHE
+
+    def test_unrelated_changes_dont_invalidate_identities(
+        self, user, db_session, factories
+    ):
+        user.email = "new@example.com"
+        factories.Group()
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert IDENTITY_CACHE.get("someuser") == sentinel.identity
+
+    @pytest.fixture
+    def user(self, factories, db_session):
+        user = factories.User(username="some.User")
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        IDENTITY_CACHE.set("someuser", sentinel.identity)
+        return user
@@ -0,0 +1,220 @@
+import os
+from unittest import mock
+
+import pytest
+import sqlalchemy as sa
+
+from h.services.annotated_uri import (
+    AnnotatedURIFilter,
+    AnnotatedURIService,
+    annotated_uri_factory,
+)
+from h.util.bloom_filter import BloomFilter
+
+
+class TestAnnotatedURIService:
+    @pytest.mark.parametrize(
+        "uri,expected",
+        (
+            ("http://example.com/", True),
+            ("https://example.com", True),
+            ("http://example.org/", False),
+        ),
+    )
+    def test_has_ever_been_annotated(self, svc, uri, expected):
+        assert svc.has_ever_been_annotated(uri) is expected
+
+    def test_has_ever_been_annotated_uses_the_filter(self, svc, uri_filter):
+        uri_filter.refresh.return_value = True
+        uri_filter.__contains__.return_value = False
+
+        assert not svc.has_ever_been_annotated("http://example.com/")
+        uri_filter.__contains__.assert_called_once_with("httpx://example.com")
+
+    @pytest.mark.parametrize("refreshed,contains", ((True, True), (False, False)))
+    def test_has_ever_been_annotated_checks_the_db_if_the_filter_cant_say(
+        self, svc, uri_filter, refreshed, contains
+    ):
+        uri_filter.refresh.return_value = refreshed
+        uri_filter.__contains__.return_value = contains
+
+        assert svc.has_ever_been_annotated("http://example.com/")
+        assert not svc.has_ever_been_annotated("http://example.org/")
+
+    def test_build_filter(self, svc, db_session, tmp_path):
+        path = str(tmp_path / "uris.bloom")
+
+        count = svc.build_filter(path, error_rate=0.000001)
+
+        uri_filter = BloomFilter.load(path)
+        assert count == 1
+        assert "httpx://example.com" in uri_filter
+        assert "httpx://example.org" not in uri_filter
+        assert (
+            uri_filter.watermark
+            == db_session.execute("SELECT max(id) FROM document_uri").scalar()
+        )
+
+    @pytest.fixture(autouse=True)
+    def document_uri(self, factories, db_session):
+        document_uri = factories.DocumentURI(uri="http://example.com/")
+        db_session.flush()
+        return document_uri
+
+    @pytest.fixture
+    def uri_filter(self):
+        uri_filter = mock.create_autospec(AnnotatedURIFilter, instance=True)
+        uri_filter.__contains__ = mock.Mock()
+        return uri_filter
+
+    @pytest.fixture
+    def svc(self, db_session, request, uri_filter):
+        if "uri_filter" not in request.fixturenames:
+            uri_filter = None
+
+        return AnnotatedURIService(db_session, uri_filter=uri_filter)
+
+
+class TestAnnotatedURIFilter:
+    def test_it_loads_the_snapshot(self, uri_filter, db_session, snapshot):
+        snapshot.add("httpx://example.com")
+        snapshot.save(uri_filter.path)
+
+        assert uri_filter.refresh(db_session)
+        assert "httpx://example.com" in uri_filter
+        assert "httpx://example.org" not in uri_filter
+
+    def test_it_is_unusable_without_a_snapshot(self, uri_filter, db_session):
+        assert not uri_filter.refresh(db_session)
+
+    def test_it_adds_new_uris(self, uri_filter, db_session, snapshot, factories):
+        snapshot.save(uri_filter.path)
+        document_uri = factories.DocumentURI(uri="http://example.com/")
+        db_session.flush()
+
+        uri_filter.refresh(db_session)
+
+        assert "httpx://example.com" in uri_filter
+        assert uri_filter._watermark == document_uri.id
+
+    def test_it_does_not_write_new_uris_to_the_snapshot(
+        self, uri_filter, db_session, snapshot, factories
+    ):
+        snapshot.save(uri_filter.path)
+        factories.DocumentURI(uri="http://example.com/")
+        db_session.flush()
+
+        uri_filter.refresh(db_session)
+
+        assert "httpx://example.com" not in BloomFilter.load(uri_filter.path)
+        loaded_snapshot, _ = uri_filter._state
+        assert "httpx://example.com" not in loaded_snapshot
+
+    def test_it_only_refreshes_periodically(
+        self, uri_filter, db_session, snapshot, factories, time
+    ):
+        snapshot.save(uri_filter.path)
+        time.monotonic.return_value = 1000
+        uri_filter.refresh(db_session)
+        factories.DocumentURI(uri="http://example.com/")
+        db_session.flush()
+
+        time.monotonic.return_value = 1000 + AnnotatedURIFilter.REFRESH_INTERVAL - 1
+        uri_filter.refresh(db_session)
+        assert "httpx://example.com" not in uri_filter
+
+        time.monotonic.return_value = 1000 + AnnotatedURIFilter.REFRESH_INTERVAL
+        uri_filter.refresh(db_session)
+        assert "httpx://example.com" in uri_filter
+
+    def test_it_reloads_replaced_snapshots(
+        self, uri_filter, db_session, snapshot, time
+    ):
+        snapshot.save(uri_filter.path)
+        time.monotonic.return_value = 1000
+        uri_filter.refresh(db_session)
+
+        replacement = BloomFilter.for_capacity(100, 0.01)
+        replacement.add("httpx://example.com")
+        replacement.save(uri_filter.path)
+        time.monotonic.return_value = 2000
+        uri_filter.refresh(db_session)
+
+        assert "httpx://example.com" in uri_filter
+
+    def test_it_adds_new_uris_to_replaced_snapshots_before_using_them(
+        self, uri_filter, db_session, snapshot, factories, time
+    ):
+        snapshot.save(uri_filter.path)
+        time.monotonic.return_value = 1000
+        uri_filter.refresh(db_session)
+        factories.DocumentURI(uri="http://example.com/")
+        db_session.flush()
+
+        BloomFilter.for_capacity(100, 0.01).save(uri_filter.path)
+        time.monotonic.return_value = 2000
+        uri_filter.refresh(db_session)
+
+        assert "httpx://example.com" in uri_filter
+
+    def test_it_keeps_the_old_filter_if_adding_new_uris_fails(
+        self, uri_filter, db_session, snapshot, time
+    ):
+        snapshot.add("httpx://example.com")
+        snapshot.save(uri_filter.path)
+        time.monotonic.return_value = 1000
+        uri_filter.refresh(db_session)
+
+        BloomFilter.for_capacity(100, 0.01).save(uri_filter.path)
+        time.monotonic.return_value = 2000
+        with mock.patch.object(
+            db_session, "execute", side_effect=sa.exc.OperationalError("", {}, None)
+        ):
+            assert uri_filter.refresh(db_session)
+
+        assert "httpx://example.com" in uri_filter
+
+    def test_it_keeps_the_old_filter_if_refreshing_fails(
+        self, uri_filter, db_session, snapshot, time, tmp_path
+    ):
+        snapshot.add("httpx://example.com")
+        snapshot.save(uri_filter.path)
+        time.monotonic.return_value = 1000
+        uri_filter.refresh(db_session)
+
+        corrupt_path = tmp_path / "corrupt.bloom"
+        corrupt_path.write_bytes(b"corrupt")
+        os.replace(corrupt_path, uri_filter.path)
+        time.monotonic.return_value = 2000
+
+        assert uri_filter.refresh(db_session)
+        assert "httpx://example.com" in uri_filter
+
+    @pytest.fixture
+    def snapshot(self):
+        return BloomFilter.for_capacity(100, 0.01)
+
+    @pytest.fixture
+    def uri_filter(self, tmp_path):
+        return AnnotatedURIFilter(str(tmp_path / "uris.bloom"))
+
+    @pytest.fixture
+    def time(self, patch):
+        return patch("h.services.annotated_uri.time")
+
+
+class TestAnnotatedURIFactory:
+    def test_it(self, pyramid_request):
+        svc = annotated_uri_factory(None, pyramid_request)
+
+        assert isinstance(svc, AnnotatedURIService)
+        assert svc._uri_filter is None
+
+    def test_it_shares_a_filter_per_path(self, pyramid_request):
+        pyramid_request.registry.settings["h.badge.uri_filter_path"] = "/uris.bloom"
+
+        svc = annotated_uri_factory(None, pyramid_request)
+        other_svc = annotated_uri_factory(None, pyramid_request)
+
+        assert svc._uri_filter.path == "/uris.bloom"
+        assert svc._uri_filter is other_svc._uri_filter
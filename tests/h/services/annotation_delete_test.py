@@ -1,8 +1,10 @@
+import datetime as datetime_
 from unittest import mock
 
 import pytest
+from h_matchers import Any
 
-from h.events import AnnotationEvent
+from h.events import AnnotationEvent, AnnotationsDeletedEvent
 from h.services.annotation_delete import annotation_delete_service_factory
 
 
@@ -40,6 +42,68 @@ class TestAnnotationDeleteService:
         assert svc.delete.mock_calls == [mock.call(anns[0]), mock.call(anns[1])]
 
 
+@pytest.mark.usefixtures("search_index")
+class TestBulkDelete:
+    def test_delete_user_annotations(self, svc, factories, datetime, search_index):
+        datetime.utcnow.return_value = datetime_.datetime(2022, 1, 1)
+        user = factories.User()
+        annotations = factories.Annotation.create_batch(2, userid=user.userid)
+        other = factories.Annotation()
+
+        svc.delete_user_annotations(user.userid)
+
+        assert all(annotation.deleted for annotation in annotations)
+        assert all(
+            annotation.updated == datetime.utcnow.return_value
+            for annotation in annotations
+        )
+        assert not other.deleted
+        search_index.queue_users_annotations.assert_called_once_with(
+            user.userid, tag="AnnotationDeleteService.delete_user"
+        )
+
+    def test_delete_group_annotations(self, svc, factories, search_index):
+        group = factories.Group()
+        annotations = factories.Annotation.create_batch(2, groupid=group.pubid)
+        other = factories.Annotation()
+
+        svc.delete_group_annotations(group.pubid)
+
+        assert all(annotation.deleted for annotation in annotations)
+        assert not other.deleted
+        search_index.queue_group_annotations.assert_called_once_with(
+            group.pubid, tag="AnnotationDeleteService.delete_group"
+        )
+
+    def test_it_publishes_one_event_for_all_the_annotations(
+        self, svc, factories, pyramid_request
+    ):
+        user = factories.User()
+        annotations = factories.Annotation.create_batch(2, userid=user.userid)
+        # Annotations which are already deleted aren't deleted again
+        factories.Annotation(userid=user.userid, deleted=True)
+
+        svc.delete_user_annotations(user.userid)
+
+        pyramid_request.notify_after_commit.assert_called_once_with(
+            Any.instance_of(AnnotationsDeletedEvent).with_attrs(
+                {
+                    "request": pyramid_request,
+                    "annotation_ids": Any.list.containing(
+                        [annotation.id for annotation in annotations]
+                    ).only(),
+                }
+            )
+        )
+
+    def test_it_doesnt_publish_an_event_if_nothing_was_deleted(
+        self, svc, factories, pyramid_request
+    ):
+        svc.delete_user_annotations(factories.User().userid)
+
+        pyramid_request.notify_after_commit.assert_not_called()
+
+
 @pytest.fixture
 def annotation(factories):
     return lambda factories=factories: factories.Annotation()
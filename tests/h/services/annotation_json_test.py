@@ -6,8 +6,15 @@ from h_matchers import Any
 from pyramid.authorization import Everyone
 from sqlalchemy import event
 
+from h import cache
+from h.cache import TTLCache
+from h.models.group import ReadableBy
 from h.security.permissions import Permission
-from h.services.annotation_json import AnnotationJSONService, factory
+from h.services.annotation_json import (
+    ANNOTATION_JSON_CACHE,
+    AnnotationJSONService,
+    factory,
+)
 from h.traversal import AnnotationContext
 
 
@@ -105,6 +112,101 @@ class TestAnnotationJSONService:
         identity_permits.assert_not_called()
         assert presented["permissions"]["read"] == ["group:__world__"]
 
+    def test_present_caches_the_presentation(
+        self, service, annotation, db_session, links_service, DocumentJSONPresenter
+    ):
+        db_session.flush()
+
+        first = service.present(annotation)
+        second = service.present(annotation)
+
+        links_service.get_all.assert_called_once_with(annotation)
+        assert second == first
+        # Documents can change without the annotation changing
+        assert DocumentJSONPresenter.call_count == 2
+
+    def test_present_doesnt_use_cached_older_versions(
+        self, service, annotation, db_session, links_service
+    ):
+        db_session.flush()
+        service.present(annotation)
+
+        annotation.updated = datetime(2030, 1, 1)
+        db_session.flush()
+        result = service.present(annotation)
+
+        assert links_service.get_all.call_count == 2
+        assert result["updated"] == "2030-01-01T00:00:00.000000+00:00"
+
+    def test_present_doesnt_cache_annotations_with_unflushed_changes(
+        self, service, annotation, db_session, links_service
+    ):
+        db_session.flush()
+        annotation.text = "Changed"
+
+        service.present(annotation)
+        service.present(annotation)
+
+        assert links_service.get_all.call_count == 2
+
+    def test_present_returns_copies_of_cached_presentations(
+        self, service, annotation, db_session
+    ):
+        db_session.flush()
+
+        service.present(annotation)["text"] = "Changed"
+
+        assert service.present(annotation)["text"] == annotation.text
+
+    def test_changing_an_annotation_invalidates_its_cached_presentation(
+        self, service, annotation, db_session
+    ):
+        db_session.flush()
+        service.present(annotation)
+
+        annotation.userid = "acct:renamed@example.com"
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert ANNOTATION_JSON_CACHE.get(annotation.id) is TTLCache.MISSING
+
+    @pytest.mark.parametrize(
+        "change",
+        (
+            lambda user, _group: setattr(user, "display_name", "Changed"),
+            lambda user, _group: setattr(user, "username", "changed"),
+            lambda _user, group: setattr(group, "readable_by", ReadableBy.members),
+        ),
+    )
+    def test_changing_users_or_groups_clears_the_cache(
+        self, service, annotation, user, factories, db_session, change
+    ):
+        group = factories.OpenGroup()
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        service.present(annotation)
+
+        change(user, group)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert not ANNOTATION_JSON_CACHE
+
+    def test_other_changes_dont_invalidate_the_cache(
+        self, service, annotation, user, factories, db_session
+    ):
+        group = factories.OpenGroup()
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        service.present(annotation)
+
+        user.email = "changed@example.com"
+        group.name = "Changed"
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert len(ANNOTATION_JSON_CACHE) == 1
+
     def test_present_for_user(self, service, user, annotation, flag_service):
         result = service.present_for_user(annotation, user)
 
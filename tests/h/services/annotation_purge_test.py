@@ -0,0 +1,199 @@
+import time as time_
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from h_matchers import Any
+
+from h.models import Annotation
+from h.services.annotation_purge import AnnotationPurgeService, annotation_purge_factory
+
+CUTOFF = datetime(2022, 1, 1)
+
+
+class TestAnnotationPurgeService:
+    def test_it_purges_deleted_annotations_from_before_the_cutoff(
+        self, svc, factories, db_session
+    ):
+        purged = factories.Annotation.create_batch(
+            2, deleted=True, updated=CUTOFF - timedelta(days=1)
+        )
+        kept = [
+            factories.Annotation(deleted=True, updated=CUTOFF + timedelta(days=1)),
+            factories.Annotation(deleted=False, updated=CUTOFF - timedelta(days=1)),
+        ]
+        purged_ids = [annotation.id for annotation in purged]
+
+        list(svc.purge(CUTOFF, max_batches=10))
+
+        remaining = [annotation.id for annotation in db_session.query(Annotation)]
+        assert (
+            remaining
+            == Any.list.containing([annotation.id for annotation in kept]).only()
+        )
+        assert not set(remaining) & set(purged_ids)
+
+    def test_it_deletes_the_annotations_from_Elasticsearch(
+        self, svc, factories, es_helpers, mock_es_client
+    ):
+        annotation = factories.Annotation(
+            deleted=True, updated=CUTOFF - timedelta(days=1)
+        )
+
+        actions = []
+        es_helpers.streaming_bulk.side_effect = (
+            lambda _conn, actions_, **_kwargs: actions.extend(actions_) or []
+        )
+
+        list(svc.purge(CUTOFF, max_batches=10))
+
+        es_helpers.streaming_bulk.assert_called_once_with(
+            mock_es_client.conn, Any(), raise_on_error=False
+        )
+        assert actions == [
+            {
+                "_op_type": "delete",
+                "_index": "hypothesis",
+                "_type": "annotation",
+                "_id": annotation.id,
+            }
+        ]
+
+    def test_it_purges_in_batches_and_commits_each_one(
+        self, svc, deleted_annotations, transaction_manager
+    ):
+        metrics = list(svc.purge(CUTOFF, max_batches=10, batch_size=2))
+
+        assert [batch["Purged"] for batch in metrics] == [2, 2, 1]
+        assert transaction_manager.commit.call_count == 3
+
+    @pytest.mark.usefixtures("deleted_annotations")
+    def test_it_stops_after_max_batches(self, svc, db_session):
+        metrics = list(svc.purge(CUTOFF, max_batches=2, batch_size=2))
+
+        assert len(metrics) == 2
+        assert db_session.query(Annotation).count() == 1
+
+    @pytest.mark.usefixtures("deleted_annotations")
+    def test_it_purges_the_oldest_annotations_first(
+        self, svc, db_session, deleted_annotations
+    ):
+        list(svc.purge(CUTOFF, max_batches=1, batch_size=4))
+
+        assert [annotation.id for annotation in db_session.query(Annotation)] == [
+            deleted_annotations[-1].id
+        ]
+
+    def test_it_does_nothing_if_there_are_no_annotations_to_purge(
+        self, svc, es_helpers, transaction_manager
+    ):
+        assert not list(svc.purge(CUTOFF, max_batches=10))
+
+        es_helpers.streaming_bulk.assert_not_called()
+        transaction_manager.commit.assert_not_called()
+        transaction_manager.abort.assert_called_once_with()
+
+    def test_it_leaves_annotations_which_failed_to_delete_from_Elasticsearch(
+        self, svc, deleted_annotations, es_helpers, db_session
+    ):
+        es_helpers.streaming_bulk.side_effect = lambda _conn, actions, **_kwargs: [
+            (False, {"delete": {"_id": deleted_annotations[0].id, "status": 500}}),
+            # Annotations which aren't in Elasticsearch can still be purged
+            (False, {"delete": {"_id": deleted_annotations[1].id, "status": 404}}),
+        ]
+
+        metrics = list(svc.purge(CUTOFF, max_batches=1))
+
+        assert [annotation.id for annotation in db_session.query(Annotation)] == [
+            deleted_annotations[0].id
+        ]
+        assert metrics[0]["Purged"] == 4
+        assert metrics[0]["Failed_in_Elastic"] == 1
+
+    @pytest.mark.usefixtures("deleted_annotations")
+    def test_it_reports_metrics_for_each_batch(self, svc):
+        metrics = list(svc.purge(CUTOFF, max_batches=10, batch_size=3))
+
+        assert metrics == [
+            {
+                "Purged": count,
+                "Failed_in_Elastic": 0,
+                "Paused": 0.0,
+                "Duration/Total": Any.float(),
+                "Duration/Fetch_from_db": Any.float(),
+                "Duration/Delete_from_Elastic": Any.float(),
+                "Duration/Delete_from_db": Any.float(),
+            }
+            for count in (3, 2)
+        ]
+
+    @pytest.mark.usefixtures("deleted_annotations")
+    def test_it_pauses_after_slow_batches(self, svc, monkeypatch, time):
+        monkeypatch.setattr(AnnotationPurgeService, "SLOW_BATCH", -1)
+
+        metrics = list(svc.purge(CUTOFF, max_batches=10, batch_size=3))
+
+        assert time.sleep.call_args_list == [
+            mock.call(batch["Duration/Total"]) for batch in metrics
+        ]
+        assert [batch["Paused"] for batch in metrics] == [
+            batch["Duration/Total"] for batch in metrics
+        ]
+
+    @pytest.mark.usefixtures("deleted_annotations")
+    def test_it_doesnt_pause_after_fast_batches(self, svc, time):
+        list(svc.purge(CUTOFF, max_batches=10, batch_size=3))
+
+        time.sleep.assert_not_called()
+
+    @pytest.fixture
+    def deleted_annotations(self, factories):
+        return [
+            factories.Annotation(deleted=True, updated=CUTOFF - timedelta(days=days))
+            for days in range(5, 0, -1)
+        ]
+
+    @pytest.fixture
+    def transaction_manager(self):
+        return mock.Mock(spec_set=["commit", "abort"])
+
+    @pytest.fixture
+    def svc(self, db_session, mock_es_client, transaction_manager):
+        return AnnotationPurgeService(db_session, mock_es_client, transaction_manager)
+
+    @pytest.fixture(autouse=True)
+    def es_helpers(self, patch):
+        es_helpers = patch("h.services.annotation_purge.es_helpers")
+        es_helpers.streaming_bulk.side_effect = lambda _conn, actions, **_kwargs: [
+            (True, {"delete": {"_id": action["_id"], "status": 200}})
+            for action in actions
+        ]
+        return es_helpers
+
+    @pytest.fixture(autouse=True)
+    def time(self, patch):
+        time = patch("h.services.annotation_purge.time")
+        time.perf_counter.side_effect = time_.perf_counter
+        return time
+
+
+class TestAnnotationPurgeFactory:
+    def test_it(self, pyramid_request, AnnotationPurgeService):
+        svc = annotation_purge_factory(None, pyramid_request)
+
+        AnnotationPurgeService.assert_called_once_with(
+            session=pyramid_request.db,
+            es_client=pyramid_request.es,
+            transaction_manager=pyramid_request.tm,
+        )
+        assert svc == AnnotationPurgeService.return_value
+
+    @pytest.fixture
+    def pyramid_request(self, pyramid_request):
+        pyramid_request.es = mock.sentinel.es
+        pyramid_request.tm = mock.sentinel.tm
+        return pyramid_request
+
+    @pytest.fixture
+    def AnnotationPurgeService(self, patch):
+        return patch("h.services.annotation_purge.AnnotationPurgeService")
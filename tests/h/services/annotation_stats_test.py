@@ -78,6 +78,18 @@ class TestAnnotationStatsService:
 
         assert anns == 3
 
+    def test_user_annotation_count_search(
+        self, svc, search, pyramid_request, top_level_annotation_filter
+    ):
+        result = svc.user_annotation_count_search("userid")
+
+        search.assert_called_with(pyramid_request)
+        search.return_value.append_modifier.assert_called_with(
+            top_level_annotation_filter.return_value
+        )
+        search.return_value.run.assert_not_called()
+        assert result == (search.return_value, {"limit": 0, "user": "userid"})
+
     def test_group_annotation_count_calls_search_with_request(
         self, svc, search, pyramid_request
     ):
@@ -106,6 +118,18 @@ class TestAnnotationStatsService:
 
         assert anns == 3
 
+    def test_group_annotation_count_search(
+        self, svc, search, pyramid_request, top_level_annotation_filter
+    ):
+        result = svc.group_annotation_count_search("groupid")
+
+        search.assert_called_with(pyramid_request)
+        search.return_value.append_modifier.assert_called_with(
+            top_level_annotation_filter.return_value
+        )
+        search.return_value.run.assert_not_called()
+        assert result == (search.return_value, {"limit": 0, "group": "groupid"})
+
 
 class TestAnnotationStatsFactory:
     def test_returns_service(self):
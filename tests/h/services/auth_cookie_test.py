@@ -2,11 +2,20 @@ from datetime import datetime, timedelta
 from unittest.mock import create_autospec, sentinel
 
 import pytest
+import sqlalchemy as sa
 from h_matchers import Any
+from kombu.exceptions import OperationalError
 from webob.cookies import SignedCookieProfile
 
+from h import cache
 from h.models import AuthTicket
-from h.services.auth_cookie import AuthCookieService, factory
+from h.services.auth_cookie import (
+    TICKET_CACHE,
+    AuthCookieService,
+    TicketRefreshBuffer,
+    factory,
+    ticket_cache_key,
+)
 
 
 def assert_nearly_equal(first_date, second_date):
@@ -17,11 +26,13 @@ def assert_nearly_equal(first_date, second_date):
 
 class TestAuthCookieService:
     @pytest.mark.usefixtures("with_valid_cookie")
-    def test_verify_cookie(self, service, auth_ticket):
-        assert service.verify_cookie() == auth_ticket.user
+    def test_verify_cookie(self, service, auth_ticket, user_service):
+        assert service.verify_cookie() == user_service.fetch.return_value
         # We also set the cache as a side effect
 
-        assert service._user == auth_ticket.user  # pylint: disable=protected-access
+        user_service.fetch.assert_called_once_with(auth_ticket.user_userid)
+        # pylint: disable=protected-access
+        assert service._user == user_service.fetch.return_value
 
     def test_verify_cookie_short_circuits_if_user_cache_is_set(self, service):
         # pylint: disable=protected-access
@@ -39,6 +50,13 @@ class TestAuthCookieService:
 
         assert service.verify_cookie() is None
 
+    def test_verify_cookie_returns_None_if_the_userid_doesnt_match(
+        self, service, cookie, auth_ticket
+    ):
+        cookie.get_value.return_value = "acct:other@example.com", auth_ticket.id
+
+        assert service.verify_cookie() is None
+
     @pytest.mark.usefixtures("with_valid_cookie")
     def test_verify_cookie_returns_None_if_the_ticket_has_expired(
         self, service, auth_ticket
@@ -47,6 +65,32 @@ class TestAuthCookieService:
 
         assert service.verify_cookie() is None
 
+    @pytest.mark.usefixtures("with_valid_cookie")
+    def test_verify_cookie_returns_None_if_the_cached_ticket_has_expired(
+        self, service, auth_ticket
+    ):
+        service.verify_cookie()
+        key = ticket_cache_key(auth_ticket.id)
+        TICKET_CACHE.set(
+            key,
+            TICKET_CACHE.get(key)._replace(
+                expires=datetime.utcnow() - timedelta(seconds=1)
+            ),
+        )
+
+        assert self.new_service(service).verify_cookie() is None
+
+    @pytest.mark.usefixtures("with_valid_cookie")
+    def test_verify_cookie_caches_the_ticket_across_requests(
+        self, service, db_session, user_service
+    ):
+        service.verify_cookie()
+        db_session.execute(sa.delete(AuthTicket))
+
+        assert (
+            self.new_service(service).verify_cookie() == user_service.fetch.return_value
+        )
+
     @pytest.mark.parametrize(
         "offset,expect_update",
         (
@@ -57,20 +101,70 @@ class TestAuthCookieService:
         ),
     )
     @pytest.mark.usefixtures("with_valid_cookie")
-    def test_verify_cookie_updates_the_expiry_time(
-        self, service, auth_ticket, offset, expect_update
+    def test_verify_cookie_buffers_extending_the_expiry_time(
+        self, service, auth_ticket, offset, expect_update, TICKET_REFRESH_BUFFER
     ):
         auth_ticket.updated = datetime.utcnow() - offset
         expires = auth_ticket.expires
 
         service.verify_cookie()
 
+        # The DB is left alone until the buffer is flushed
+        assert auth_ticket.expires == expires
+        cached_ticket = TICKET_CACHE.get(ticket_cache_key(auth_ticket.id))
         if expect_update:
+            TICKET_REFRESH_BUFFER.add.assert_called_once_with(auth_ticket.id)
             assert_nearly_equal(
-                auth_ticket.expires, datetime.utcnow() + AuthCookieService.TICKET_TTL
+                cached_ticket.expires, datetime.utcnow() + AuthCookieService.TICKET_TTL
             )
         else:
-            assert auth_ticket.expires == expires
+            TICKET_REFRESH_BUFFER.add.assert_not_called()
+            assert cached_ticket.expires == expires
+
+    @pytest.mark.usefixtures("with_valid_cookie")
+    def test_verify_cookie_extends_the_buffered_tickets_when_its_time(
+        self, service, auth_ticket, TICKET_REFRESH_BUFFER, auth
+    ):
+        auth_ticket.updated = datetime.utcnow() - timedelta(days=1)
+        TICKET_REFRESH_BUFFER.add.return_value = [sentinel.ticket_id]
+
+        service.verify_cookie()
+
+        auth.extend_auth_tickets.delay.assert_called_once_with(
+            [sentinel.ticket_id], Any.instance_of(datetime)
+        )
+        assert_nearly_equal(
+            auth.extend_auth_tickets.delay.call_args[0][1],
+            datetime.utcnow() + AuthCookieService.TICKET_TTL,
+        )
+
+    @pytest.mark.usefixtures("with_valid_cookie")
+    def test_verify_cookie_reports_errors_extending_the_buffered_tickets(
+        self,
+        service,
+        auth_ticket,
+        user_service,
+        TICKET_REFRESH_BUFFER,
+        auth,
+        report_exception,
+    ):
+        auth_ticket.updated = datetime.utcnow() - timedelta(days=1)
+        TICKET_REFRESH_BUFFER.add.return_value = [sentinel.ticket_id]
+        error = OperationalError()
+        auth.extend_auth_tickets.delay.side_effect = error
+
+        assert service.verify_cookie() == user_service.fetch.return_value
+        report_exception.assert_called_once_with(error)
+
+    @pytest.mark.usefixtures("with_valid_cookie")
+    def test_verify_cookie_doesnt_extend_tickets_until_its_time(
+        self, service, auth_ticket, auth
+    ):
+        auth_ticket.updated = datetime.utcnow() - timedelta(days=1)
+
+        service.verify_cookie()
+
+        auth.extend_auth_tickets.delay.assert_not_called()
 
     def test_create_cookie(self, service, user, user_service, cookie, db_session):
         user_service.fetch.return_value = user
@@ -106,9 +200,31 @@ class TestAuthCookieService:
         assert service._user is None  # pylint: disable=protected-access
         assert db_session.query(AuthTicket).first() is None
 
+    def test_revoke_cookie_invalidates_the_cached_ticket(
+        self, service, db_session, auth_ticket, cookie
+    ):
+        cookie.get_value.return_value = auth_ticket.user_userid, auth_ticket.id
+        service.verify_cookie()
+
+        service.revoke_cookie()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert (
+            TICKET_CACHE.get(ticket_cache_key(auth_ticket.id)) is TICKET_CACHE.MISSING
+        )
+
     def test_revoke_cookie_is_ok_without_a_cookie(self, service):
         service.revoke_cookie()
 
+    def new_service(self, service):
+        """Return a service for a new request with the same cookie."""
+        # pylint: disable=protected-access
+        return AuthCookieService(
+            session=service._session,
+            user_service=service._user_service,
+            cookie=service._cookie,
+        )
+
     @pytest.fixture
     def user(self, factories):
         return factories.User()
@@ -133,6 +249,43 @@ class TestAuthCookieService:
             session=db_session, user_service=user_service, cookie=cookie
         )
 
+    @pytest.fixture
+    def TICKET_REFRESH_BUFFER(self, patch):
+        TICKET_REFRESH_BUFFER = patch("h.services.auth_cookie.TICKET_REFRESH_BUFFER")
+        TICKET_REFRESH_BUFFER.add.return_value = []
+        return TICKET_REFRESH_BUFFER
+
+    @pytest.fixture(autouse=True)
+    def auth(self, patch):
+        return patch("h.services.auth_cookie.auth")
+
+    @pytest.fixture
+    def report_exception(self, patch):
+        return patch("h.services.auth_cookie.report_exception")
+
+
+class TestTicketRefreshBuffer:
+    def test_it_collects_ticket_ids(self, buffer):
+        assert buffer.add("ticket_2") == []
+        assert buffer.add("ticket_1") == []
+
+    def test_it_flushes_when_full(self, buffer):
+        for ticket_id in ("ticket_3", "ticket_1", "ticket_1"):
+            buffer.add(ticket_id)
+
+        assert buffer.add("ticket_2") == ["ticket_1", "ticket_2", "ticket_3"]
+        assert buffer.add("ticket_4") == []
+
+    def test_it_flushes_after_the_interval(self, buffer):
+        buffer.add("ticket_1")
+        buffer.flush_interval = 0
+
+        assert buffer.add("ticket_2") == ["ticket_1", "ticket_2"]
+
+    @pytest.fixture
+    def buffer(self):
+        return TicketRefreshBuffer(flush_interval=60, maxsize=3)
+
 
 class TestFactory:
     def test_it(
@@ -1,12 +1,17 @@
 import datetime
 
 import pytest
+import sqlalchemy as sa
 from pytest import param
 
+from h import cache
+from h.models import Token
 from h.services.auth_token import (
+    TOKEN_CACHE,
     AuthTokenService,
     LongLivedToken,
     auth_token_service_factory,
+    token_cache_key,
 )
 
 
@@ -50,6 +55,41 @@ class TestAuthTokenService:
         result = svc.validate("abcde123")
 
         assert result is None
+        assert not TOKEN_CACHE
+
+    def test_validate_caches_tokens_across_requests(self, svc, token, db_session):
+        svc.validate(token.value)
+        # A bulk delete bypasses the cache invalidation
+        db_session.execute(sa.delete(Token))
+
+        result = AuthTokenService(db_session).validate(token.value)
+
+        assert result.userid == token.userid
+
+    def test_changing_a_token_invalidates_the_cache(self, svc, token, db_session):
+        svc.validate(token.value)
+
+        token.expires = self.time(-1)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert svc.validate(token.value) is None
+
+    def test_deleting_a_token_invalidates_the_cache(self, svc, token, db_session):
+        svc.validate(token.value)
+
+        db_session.delete(token)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert svc.validate(token.value) is None
+
+    def test_token_cache_key(self):
+        key = token_cache_key("6879-a_token")
+
+        assert key == token_cache_key("6879-a_token")
+        assert key != token_cache_key("6879-another_token")
+        assert "a_token" not in key
 
     def test_fetch_returns_database_model(self, svc, token):
         assert svc.fetch(token.value) == token
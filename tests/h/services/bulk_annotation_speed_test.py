@@ -0,0 +1,87 @@
+import json
+import time
+import tracemalloc
+
+import pytest
+import sqlalchemy as sa
+
+from h.models import Annotation
+from h.services.bulk_annotation import BulkAnnotationService
+
+
+@pytest.mark.skip("Only of use during development")
+class TestAnnotationSearchSpeed:  # pragma: no cover
+    AUTHORITY = "example.com"
+    FIELDS = ["author.username", "group.authority_provided_id"]
+
+    @pytest.mark.parametrize("count", (10000, 200000))
+    @pytest.mark.parametrize("materialize", (True, False))
+    def test_speed(self, db_session, factories, count, materialize):
+        viewer = self.insert_annotations(db_session, factories, count)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        first_row = None
+
+        results = BulkAnnotationService(db_session).annotation_search(
+            authority=self.AUTHORITY,
+            audience={"username": [viewer.username]},
+            updated={"gt": "2020-01-01", "lte": "2022-01-01"},
+            fields=self.FIELDS,
+            limit=count,
+        )
+        if materialize:
+            # As the service used to, before streaming the results
+            results = list(results)
+
+        rows = 0
+        for username, authority_provided_id in results:
+            json.dumps(
+                {
+                    "author": {"username": username},
+                    "group": {"authority_provided_id": authority_provided_id},
+                }
+            )
+            if first_row is None:
+                first_row = time.perf_counter() - start
+            rows += 1
+
+        total = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert rows == count
+
+        print(
+            f"{'all()' if materialize else 'streamed'} x {count}: "
+            f"first row {first_row * 1000} ms, total {total} s, "
+            f"peak memory {peak / 2**20} MiB"
+        )
+
+    def insert_annotations(self, db_session, factories, count):
+        """Insert `count` annotations visible to a new viewer, returning the viewer."""
+        author = factories.User(authority=self.AUTHORITY)
+        viewer = factories.User(authority=self.AUTHORITY)
+        group = factories.Group(
+            authority=self.AUTHORITY,
+            authority_provided_id="speed-test",
+            members=[author, viewer],
+        )
+        document = factories.Document()
+        db_session.flush()
+
+        db_session.execute(
+            sa.insert(Annotation).from_select(
+                ["userid", "groupid", "shared", "document_id", "text", "updated"],
+                sa.select(
+                    sa.literal(author.userid),
+                    sa.literal(group.pubid),
+                    sa.true(),
+                    sa.literal(document.id),
+                    sa.literal("An annotation"),
+                    sa.literal("2021-01-01"),
+                ).select_from(sa.func.generate_series(1, count).table_valued("n")),
+            )
+        )
+
+        return viewer
@@ -1,3 +1,4 @@
+from typing import Iterator
 from unittest.mock import sentinel
 
 import pytest
@@ -96,14 +97,18 @@ class TestBulkAnnotationService:
         if values["moderated"]:
             factories.AnnotationModeration(annotation=anno)
 
-        annotations = svc.annotation_search(
-            authority=self.AUTHORITY,
-            audience={"username": [viewer.username]},
-            updated={"gt": "2020-01-01", "lte": "2022-01-01"},
+        annotations = list(
+            svc.annotation_search(
+                authority=self.AUTHORITY,
+                audience={"username": [viewer.username]},
+                updated={"gt": "2020-01-01", "lte": "2022-01-01"},
+            )
         )
 
+        # The results are read through a separate session, so they aren't the
+        # same objects as the ones we created
         if visible:
-            assert annotations == [anno]
+            assert [annotation.id for annotation in annotations] == [anno.id]
         else:
             assert not annotations
 
@@ -127,14 +132,18 @@ class TestBulkAnnotationService:
             )
         ]
 
-        matched_annos = svc.annotation_search(
-            authority=self.AUTHORITY,
-            audience={"username": [viewer.username for viewer in viewers]},
-            updated={"gt": "2020-01-01", "lte": "2099-01-01"},
+        matched_annos = list(
+            svc.annotation_search(
+                authority=self.AUTHORITY,
+                audience={"username": [viewer.username for viewer in viewers]},
+                updated={"gt": "2020-01-01", "lte": "2099-01-01"},
+            )
         )
 
         # Only the first two annotations should match
-        assert matched_annos == Any.list.containing(annotations[:2]).only()
+        assert [anno.id for anno in matched_annos] == Any.list.containing(
+            [anno.id for anno in annotations[:2]]
+        ).only()
 
     @pytest.mark.parametrize(
         "fields,expected",
@@ -172,7 +181,46 @@ class TestBulkAnnotationService:
             fields=fields,
         )
 
-        assert results == [expected]
+        assert list(results) == [expected]
+
+    def test_it_streams_the_results(self, svc, factories, monkeypatch):
+        monkeypatch.setattr(BulkAnnotationService, "YIELD_PER", 2)
+        viewer = factories.User(authority=self.AUTHORITY)
+        author = factories.User(authority=self.AUTHORITY)
+        group = factories.Group(members=[viewer, author])
+        annotations = factories.Annotation.create_batch(
+            5, userid=author.userid, group=group, shared=True, deleted=False
+        )
+
+        results = svc.annotation_search(
+            authority=self.AUTHORITY,
+            audience={"username": [viewer.username]},
+            updated={"gt": "2020-01-01", "lte": "2099-01-01"},
+            fields=["author.username"],
+        )
+
+        assert isinstance(results, Iterator)
+        assert list(results) == [(author.username,)] * len(annotations)
+
+    def test_it_respects_the_limit(self, svc, factories):
+        viewer = factories.User(authority=self.AUTHORITY)
+        author = factories.User(authority=self.AUTHORITY)
+        factories.Annotation.create_batch(
+            3,
+            userid=author.userid,
+            group=factories.Group(members=[viewer, author]),
+            shared=True,
+            deleted=False,
+        )
+
+        results = svc.annotation_search(
+            authority=self.AUTHORITY,
+            audience={"username": [viewer.username]},
+            updated={"gt": "2020-01-01", "lte": "2099-01-01"},
+            limit=2,
+        )
+
+        assert len(list(results)) == 2
 
     @pytest.mark.parametrize(
         "bad_fields",
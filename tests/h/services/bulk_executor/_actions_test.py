@@ -259,6 +259,14 @@ class TestBulkGroupMembershipCreate:
 
         self.assert_membership_matches_commands(db_session, commands)
 
+    def test_it_invalidates_the_members_cache(self, db_session, commands, user):
+        with patch("h.services.bulk_executor._actions.cache") as cache:
+            GroupMembershipCreateAction(db_session).execute(commands)
+
+        cache.invalidate_after_commit.assert_called_once_with(
+            db_session, "member_readable_groups", {f"user:{user.id}"}
+        )
+
     def test_it_fails_without_continue(self, db_session, commands):
         with pytest.raises(UnsupportedOperationError):
             GroupMembershipCreateAction(db_session).execute(
@@ -28,18 +28,12 @@ class TestDeleteGroupService:
 
     def test_it_deletes_annotations(self, svc, factories, annotation_delete_service):
         group = factories.Group()
-        annotations = [
-            factories.Annotation(groupid=group.pubid).id,
-            factories.Annotation(groupid=group.pubid).id,
-        ]
 
         svc.delete(group)
 
-        deleted_anns = [
-            ann.id
-            for ann in annotation_delete_service.delete_annotations.call_args[0][0]
-        ]
-        assert sorted(deleted_anns) == sorted(annotations)
+        annotation_delete_service.delete_group_annotations.assert_called_once_with(
+            group.pubid
+        )
 
 
 @pytest.mark.usefixtures("annotation_delete_service")
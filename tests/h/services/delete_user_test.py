@@ -21,15 +21,11 @@ class TestDeleteUserService:
         self, factories, svc, annotation_delete_service
     ):
         user = factories.User(username="bob")
-        anns = [
-            factories.Annotation(userid=user.userid),
-            factories.Annotation(userid=user.userid),
-        ]
 
         svc.delete(user)
 
-        annotation_delete_service.delete.assert_has_calls(
-            [mock.call(anns[0]), mock.call(anns[1])], any_order=True
+        annotation_delete_service.delete_user_annotations.assert_called_once_with(
+            user.userid
         )
 
     def test_delete_deletes_user(self, db_session, factories, svc):
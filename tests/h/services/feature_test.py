@@ -3,8 +3,9 @@ from unittest import mock
 import pytest
 from pyramid.request import apply_request_extensions
 
-from h import models
+from h import cache, models
 from h.services.feature import (
+    FEATURE_CACHE,
     FeatureRequestProperty,
     FeatureService,
     UnknownFeatureError,
@@ -152,6 +153,13 @@ class TestFeatureService:
             "on-for-cohort": False,
         }
 
+    def test_it_caches_the_features_across_requests(self, db_session):
+        FeatureService(db_session).all()
+
+        FeatureService(db_session).all()
+
+        models.Feature.all.assert_called_once_with(db_session)
+
     @pytest.fixture
     def features(self, cohort, factories, patch):
         model = patch("h.services.feature.models.Feature")
@@ -169,6 +177,63 @@ class TestFeatureService:
         return models.FeatureCohort(name="cohort")
 
 
+class TestFeatureCacheInvalidation:
+    def test_changing_a_feature_invalidates_the_cache(self, db_session, feature):
+        feature.everyone = True
+        self.commit(db_session)
+
+        assert FeatureService(db_session).enabled("embed_cachebuster")
+
+    def test_changing_a_cohort_invalidates_the_cache(
+        self, db_session, factories, feature
+    ):
+        user = factories.User()
+        cohort = models.FeatureCohort(name="cohort")
+        cohort.features.append(feature)
+        db_session.add(cohort)
+        self.commit(db_session)
+
+        cohort.members.append(user)
+        self.commit(db_session)
+
+        assert FeatureService(db_session).enabled("embed_cachebuster", user=user)
+
+    def test_adding_a_user_to_a_cohort_invalidates_the_cache(
+        self, db_session, factories, feature
+    ):
+        cohort = models.FeatureCohort(name="cohort")
+        cohort.features.append(feature)
+        db_session.add(cohort)
+        self.commit(db_session)
+
+        user = factories.User(cohorts=[cohort])
+        self.commit(db_session)
+
+        assert FeatureService(db_session).enabled("embed_cachebuster", user=user)
+
+    @pytest.mark.usefixtures("feature")
+    def test_unrelated_changes_dont_invalidate_the_cache(self, db_session, factories):
+        factories.User()
+        self.commit(db_session)
+
+        assert FEATURE_CACHE.get("all") is not FEATURE_CACHE.MISSING
+
+    def commit(self, db_session):
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+    @pytest.fixture
+    def feature(self, db_session):
+        # Fill the cache, creating the feature flags along the way
+        FeatureService(db_session).all()
+        self.commit(db_session)
+        FeatureService(db_session).all()
+
+        return (
+            db_session.query(models.Feature).filter_by(name="embed_cachebuster").one()
+        )
+
+
 class TestFeatureServiceFactory:
     def test_passes_session(self, pyramid_request):
         svc = feature_service_factory(None, pyramid_request)
@@ -1,10 +1,16 @@
 from unittest import mock
 
 import pytest
+import sqlalchemy as sa
 from h_matchers import Any
 
-from h.models.group import Group
-from h.services.group_list import GroupListService, group_list_factory
+from h import cache
+from h.models.group import Group, ReadableBy
+from h.services.group_list import (
+    WORLD_GROUP_CACHE,
+    GroupListService,
+    group_list_factory,
+)
 from h.services.group_scope import GroupScopeService
 
 
@@ -180,12 +186,30 @@ class TestUserGroups:
 
 
 class TestPrivateGroups:
-    def test_it_retrieves_all_user_groups(self, svc, user):
-        svc.user_groups = mock.Mock(return_value=[])
+    def test_it_retrieves_all_private_user_groups_sorted_by_name(
+        self, svc, user, factories
+    ):
+        user.groups = [
+            factories.Group(name="Beta"),
+            factories.Group(name="Alpha"),
+            factories.Group(),
+        ]
+
+        p_groups = svc.private_groups(user)
 
-        svc.private_groups(user)
+        assert p_groups[:2] == user.groups[:2][::-1]
+        assert len(p_groups) == 3
 
-        svc.user_groups.assert_called_once_with(user)
+    def test_it_eager_loads_organizations_and_scopes(
+        self, svc, user, factories, db_session
+    ):
+        user.groups = [factories.Group(organization=factories.Organization())]
+        db_session.flush()
+        db_session.expire_all()
+
+        p_groups = svc.private_groups(user)
+
+        assert_eager_loaded(p_groups)
 
     def test_it_returns_only_private_groups(self, svc, user, factories):
         private_group = factories.Group()
@@ -242,6 +266,16 @@ class TestScopedGroups:
 
         assert sample_groups["other_authority"] not in results
 
+    def test_it_eager_loads_organizations_and_scopes(
+        self, svc, sample_groups, document_uri, default_authority, db_session
+    ):
+        db_session.flush()
+        db_session.expire_all()
+
+        results = svc.scoped_groups(default_authority, document_uri)
+
+        assert_eager_loaded(results)
+
     def test_it_de_dupes_groups(
         self, svc, sample_groups, document_uri, default_authority
     ):
@@ -274,6 +308,72 @@ class TestWorldGroup:
 
         assert w_group is None
 
+    def test_it_eager_loads_organization_and_scopes(
+        self, svc, default_authority, db_session
+    ):
+        db_session.expire_all()
+
+        w_group = svc.world_group(default_authority)
+
+        assert_eager_loaded([w_group])
+
+    def test_it_caches_the_world_group_id(self, svc, default_authority):
+        w_group = svc.world_group(default_authority)
+
+        assert WORLD_GROUP_CACHE.get(default_authority) == w_group.id
+
+    def test_it_uses_the_cached_world_group_id(
+        self, svc, default_authority, factories, db_session
+    ):
+        group = factories.OpenGroup()
+        db_session.flush()
+        WORLD_GROUP_CACHE.set(default_authority, group.id)
+
+        assert svc.world_group(default_authority) == group
+
+    def test_it_caches_missing_world_groups(self, svc, other_authority):
+        svc.world_group(other_authority)
+
+        assert WORLD_GROUP_CACHE.get(other_authority) is None
+
+    def test_it_invalidates_the_cache_when_the_world_group_changes(
+        self, svc, default_authority, world_group, db_session
+    ):
+        svc.world_group(default_authority)
+
+        world_group.readable_by = ReadableBy.members
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert svc.world_group(default_authority) is None
+
+    def test_it_invalidates_the_cache_when_the_world_group_is_deleted(
+        self, svc, default_authority, world_group, db_session
+    ):
+        svc.world_group(default_authority)
+
+        db_session.delete(world_group)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert svc.world_group(default_authority) is None
+
+    def test_it_doesnt_invalidate_the_cache_for_other_groups(
+        self, svc, default_authority, factories, db_session
+    ):
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        svc.world_group(default_authority)
+
+        factories.OpenGroup(authority=default_authority)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert WORLD_GROUP_CACHE.get(default_authority) is not WORLD_GROUP_CACHE.MISSING
+
+    @pytest.fixture
+    def world_group(self, db_session):
+        return db_session.query(Group).filter_by(pubid="__world__").one()
+
 
 @pytest.mark.usefixtures("group_scope_service")
 class TestGroupListFactory:
@@ -290,6 +390,12 @@ class TestGroupListFactory:
         assert svc.default_authority == "bar.com"
 
 
+def assert_eager_loaded(groups):
+    assert groups
+    for group in groups:
+        assert not {"organization", "scopes"} & sa.inspect(group).unloaded
+
+
 @pytest.fixture
 def other_authority():
     """Return a consistent, different authority for groups in these tests."""
@@ -1,37 +1,141 @@
+from unittest import mock
+
 import pytest
+import sqlalchemy as sa
 
-from h.services.group_scope import GroupScopeService, group_scope_factory
+from h import cache
+from h.models import GroupScope
+from h.services.group_scope import (
+    SCOPE_INDEX_CACHE,
+    GroupScopeService,
+    IndexedScope,
+    _invalidate_scope_index,
+    group_scope_factory,
+)
 
 
 class TestFetchByScope:
-    def test_it_returns_empty_list_if_origin_not_parseable(
-        self, svc, scope_util, document_uri
-    ):
-        scope_util.parse_origin.return_value = None
-        scopes = svc.fetch_by_scope(document_uri)
+    def test_it_returns_empty_list_if_origin_not_parseable(self, svc):
+        scopes = svc.fetch_by_scope("not-a-url")
 
         assert scopes == []
 
-    def test_it_only_returns_scopes_that_pass_util_scope_test(
-        self, svc, scope_util, sample_scopes
+    def test_it_returns_list_of_matching_scopes(self, svc, document_uri, sample_scopes):
+        results = svc.fetch_by_scope(document_uri)
+
+        assert sorted(results) == sorted(
+            [
+                IndexedScope(sample_scopes[0].group_id, "http://foo.com"),
+                IndexedScope(sample_scopes[1].group_id, "http://foo.com/bar/"),
+            ]
+        )
+
+    @pytest.mark.usefixtures("sample_scopes")
+    def test_it_doesnt_match_other_origins(self, svc):
+        assert svc.fetch_by_scope("http://foo.com.example.com/bar/") == []
+
+    def test_it_ignores_scopes_whose_path_changes_their_origin(
+        self, svc, factories, db_session
     ):
-        scope_util.url_in_scope.return_value = False
-        scope_util.parse_origin.return_value = "http://foo.com"
+        scope = factories.GroupScope(scope="http://foo.com")
+        scope._path = "//bar.com/"  # pylint:disable=protected-access
+        db_session.flush()
 
-        # All sample_scopes match this URL, but fail the `url_in_scope` test
-        scopes = svc.fetch_by_scope("http://foo.com")
+        assert svc.fetch_by_scope("http://bar.com/") == []
 
-        assert scope_util.url_in_scope.call_count == len(sample_scopes)
-        assert scopes == []
+    @pytest.mark.usefixtures("sample_scopes")
+    def test_it_caches_the_scopes(self, svc, db_session, document_uri):
+        svc.fetch_by_scope(document_uri)
+        # Bypass the ORM so the cache isn't invalidated
+        db_session.execute(sa.delete(GroupScope))
+
+        assert len(svc.fetch_by_scope(document_uri)) == 2
+
+    def test_it_caches_the_scopes_by_origin(self, svc, factories, db_session):
+        factories.GroupScope(scope="http://foo.com/bar/")
+        factories.GroupScope(scope="http://bar.com/")
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        svc.fetch_by_scope("http://foo.com/bar/foo.html")
+
+        assert list(SCOPE_INDEX_CACHE.get("http://foo.com")) == ["http://foo.com/bar/"]
+        assert SCOPE_INDEX_CACHE.get("http://bar.com") is SCOPE_INDEX_CACHE.MISSING
+
+    def test_it_caches_origins_without_scopes(self, svc):
+        svc.fetch_by_scope("http://foo.com/bar/foo.html")
+
+        assert SCOPE_INDEX_CACHE.get("http://foo.com") == {}
 
     @pytest.mark.usefixtures("sample_scopes")
-    def test_it_returns_list_of_matching_scopes(self, svc, document_uri):
-        results = svc.fetch_by_scope(document_uri)
+    def test_it_invalidates_the_cache_when_scopes_are_added(
+        self, svc, factories, db_session, document_uri
+    ):
+        svc.fetch_by_scope(document_uri)
+
+        factories.GroupScope(scope="http://foo.com/bar/foo")
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert len(svc.fetch_by_scope(document_uri)) == 3
+
+    def test_it_invalidates_the_old_and_new_origins_when_scopes_move(
+        self, svc, db_session, document_uri, sample_scopes
+    ):
+        svc.fetch_by_scope(document_uri)
+        svc.fetch_by_scope("http://bar.com/")
 
-        matching_scope_scopes = [scope.scope for scope in results]
-        assert len(results) == 2
-        assert "http://foo.com" in matching_scope_scopes
-        assert "http://foo.com/bar/" in matching_scope_scopes
+        sample_scopes[0].scope = "http://bar.com/"
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert len(svc.fetch_by_scope(document_uri)) == 1
+        assert len(svc.fetch_by_scope("http://bar.com/")) == 1
+
+    def test_it_invalidates_the_cache_when_scopes_are_deleted(
+        self, svc, db_session, document_uri, sample_scopes
+    ):
+        svc.fetch_by_scope(document_uri)
+
+        db_session.delete(sample_scopes[0])
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert len(svc.fetch_by_scope(document_uri)) == 1
+
+    def test_it_invalidates_the_cache_when_groups_are_deleted(
+        self, svc, db_session, document_uri, sample_scopes
+    ):
+        svc.fetch_by_scope(document_uri)
+
+        db_session.delete(sample_scopes[0].group)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert len(svc.fetch_by_scope(document_uri)) == 1
+
+    def test_it_clears_the_cache_if_it_cant_tell_which_origins_changed(self):
+        # A scope without its origin loaded
+        session = mock.Mock(new=[GroupScope()], dirty=[], deleted=[], info={})
+
+        _invalidate_scope_index(session, mock.sentinel.flush_context)
+
+        assert session.info["h.cache.pending"] == {SCOPE_INDEX_CACHE.name: None}
+
+    @pytest.mark.usefixtures("sample_scopes")
+    def test_it_doesnt_invalidate_the_cache_for_other_changes(
+        self, svc, factories, db_session, document_uri
+    ):
+        # Apply the invalidation from creating the sample scopes
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        svc.fetch_by_scope(document_uri)
+
+        factories.Group()
+        factories.GroupScope(scope="http://bar.com/")
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert SCOPE_INDEX_CACHE.get("http://foo.com") is not SCOPE_INDEX_CACHE.MISSING
 
 
 class TestGroupScopeFactory:
@@ -47,19 +151,14 @@ def svc(db_session, pyramid_request):
     return group_scope_factory({}, pyramid_request)
 
 
-@pytest.fixture
-def scope_util(patch):
-    return patch("h.services.group_scope.scope_util")
-
-
 @pytest.fixture
 def document_uri():
     return "http://foo.com/bar/foo.html"
 
 
 @pytest.fixture
-def sample_scopes(factories):
-    return [
+def sample_scopes(factories, db_session):
+    scopes = [
         factories.GroupScope(scope="http://foo.com"),
         factories.GroupScope(scope="http://foo.com/bar/"),
         factories.GroupScope(scope="http://foo.com/bar/baz/"),
@@ -67,3 +166,5 @@ def sample_scopes(factories):
             scope="http://foo.com/bar/baz/foo.html?q=something&wut=how"
         ),
     ]
+    db_session.flush()
+    return scopes
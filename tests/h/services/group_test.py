@@ -2,8 +2,10 @@ import datetime
 from unittest import mock
 
 import pytest
+import sqlalchemy as sa
 
-from h.models import Group, GroupScope, User
+from h import cache
+from h.models import Group, GroupMembership, GroupScope, User
 from h.models.group import ReadableBy
 from h.services.group import GroupService, groups_factory
 from tests.common.matchers import Matcher
@@ -157,6 +159,81 @@ class TestGroupServiceGroupIds:
         pubids = [group.pubid, "doesnotexist"]
         assert svc.groupids_readable_by(user, group_ids=pubids) == [group.pubid]
 
+    def test_readable_by_caches_world_readable_groups(self, svc, db_session, factories):
+        svc.groupids_readable_by(None)
+        # Bypass the ORM so the cache isn't invalidated
+        db_session.execute(
+            sa.update(Group)
+            .where(Group.pubid == "__world__")
+            .values(readable_by=ReadableBy.members)
+        )
+
+        assert "__world__" in svc.groupids_readable_by(None)
+
+    def test_readable_by_caches_memberships(self, svc, db_session, factories):
+        user = factories.User()
+        group = factories.Group(readable_by=ReadableBy.members)
+        group.members.append(user)
+        db_session.flush()
+
+        svc.groupids_readable_by(user)
+        db_session.execute(sa.delete(GroupMembership))
+
+        assert group.pubid in svc.groupids_readable_by(user)
+
+    def test_creating_a_world_readable_group_invalidates_the_cache(
+        self, svc, db_session, factories
+    ):
+        svc.groupids_readable_by(None)
+
+        group = factories.Group(readable_by=ReadableBy.world)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert group.pubid in svc.groupids_readable_by(None)
+
+    @pytest.mark.parametrize("join", (True, False))
+    def test_changing_memberships_invalidates_the_cache(
+        self, svc, db_session, factories, join
+    ):
+        user = factories.User()
+        group = factories.Group(readable_by=ReadableBy.members)
+        if not join:
+            group.members.append(user)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        svc.groupids_readable_by(user)
+
+        if join:
+            group.members.append(user)
+        else:
+            group.members.remove(user)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert (group.pubid in svc.groupids_readable_by(user)) == join
+
+    def test_changing_readable_by_invalidates_the_cache(
+        self, svc, db_session, factories
+    ):
+        user = factories.User()
+        group = factories.Group(readable_by=ReadableBy.members)
+        group.members.append(user)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+        svc.groupids_readable_by(None)
+        svc.groupids_readable_by(user)
+
+        group.readable_by = ReadableBy.world
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert group.pubid in svc.groupids_readable_by(None)
+        assert group.pubid not in svc.member_readable_groupids(user)
+
+    def test_member_readable_groupids_for_no_user(self, svc):
+        assert svc.member_readable_groupids(None) == frozenset()
+
     def test_created_by_includes_created_groups(self, svc, factories):
         user = factories.User()
         group = factories.Group(creator=user)
@@ -1,6 +1,9 @@
 import pytest
+import sqlalchemy as sa
 
-from h.services.nipsa import NipsaService, nipsa_factory
+from h import cache
+from h.models import User
+from h.services.nipsa import NIPSA_CACHE, NipsaService, nipsa_factory
 
 
 class TestNipsaService:
@@ -78,13 +81,96 @@ class TestNipsaService:
 
         assert not svc.is_flagged(users["flagged_user"].userid)
 
-    def test_clear_resets_cache(self, svc, users):
+    def test_clear_forgets_uncommitted_changes(self, svc, users):
         svc.fetch_all_flagged_userids()
-        users["flagged_user"].nipsa = False
+        svc.flag(users["unflagged_user"])
         svc.clear()
 
+        assert not svc.is_flagged("acct:unflagged_user@example.com")
+
+    def test_it_caches_flagged_userids_across_requests(
+        self, svc, db_session, search_index
+    ):
+        svc.fetch_all_flagged_userids()
+        db_session.execute(sa.update(User).values(nipsa=False))
+
+        svc = NipsaService(db_session, lambda: search_index)
+
+        assert svc.is_flagged("acct:flagged_user@example.com")
+
+    def test_flagging_a_user_invalidates_the_cache(
+        self, svc, users, db_session, search_index
+    ):
+        svc.fetch_all_flagged_userids()
+
+        svc.flag(users["unflagged_user"])
+        self.commit(db_session)
+
+        svc = NipsaService(db_session, lambda: search_index)
+        assert svc.is_flagged("acct:unflagged_user@example.com")
+
+    def test_renaming_a_flagged_user_invalidates_the_cache(
+        self, svc, users, db_session, search_index
+    ):
+        svc.fetch_all_flagged_userids()
+
+        users["flagged_user"].username = "renamed_user"
+        self.commit(db_session)
+
+        svc = NipsaService(db_session, lambda: search_index)
+        assert svc.is_flagged("acct:renamed_user@example.com")
         assert not svc.is_flagged("acct:flagged_user@example.com")
 
+    def test_renaming_a_user_who_might_be_flagged_invalidates_the_cache(
+        self, svc, users, db_session, search_index
+    ):
+        svc.fetch_all_flagged_userids()
+        # As if `nipsa` had expired on commit and not been read since
+        db_session.expire(users["flagged_user"], ["nipsa"])
+
+        users["flagged_user"].username = "renamed_user"
+        self.commit(db_session)
+
+        svc = NipsaService(db_session, lambda: search_index)
+        assert svc.is_flagged("acct:renamed_user@example.com")
+
+    def test_creating_an_unflagged_user_doesnt_invalidate_the_cache(
+        self, svc, db_session
+    ):
+        svc.fetch_all_flagged_userids()
+
+        db_session.add(User(username="new_user", authority="example.com"))
+        self.commit(db_session)
+
+        assert NIPSA_CACHE.get("all") is not NIPSA_CACHE.MISSING
+
+    def test_creating_a_flagged_user_invalidates_the_cache(
+        self, svc, db_session, search_index
+    ):
+        svc.fetch_all_flagged_userids()
+
+        db_session.add(User(username="new_user", authority="example.com", nipsa=True))
+        self.commit(db_session)
+
+        svc = NipsaService(db_session, lambda: search_index)
+        assert svc.is_flagged("acct:new_user@example.com")
+
+    def test_unrelated_changes_dont_invalidate_the_cache(
+        self, svc, users, db_session, factories
+    ):
+        svc.fetch_all_flagged_userids()
+
+        factories.User()
+        users["flagged_user"].email = "new@example.com"
+        users["unflagged_user"].username = "renamed_user"
+        self.commit(db_session)
+
+        assert NIPSA_CACHE.get("all") is not NIPSA_CACHE.MISSING
+
+    def commit(self, db_session):
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
     @pytest.fixture
     def svc(self, db_session, search_index):
         return NipsaService(db_session, lambda: search_index)
@@ -97,6 +183,7 @@ class TestNipsaService:
             "unflagged_user": factories.User(username="unflagged_user", nipsa=False),
         }
         db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
         return users
 
 
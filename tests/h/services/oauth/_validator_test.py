@@ -6,9 +6,10 @@ import pytest
 from oauthlib.common import Request as OAuthRequest
 from oauthlib.oauth2 import InvalidClientIdError
 
-from h import models
+from h import cache, models
 from h.models.auth_client import GrantType as AuthClientGrantType
 from h.models.auth_client import ResponseType as AuthClientResponseType
+from h.services.auth_token import TOKEN_CACHE, token_cache_key
 from h.services.oauth._validator import Client, OAuthValidator
 
 
@@ -321,6 +322,18 @@ class TestRevokeToken:
         svc.revoke_token(token.refresh_token, None, oauth_request)
         assert not db_session.query(models.Token).count()
 
+    def test_it_invalidates_the_cached_token(
+        self, svc, factories, db_session, oauth_request
+    ):
+        token = factories.OAuth2Token()
+        TOKEN_CACHE.set(token_cache_key(token.value), mock.sentinel.token)
+
+        svc.revoke_token(token.value, None, oauth_request)
+        db_session.flush()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert TOKEN_CACHE.get(token_cache_key(token.value)) is TOKEN_CACHE.MISSING
+
     def test_it_ignores_other_tokens(self, svc, factories, db_session, oauth_request):
         token = factories.DeveloperToken()
         assert db_session.query(models.Token).count() == 1
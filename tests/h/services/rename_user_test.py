@@ -1,8 +1,11 @@
+import logging
 from unittest import mock
 
 import pytest
 
-from h import models
+from h import cache, models
+from h.services.auth_cookie import TICKET_CACHE, ticket_cache_key
+from h.services.auth_token import TOKEN_CACHE, token_cache_key
 from h.services.rename_user import RenameUserService, UserRenameError
 
 
@@ -65,6 +68,17 @@ class TestRenameUserService:
         )
         assert not count
 
+    def test_rename_invalidates_the_cached_auth_tickets(
+        self, service, user, db_session, factories
+    ):
+        ticket = factories.AuthTicket(user=user)
+        TICKET_CACHE.set(ticket_cache_key(ticket.id), mock.sentinel.ticket)
+
+        service.rename(user, "panda")
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert TICKET_CACHE.get(ticket_cache_key(ticket.id)) is TICKET_CACHE.MISSING
+
     def test_rename_updates_tokens(self, service, user, db_session):
         token = models.Token(userid=user.userid, value="foo")
         db_session.add(token)
@@ -76,6 +90,17 @@ class TestRenameUserService:
         )
         assert updated_token.userid == user.userid
 
+    def test_rename_invalidates_the_cached_tokens(self, service, user, db_session):
+        token = models.Token(userid=user.userid, value="foo")
+        db_session.add(token)
+        db_session.flush()
+        TOKEN_CACHE.set(token_cache_key("foo"), mock.sentinel.token)
+
+        service.rename(user, "panda")
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert TOKEN_CACHE.get(token_cache_key("foo")) is TOKEN_CACHE.MISSING
+
     @pytest.mark.usefixtures("annotations")
     def test_rename_changes_the_users_annotations_userid(
         self, service, user, db_session
@@ -85,15 +110,44 @@ class TestRenameUserService:
         userids = [ann.userid for ann in db_session.query(models.Annotation)]
         assert {user.userid} == set(userids)
 
-    def test_rename_reindexes_the_users_annotations(self, service, user, search_index):
-        original_userid = user.userid
+    def test_rename_changes_the_annotations_in_batches(
+        self, service, user, db_session, annotations, monkeypatch, caplog
+    ):
+        monkeypatch.setattr(RenameUserService, "BATCH_SIZE", 3)
+        caplog.set_level(logging.INFO)
 
         service.rename(user, "panda")
 
-        search_index.add_users_annotations.assert_called_once_with(
-            original_userid,
-            tag="RenameUserService.rename",
-            schedule_in=30,
+        assert {ann.userid for ann in annotations} == {user.userid}
+        assert [record.getMessage() for record in caplog.records] == [
+            f"renamed {count} annotations from acct:giraffe@example.com to {user.userid}"
+            for count in (3, 6, 8)
+        ]
+
+    def test_rename_doesnt_change_other_users_annotations(
+        self, service, user, factories, db_session
+    ):
+        other_annotation = factories.Annotation()
+        userid = other_annotation.userid
+        db_session.flush()
+
+        service.rename(user, "panda")
+
+        assert other_annotation.userid == userid
+
+    @pytest.mark.usefixtures("annotations")
+    def test_rename_to_an_equivalent_username(self, service, user):
+        service.rename(user, user.username)
+
+        assert user.username == "giraffe"
+
+    def test_rename_queues_the_users_annotations_for_syncing(
+        self, service, user, search_index
+    ):
+        service.rename(user, "panda")
+
+        search_index.queue_users_annotations.assert_called_once_with(
+            user.userid, tag="RenameUserService.rename"
         )
 
     @pytest.fixture
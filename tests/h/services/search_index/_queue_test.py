@@ -198,7 +198,7 @@ class TestSync:
     ):
         job = factories.SyncAnnotationJob(force=True)
 
-        counts = queue.sync(1)
+        counts = without_durations(queue.sync(1))
 
         assert counts == {
             Queue.Result.SYNCED_FORCED.format(tag="test_tag"): 1,
@@ -222,7 +222,7 @@ class TestSync:
         job = factories.SyncAnnotationJob(annotation=annotation)
         db_session.delete(annotation)
 
-        counts = queue.sync(1)
+        counts = without_durations(queue.sync(1))
 
         assert counts == {
             Queue.Result.COMPLETED_DELETED.format(tag="test_tag"): 1,
@@ -238,7 +238,7 @@ class TestSync:
         job = factories.SyncAnnotationJob(annotation=annotation)
         annotation.deleted = True
 
-        counts = queue.sync(1)
+        counts = without_durations(queue.sync(1))
 
         assert counts == {
             Queue.Result.COMPLETED_DELETED.format(tag="test_tag"): 1,
@@ -247,19 +247,99 @@ class TestSync:
         }
         assert job not in db_session.query(Job)
 
-    def test_if_the_annotation_is_missing_from_Elastic_it_indexes_it(
-        self, batch_indexer, factories, queue
+    def test_if_the_annotation_is_deleted_in_the_DB_but_not_Elastic_it_marks_it_deleted(
+        self, batch_indexer, db_session, factories, index, queue
+    ):
+        annotation = factories.Annotation()
+        index(annotation)
+        job = factories.SyncAnnotationJob(annotation=annotation)
+        annotation.deleted = True
+
+        counts = without_durations(queue.sync(1))
+
+        assert counts == {
+            Queue.Result.SYNCED_DELETED.format(tag="test_tag"): 1,
+            Queue.Result.SYNCED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.SYNCED_TOTAL: 1,
+            Queue.Result.COMPLETED_DELETED.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TOTAL: 1,
+        }
+        batch_indexer.delete.assert_called_once_with([annotation.id])
+        batch_indexer.index.assert_not_called()
+        assert job not in db_session.query(Job)
+
+    def test_if_marking_the_annotation_deleted_fails_it_leaves_the_job_on_the_queue(
+        self, batch_indexer, db_session, factories, index, queue
+    ):
+        annotation = factories.Annotation()
+        index(annotation)
+        job = factories.SyncAnnotationJob(annotation=annotation)
+        annotation.deleted = True
+        batch_indexer.delete.return_value = {annotation.id}
+
+        counts = without_durations(queue.sync(1))
+
+        assert counts == {
+            Queue.Result.SYNCED_DELETED.format(tag="test_tag"): 1,
+            Queue.Result.SYNCED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.SYNCED_TOTAL: 1,
+            Queue.Result.FAILED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.FAILED_TOTAL: 1,
+        }
+        assert job in db_session.query(Job)
+
+    def test_if_the_annotation_is_already_deleted_in_Elastic_it_deletes_the_job(
+        self, batch_indexer, db_session, factories, search_index, queue
+    ):
+        annotation = factories.Annotation(deleted=True)
+        search_index.delete_annotation_by_id(annotation.id, refresh=True)
+        job = factories.SyncAnnotationJob(annotation=annotation)
+
+        counts = without_durations(queue.sync(1))
+
+        assert counts == {
+            Queue.Result.COMPLETED_DELETED.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TOTAL: 1,
+        }
+        batch_indexer.delete.assert_not_called()
+        assert job not in db_session.query(Job)
+
+    def test_if_the_annotation_is_missing_from_Elastic_it_indexes_it_and_deletes_the_job(
+        self, batch_indexer, db_session, factories, queue
     ):
         job = factories.SyncAnnotationJob()
 
-        counts = queue.sync(1)
+        counts = without_durations(queue.sync(1))
 
         assert counts == {
             Queue.Result.SYNCED_MISSING.format(tag="test_tag"): 1,
             Queue.Result.SYNCED_TAG_TOTAL.format(tag="test_tag"): 1,
             Queue.Result.SYNCED_TOTAL: 1,
+            Queue.Result.COMPLETED_SYNCED.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TOTAL: 1,
         }
         batch_indexer.index.assert_called_once_with([self.url_safe_id(job)])
+        assert job not in db_session.query(Job)
+
+    def test_if_indexing_the_annotation_fails_it_leaves_the_job_on_the_queue(
+        self, batch_indexer, db_session, factories, queue
+    ):
+        job = factories.SyncAnnotationJob()
+        batch_indexer.index.return_value = {self.url_safe_id(job)}
+
+        counts = without_durations(queue.sync(1))
+
+        assert counts == {
+            Queue.Result.SYNCED_MISSING.format(tag="test_tag"): 1,
+            Queue.Result.SYNCED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.SYNCED_TOTAL: 1,
+            Queue.Result.FAILED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.FAILED_TOTAL: 1,
+        }
+        assert job in db_session.query(Job)
 
     def test_if_the_annotation_is_already_in_Elastic_it_removes_the_job_from_the_queue(
         self, batch_indexer, db_session, factories, index, queue
@@ -268,7 +348,7 @@ class TestSync:
         index(annotation)
         job = factories.SyncAnnotationJob(annotation=annotation)
 
-        counts = queue.sync(1)
+        counts = without_durations(queue.sync(1))
 
         assert counts == {
             Queue.Result.COMPLETED_UP_TO_DATE.format(tag="test_tag"): 1,
@@ -288,12 +368,15 @@ class TestSync:
         # indexed.
         annotation.updated = now
 
-        counts = queue.sync(1)
+        counts = without_durations(queue.sync(1))
 
         assert counts == {
             Queue.Result.SYNCED_DIFFERENT.format(tag="test_tag"): 1,
             Queue.Result.SYNCED_TAG_TOTAL.format(tag="test_tag"): 1,
             Queue.Result.SYNCED_TOTAL: 1,
+            Queue.Result.COMPLETED_SYNCED.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TOTAL: 1,
         }
         batch_indexer.index.assert_called_once_with([annotation.id])
 
@@ -306,12 +389,15 @@ class TestSync:
         # Simulate the user having been renamed in the DB.
         annotation.userid = "new_userid"
 
-        counts = queue.sync(1)
+        counts = without_durations(queue.sync(1))
 
         assert counts == {
             Queue.Result.SYNCED_DIFFERENT.format(tag="test_tag"): 1,
             Queue.Result.SYNCED_TAG_TOTAL.format(tag="test_tag"): 1,
             Queue.Result.SYNCED_TOTAL: 1,
+            Queue.Result.COMPLETED_SYNCED.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TAG_TOTAL.format(tag="test_tag"): 1,
+            Queue.Result.COMPLETED_TOTAL: 1,
         }
         batch_indexer.index.assert_called_once_with([annotation.id])
 
@@ -321,12 +407,15 @@ class TestSync:
         annotation = factories.Annotation()
         jobs = factories.SyncAnnotationJob.create_batch(size=2, annotation=annotation)
 
-        counts = queue.sync(len(jobs))
+        counts = without_durations(queue.sync(len(jobs)))
 
         assert counts == {
             Queue.Result.SYNCED_MISSING.format(tag="test_tag"): 1,
             Queue.Result.SYNCED_TAG_TOTAL.format(tag="test_tag"): 1,
             Queue.Result.SYNCED_TOTAL: 1,
+            Queue.Result.COMPLETED_SYNCED.format(tag="test_tag"): 2,
+            Queue.Result.COMPLETED_TAG_TOTAL.format(tag="test_tag"): 2,
+            Queue.Result.COMPLETED_TOTAL: 2,
         }
         # It only syncs the annotation to Elasticsearch once, even though it
         # processed two separate jobs (for the same annotation).
@@ -339,7 +428,7 @@ class TestSync:
         index(annotation)
         jobs = factories.SyncAnnotationJob.create_batch(size=2, annotation=annotation)
 
-        counts = queue.sync(len(jobs))
+        counts = without_durations(queue.sync(len(jobs)))
 
         assert counts == {
             Queue.Result.COMPLETED_UP_TO_DATE.format(tag="test_tag"): 2,
@@ -370,13 +459,15 @@ class TestSync:
         add_job(deleted=True)
         add_job(tag="tag_2", force=True)
 
-        counts = queue.sync(5)
+        counts = without_durations(queue.sync(5))
 
         assert counts == {
-            "Synced/Total": 3,
-            "Completed/Total": 3,
-            "Synced/test_tag/Total": 2,
-            "Completed/test_tag/Total": 2,
+            "Synced/Total": 4,
+            "Completed/Total": 5,
+            "Synced/test_tag/Total": 3,
+            "Synced/test_tag/Deleted_from_db": 1,
+            "Completed/test_tag/Total": 4,
+            "Completed/test_tag/Synced_to_Elastic": 2,
             "Synced/test_tag/Different_in_Elastic": 1,
             "Synced/test_tag/Missing_from_Elastic": 1,
             "Synced/tag_2/Forced": 1,
@@ -387,6 +478,31 @@ class TestSync:
             "Completed/test_tag/Deleted_from_db": 1,
         }
 
+    def test_it_indexes_the_jobs_in_batches(self, batch_indexer, factories, queue):
+        jobs = factories.SyncAnnotationJob.create_batch(size=3)
+
+        with mock.patch.object(Queue, "BATCH_SIZE", 2):
+            queue.sync(len(jobs))
+
+        assert [len(call[0][0]) for call in batch_indexer.index.call_args_list] == [
+            2,
+            1,
+        ]
+
+    def test_it_reports_the_duration_of_each_stage(self, factories, queue):
+        factories.SyncAnnotationJob()
+
+        counts = queue.sync(1)
+
+        assert {key for key in counts if key.startswith("Duration/")} == {
+            "Duration/Fetch_jobs",
+            "Duration/Fetch_from_db",
+            "Duration/Fetch_from_Elastic",
+            "Duration/Wait_for_Elastic",
+            "Duration/Index",
+            "Duration/Delete_jobs",
+        }
+
     def url_safe_id(self, job):
         """Return the URL-safe version of the given job's annotation ID."""
         return URLSafeUUID.hex_to_url_safe(job.kwargs["annotation_id"])
@@ -428,9 +544,19 @@ class TestSync:
         factories.Job()
 
 
+def without_durations(counts):
+    """Return `counts` without the (unpredictable) stage durations."""
+    return {
+        key: value for key, value in counts.items() if not key.startswith("Duration/")
+    }
+
+
 @pytest.fixture
 def batch_indexer():
-    return mock.create_autospec(BatchIndexer, spec_set=True, instance=True)
+    batch_indexer = mock.create_autospec(BatchIndexer, spec_set=True, instance=True)
+    batch_indexer.index.return_value = set()
+    batch_indexer.delete.return_value = set()
+    return batch_indexer
 
 
 @pytest.fixture(autouse=True)
@@ -185,6 +185,28 @@ class TestAddGroupAnnotations:
         )
 
 
+class TestQueueUsersAnnotations:
+    def test_it(self, search_index, queue):
+        search_index.queue_users_annotations(
+            sentinel.userid, sentinel.tag, force=sentinel.force
+        )
+
+        queue.add_by_user.assert_called_once_with(
+            sentinel.userid, sentinel.tag, force=sentinel.force
+        )
+
+
+class TestQueueGroupAnnotations:
+    def test_it(self, search_index, queue):
+        search_index.queue_group_annotations(
+            sentinel.groupid, sentinel.tag, force=sentinel.force
+        )
+
+        queue.add_by_group.assert_called_once_with(
+            sentinel.groupid, sentinel.tag, force=sentinel.force
+        )
+
+
 class TestDeleteAnnotationById:
     @pytest.mark.parametrize("refresh", (True, False))
     def test_delete_annotation(self, search_index, mock_es_client, refresh):
@@ -58,6 +58,37 @@ class TestFetchOrderedAnnotations:
         assert results == []
 
 
+class TestFetchThreadIds:
+    def test_it(self, db_session, factories):
+        root = factories.Annotation()
+        other_root = factories.Annotation()
+        replies = [
+            factories.Annotation(references=[root.id]),
+            factories.Annotation(references=[root.id, other_root.id]),
+        ]
+        factories.Annotation(references=[factories.Annotation().id])
+        db_session.flush()
+
+        thread_ids = storage.fetch_thread_ids(db_session, [root.id, other_root.id])
+
+        assert thread_ids == {
+            root.id: Any.list.containing([reply.id for reply in replies]).only(),
+            other_root.id: [],
+        }
+
+    def test_it_matches_thread_ids(self, db_session, factories):
+        root = factories.Annotation()
+        factories.Annotation.create_batch(2, references=[root.id])
+        db_session.flush()
+
+        thread_ids = storage.fetch_thread_ids(db_session, [root.id])
+
+        assert thread_ids[root.id] == Any.list.containing(root.thread_ids).only()
+
+    def test_it_handles_empty_ids(self):
+        assert storage.fetch_thread_ids(sentinel.db_session, ids=[]) == {}
+
+
 class TestExpandURI:
     @pytest.mark.parametrize(
         "normalized,expected_uris",
@@ -129,6 +160,119 @@ class TestExpandURI:
 
         assert uris == expected_uris
 
+    def test_it_caches_the_lookup(self, db_session, document):
+        storage.expand_uri(db_session, "http://example.com/")
+        # Bypass the ORM so the cache isn't invalidated
+        db_session.execute(
+            sa.delete(DocumentURI).where(DocumentURI.document_id == document.id)
+        )
+
+        uris = storage.expand_uri(db_session, "http://example.com/")
+
+        assert uris == ["http://example.com/", "http://alt.example.com/"]
+
+    def test_it_invalidates_the_cache_when_a_document_uri_changes(
+        self, db_session, document
+    ):
+        storage.expand_uri(db_session, "http://example.com/")
+        storage.expand_uri(db_session, "http://new.example.com/")
+
+        document.document_uris[1].uri = "http://new.example.com/"
+        db_session.flush()
+        storage.cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert storage.expand_uri(db_session, "http://new.example.com/") == [
+            "http://example.com/",
+            "http://new.example.com/",
+        ]
+        assert storage.expand_uri(db_session, "http://alt.example.com/") == [
+            "http://alt.example.com/"
+        ]
+
+    def test_it_invalidates_the_cache_when_a_document_uri_is_added(
+        self, db_session, document
+    ):
+        storage.expand_uri(db_session, "http://new.example.com/")
+
+        document.document_uris.append(
+            DocumentURI(uri="http://new.example.com/", claimant="http://example.com")
+        )
+        db_session.flush()
+        storage.cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert storage.expand_uri(db_session, "http://example.com/") == [
+            "http://example.com/",
+            "http://alt.example.com/",
+            "http://new.example.com/",
+        ]
+        assert len(storage.expand_uri(db_session, "http://new.example.com/")) == 3
+
+    @pytest.fixture
+    def document(self, db_session):
+        document = Document(
+            document_uris=[
+                DocumentURI(uri="http://example.com/", claimant="http://example.com"),
+                DocumentURI(
+                    uri="http://alt.example.com/", claimant="http://example.com"
+                ),
+            ]
+        )
+        db_session.add(document)
+        db_session.flush()
+        return document
+
+
+class TestExpandURIs:
+    @pytest.mark.parametrize("normalized", (True, False))
+    def test_it_matches_expand_uri(self, db_session, normalized):
+        db_session.add_all(
+            [
+                Document(
+                    document_uris=[
+                        DocumentURI(
+                            uri="http://canonical.example.com/",
+                            type="rel-canonical",
+                            claimant="http://canonical.example.com",
+                        ),
+                        DocumentURI(
+                            uri="http://noise.example.com/",
+                            claimant="http://canonical.example.com",
+                        ),
+                    ]
+                ),
+                Document(
+                    document_uris=[
+                        DocumentURI(
+                            uri="http://example.com/", claimant="http://example.com"
+                        ),
+                        DocumentURI(
+                            uri="http://alt.example.com/",
+                            claimant="http://example.com",
+                        ),
+                    ]
+                ),
+            ]
+        )
+        db_session.flush()
+        uris = [
+            "http://canonical.example.com/",
+            "http://alt.example.com/",
+            "http://example.com/",
+            "http://no-document.example.com/",
+        ]
+
+        expanded = storage.expand_uris(db_session, uris, normalized=normalized)
+
+        assert expanded == {
+            uri: Any.list.containing(
+                storage.expand_uri(db_session, uri, normalized=normalized)
+            ).only()
+            for uri in uris
+        }
+
+    def test_it_with_no_uris(self, db_session):
+        assert storage.expand_uris(db_session, []) == {}
+
 
 class TestCreateAnnotation:
     def test_it(self, pyramid_request, annotation_data, datetime):
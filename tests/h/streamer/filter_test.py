@@ -1,5 +1,8 @@
+import weakref
+from collections import defaultdict
 from datetime import datetime
 from random import random
+from unittest import mock
 
 import pytest
 from h_matchers import Any
@@ -83,6 +86,28 @@ class TestFilterHandler:
             db_session, annotation.target_uri, normalized=True
         )
 
+    def test_it_uses_already_expanded_uris(self, annotation, storage, db_session):
+        socket = FakeSocket()
+        SocketFilter.set_filter(
+            socket,
+            {
+                "match_policy": "include_any",
+                "actions": {},
+                "clauses": [
+                    {"field": "/uri", "operator": "one_of", "value": "urn:x-pdf:1234"}
+                ],
+            },
+        )
+
+        result = tuple(
+            SocketFilter.matching(
+                annotation, db_session, expanded_uris=["urn:x-pdf:1234"]
+            )
+        )
+
+        assert result == (socket,)
+        storage.expand_uri.assert_not_called()
+
     def test_it_matches_id(self, factories, filter_matches, annotation):
         other_annotation = factories.Annotation()
 
@@ -114,19 +139,66 @@ class TestFilterHandler:
         assert not filter_matches(filter_, other_annotation)
 
     def test_it_does_not_crash_without_filter_rows(self, annotation, db_session):
-        socket_no_rows = FakeSocket()
-
-        result = tuple(SocketFilter.matching([socket_no_rows], annotation, db_session))
+        result = tuple(SocketFilter.matching(annotation, db_session))
         assert not result
 
     def test_it_does_not_crash_with_unexpected_fields(self, annotation, db_session):
         socket = FakeSocket()
-        socket.filter_rows = (  # pylint:disable=attribute-defined-outside-init
-            ("/not_a_thing", "value"),
+        filter_ = self.id_filter(annotation.id)
+        filter_["clauses"].append(
+            {"field": "/not_a_thing", "operator": "equals", "value": "value"}
         )
+        SocketFilter.set_filter(socket, filter_)
 
-        result = tuple(SocketFilter.matching([socket], annotation, db_session))
-        assert not result
+        result = tuple(SocketFilter.matching(annotation, db_session))
+
+        assert result == (socket,)
+        assert socket.filter_rows == (("/id", annotation.id),)
+
+    def test_it_only_matches_sockets_which_subscribed(
+        self, factories, annotation, db_session
+    ):
+        socket = FakeSocket()
+        other_socket = FakeSocket()
+        SocketFilter.set_filter(socket, self.id_filter(annotation.id))
+        SocketFilter.set_filter(other_socket, self.id_filter(factories.Annotation().id))
+
+        result = tuple(SocketFilter.matching(annotation, db_session))
+
+        assert result == (socket,)
+
+    def test_it_matches_a_socket_once_for_multiple_matching_rows(
+        self, annotation, db_session
+    ):
+        socket = FakeSocket()
+        filter_ = self.id_filter(annotation.id)
+        filter_["clauses"].append(
+            {"field": "/group", "operator": "equals", "value": annotation.groupid}
+        )
+        SocketFilter.set_filter(socket, filter_)
+
+        result = tuple(SocketFilter.matching(annotation, db_session))
+
+        assert result == (socket,)
+
+    def test_set_filter_replaces_the_previous_filter(
+        self, factories, annotation, db_session
+    ):
+        socket = FakeSocket()
+        SocketFilter.set_filter(socket, self.id_filter(annotation.id))
+
+        SocketFilter.set_filter(socket, self.id_filter(factories.Annotation().id))
+
+        assert not tuple(SocketFilter.matching(annotation, db_session))
+
+    def test_remove(self, annotation, db_session):
+        socket = FakeSocket()
+        SocketFilter.set_filter(socket, self.id_filter(annotation.id))
+
+        SocketFilter.remove(socket)
+
+        assert not tuple(SocketFilter.matching(annotation, db_session))
+        assert not SocketFilter._index  # pylint:disable=protected-access
 
     @pytest.mark.parametrize(
         "field,value,expected",
@@ -192,9 +264,11 @@ class TestFilterHandler:
         assert not filter_matches(filter_, ann)
 
     @pytest.mark.skip(reason="For dev purposes only")
-    def test_speed(self, factories, db_session):  # pragma: no cover
-        # I think the max number connected at once is 4096
-        sockets = [FakeSocket() for _ in range(4096)]
+    @pytest.mark.parametrize("socket_count", (4096, 16384, 50000))
+    def test_speed(self, factories, db_session, socket_count):  # pragma: no cover
+        # The time taken per event should stay flat as the number of sockets
+        # grows, as we only look at the sockets subscribed to this annotation
+        sockets = [FakeSocket() for _ in range(socket_count)]
 
         for socket in sockets:
             SocketFilter.set_filter(socket, self.get_randomized_filter())
@@ -203,11 +277,18 @@ class TestFilterHandler:
 
         start = datetime.utcnow()
         # This returns a generator, we need to force it to produce answers
-        tuple(SocketFilter.matching(sockets, ann, db_session))
+        tuple(SocketFilter.matching(ann, db_session))
 
         diff = datetime.utcnow() - start
         ms = diff.seconds * 1000 + diff.microseconds / 1000
-        print(ms, "ms")
+        print(socket_count, "sockets:", ms, "ms")
+
+    def id_filter(self, id_):
+        return {
+            "match_policy": "include_any",
+            "actions": {},
+            "clauses": [{"field": "/id", "operator": "equals", "value": id_}],
+        }
 
     def get_randomized_filter(self):  # pragma: no cover
         return {
@@ -246,6 +327,12 @@ class TestFilterHandler:
             ],
         }
 
+    @pytest.fixture(autouse=True)
+    def index(self):
+        # The index is shared by the whole worker, so give each test a fresh one
+        with mock.patch.object(SocketFilter, "_index", defaultdict(weakref.WeakSet)):
+            yield
+
     @pytest.fixture
     def storage(self, patch):
         return patch("h.streamer.filter.storage")
@@ -260,6 +347,6 @@ class TestFilterHandler:
             socket = FakeSocket()
             SocketFilter.set_filter(socket, filter_)
 
-            return bool(tuple(SocketFilter.matching([socket], annotation, db_session)))
+            return socket in tuple(SocketFilter.matching(annotation, db_session))
 
         return filter_matches
@@ -64,11 +64,10 @@ class TestProcessMessages:
 
 
 class TestHandleMessage:
-    def test_calls_handler_with_list_of_sockets(self, websocket, registry):
+    def test_calls_handler(self, registry):
         handler = Mock(return_value=None)
         session = sentinel.db_session
         message = messages.Message(topic="foo", payload={"foo": "bar"})
-        websocket.instances = [sentinel.socket_1, sentinel.socket_2]
 
         messages.handle_message(
             message, registry, session, topic_handlers={"foo": handler}
@@ -76,7 +75,6 @@ class TestHandleMessage:
 
         handler.assert_called_once_with(
             message.payload,
-            websocket.instances,
             Any.object.of_type(Request).with_attrs({"registry": registry}),
             session,
         )
@@ -97,10 +95,6 @@ class TestHandleMessage:
     def registry(self, pyramid_request):
         return pyramid_request.registry
 
-    @pytest.fixture
-    def websocket(self, patch):
-        return patch("h.streamer.websocket.WebSocket")
-
 
 @pytest.mark.usefixtures("annotation_json_service", "nipsa_service")
 class TestHandleAnnotationEvent:
@@ -130,8 +124,14 @@ class TestHandleAnnotationEvent:
         )
 
     @pytest.mark.parametrize("action", ["create", "update", "delete"])
-    def test_notification_format(
-        self, handle_annotation_event, action, message, socket, annotation_json_service
+    def test_notification_format(  # pylint:disable=too-many-arguments
+        self,
+        handle_annotation_event,
+        action,
+        message,
+        socket,
+        annotation_json_service,
+        encode_json,
     ):
         message["action"] = action
 
@@ -142,13 +142,14 @@ class TestHandleAnnotationEvent:
         else:
             expected_payload = annotation_json_service.present.return_value
 
-        socket.send_json.assert_called_once_with(
+        encode_json.assert_called_once_with(
             {
                 "payload": [expected_payload],
                 "type": "annotation-notification",
                 "options": {"action": action},
             }
         )
+        socket.send_encoded.assert_called_once_with(encode_json.return_value)
 
     def test_it_filters_the_sockets(
         self,
@@ -161,7 +162,7 @@ class TestHandleAnnotationEvent:
         handle_annotation_event(sockets=[socket], session=db_session)
 
         SocketFilter.matching.assert_called_once_with(
-            [socket], fetch_annotation.return_value, db_session
+            fetch_annotation.return_value, db_session, expanded_uris=None
         )
 
     def test_no_send_for_sender_socket(self, handle_annotation_event, socket, message):
@@ -169,16 +170,12 @@ class TestHandleAnnotationEvent:
 
         handle_annotation_event(message=message, sockets=[socket])
 
-        socket.send_json.assert_not_called()
+        socket.send_encoded.assert_not_called()
 
-    def test_no_send_if_filter_does_not_match(
-        self, handle_annotation_event, socket, SocketFilter
-    ):
-        SocketFilter.matching.side_effect = None
-        SocketFilter.matching.return_value = iter(())
-        handle_annotation_event(sockets=[socket])
+    def test_no_send_if_filter_does_not_match(self, handle_annotation_event, socket):
+        handle_annotation_event(sockets=[])
 
-        socket.send_json.assert_not_called()
+        socket.send_encoded.assert_not_called()
 
     @pytest.mark.parametrize("user_is_nipsaed", (True, False))
     def test_nipsaed_content_visibility(
@@ -197,7 +194,7 @@ class TestHandleAnnotationEvent:
         )
         handle_annotation_event(sockets=[socket])
 
-        assert bool(socket.send_json.call_count) == user_is_nipsaed
+        assert bool(socket.send_encoded.call_count) == user_is_nipsaed
 
     @pytest.mark.parametrize("can_see", (True, False))
     def test_visibility_is_based_on_identity(
@@ -220,17 +217,94 @@ class TestHandleAnnotationEvent:
             Permission.Annotation.READ_REALTIME_UPDATES,
         )
 
-        assert bool(socket.send_json.call_count) == can_see
+        assert bool(socket.send_encoded.call_count) == can_see
+
+    def test_bulk_delete_sends_one_notification_per_socket(
+        self,
+        handle_annotation_event,
+        factories,
+        fetch_ordered_annotations,
+        message,
+        session,
+        socket,
+        encode_json,
+    ):
+        annotations = factories.Annotation.create_batch(2)
+        fetch_ordered_annotations.return_value = annotations
+        message = {
+            "action": "bulk-delete",
+            "annotation_ids": [annotation.id for annotation in annotations],
+            "src_client_id": message["src_client_id"],
+        }
+
+        handle_annotation_event(message=message, sockets=[socket])
+
+        fetch_ordered_annotations.assert_called_once_with(
+            session, message["annotation_ids"], query_processor=Any.function()
+        )
+        encode_json.assert_called_once_with(
+            {
+                "payload": [{"id": annotation.id} for annotation in annotations],
+                "type": "annotation-notification",
+                "options": {"action": "delete"},
+            }
+        )
+        socket.send_encoded.assert_called_once_with(encode_json.return_value)
+
+    def test_bulk_delete_only_lists_annotations_the_socket_can_see(
+        self,
+        handle_annotation_event,
+        factories,
+        fetch_ordered_annotations,
+        identity_permits,
+        message,
+        socket,
+        encode_json,
+    ):
+        annotations = factories.Annotation.create_batch(2)
+        fetch_ordered_annotations.return_value = annotations
+        identity_permits.side_effect = (False, True)
+
+        handle_annotation_event(
+            message={
+                "action": "bulk-delete",
+                "annotation_ids": [annotation.id for annotation in annotations],
+                "src_client_id": message["src_client_id"],
+            },
+            sockets=[socket],
+        )
+
+        assert encode_json.call_args[0][0]["payload"] == [{"id": annotations[1].id}]
+
+    def test_bulk_delete_sends_nothing_if_no_sockets_match(
+        self, handle_annotation_event, factories, fetch_ordered_annotations, socket
+    ):
+        fetch_ordered_annotations.return_value = factories.Annotation.create_batch(2)
+
+        handle_annotation_event(
+            message={
+                "action": "bulk-delete",
+                "annotation_ids": ["id_1", "id_2"],
+                "src_client_id": "source_socket",
+            },
+            sockets=[],
+        )
+
+        socket.send_encoded.assert_not_called()
 
     @pytest.fixture
-    def handle_annotation_event(self, message, socket, pyramid_request, session):
+    def handle_annotation_event(
+        self, message, socket, pyramid_request, session, SocketFilter
+    ):
         def handle_annotation_event(
             message=message, sockets=None, request=pyramid_request, session=session
         ):
             if sockets is None:
                 sockets = [socket]
 
-            return messages.handle_annotation_event(message, sockets, request, session)
+            SocketFilter.matching.side_effect = lambda *_args, **_kwargs: iter(sockets)
+
+            return messages.handle_annotation_event(message, request, session)
 
         return handle_annotation_event
 
@@ -267,6 +341,10 @@ class TestHandleAnnotationEvent:
         fetch.return_value = factories.Annotation()
         return fetch
 
+    @pytest.fixture
+    def fetch_ordered_annotations(self, patch):
+        return patch("h.streamer.messages.storage.fetch_ordered_annotations")
+
     @pytest.fixture(autouse=True)
     def identity_permits(self, patch):
         identity_permits = patch("h.streamer.messages.identity_permits")
@@ -275,38 +353,199 @@ class TestHandleAnnotationEvent:
 
     @pytest.fixture(autouse=True)
     def SocketFilter(self, patch):
-        SocketFilter = patch("h.streamer.messages.SocketFilter")
-        SocketFilter.matching.side_effect = (
-            lambda sockets, annotation, db_session: iter(sockets)
+        return patch("h.streamer.messages.SocketFilter")
+
+    @pytest.fixture(autouse=True)
+    def encode_json(self, patch):
+        return patch("h.streamer.websocket.encode_json")
+
+
+class TestHandleAnnotationEvents:
+    def test_it(  # pylint:disable=too-many-arguments
+        self,
+        registry,
+        db_session,
+        annotations,
+        storage,
+        _notify_annotation_event,
+        request_context,
+    ):
+        batch = [
+            messages.Message(topic="annotation", payload=self.payload(annotation.id))
+            for annotation in annotations
+        ]
+        # An annotation which has been removed since the message was sent
+        batch.append(messages.Message(topic="annotation", payload=self.payload("gone")))
+
+        messages.handle_annotation_events(batch, registry, db_session)
+
+        storage.fetch_ordered_annotations.assert_called_once_with(
+            db_session,
+            [annotation.id for annotation in annotations] + ["gone"],
+            query_processor=Any.function(),
+        )
+        storage.expand_uris.assert_called_once_with(
+            db_session,
+            {annotation.target_uri for annotation in annotations},
+            normalized=True,
         )
-        return SocketFilter
+        request_context.assert_called_once_with(registry)
+        request = request_context.return_value.__enter__.return_value
+        assert _notify_annotation_event.call_args_list == [
+            mock.call(
+                batch[0].payload,
+                annotations[0],
+                request,
+                db_session,
+                expanded_uris=sentinel.expanded_uris_0,
+            ),
+            mock.call(
+                batch[1].payload,
+                annotations[1],
+                request,
+                db_session,
+                expanded_uris=sentinel.expanded_uris_1,
+            ),
+            mock.call(batch[2].payload, None, request, db_session, expanded_uris=None),
+        ]
+
+    def test_it_with_bulk_deletes(  # pylint:disable=too-many-arguments
+        self,
+        registry,
+        db_session,
+        annotations,
+        storage,
+        _notify_annotation_event,
+        _notify_annotations_deleted,
+        request_context,
+    ):
+        bulk_delete = {
+            "action": "bulk-delete",
+            "annotation_ids": [annotation.id for annotation in annotations] + ["gone"],
+            "src_client_id": "source_socket",
+        }
+        batch = [
+            messages.Message(topic="annotation", payload=bulk_delete),
+            messages.Message(
+                topic="annotation", payload=self.payload(annotations[0].id)
+            ),
+        ]
 
+        messages.handle_annotation_events(batch, registry, db_session)
 
-class TestHandleUserEvent:
-    def test_sends_session_change_when_joining_or_leaving_group(self, socket, message):
-        message["userid"] = socket.identity.user.userid
+        storage.fetch_ordered_annotations.assert_called_once_with(
+            db_session,
+            bulk_delete["annotation_ids"] + [annotations[0].id],
+            query_processor=Any.function(),
+        )
+        request = request_context.return_value.__enter__.return_value
+        _notify_annotations_deleted.assert_called_once_with(
+            bulk_delete,
+            annotations,
+            request,
+            db_session,
+            expanded_uris=storage.expand_uris.return_value,
+        )
+        _notify_annotation_event.assert_called_once_with(
+            batch[1].payload,
+            annotations[0],
+            request,
+            db_session,
+            expanded_uris=sentinel.expanded_uris_0,
+        )
+
+    def test_it_eager_loads_annotation_relations(
+        self, registry, db_session, annotations, storage
+    ):
+        storage.fetch_ordered_annotations.return_value = []
+        batch = [
+            messages.Message(topic="annotation", payload=self.payload(annotation.id))
+            for annotation in annotations
+        ]
+
+        messages.handle_annotation_events(batch, registry, db_session)
+
+        query_processor = storage.fetch_ordered_annotations.call_args[1][
+            "query_processor"
+        ]
+        query = Mock(spec_set=["options"])
+        assert query_processor(query) == query.options.return_value
+
+    def payload(self, annotation_id):
+        return {
+            "annotation_id": annotation_id,
+            "action": "create",
+            "src_client_id": "source_socket",
+        }
+
+    @pytest.fixture
+    def annotations(self, factories):
+        return [
+            factories.Annotation(target_uri="http://example.com/0"),
+            factories.Annotation(target_uri="http://example.com/1"),
+        ]
 
-        messages.handle_user_event(message, [socket, socket], None, None)
+    @pytest.fixture
+    def registry(self, pyramid_request):
+        return pyramid_request.registry
 
-        reply = {
-            "type": "session-change",
-            "action": "group-join",
-            "model": message["session_model"],
+    @pytest.fixture(autouse=True)
+    def storage(self, patch, annotations):
+        storage = patch("h.streamer.messages.storage")
+        storage.fetch_ordered_annotations.return_value = annotations
+        storage.expand_uris.return_value = {
+            annotation.target_uri: getattr(sentinel, f"expanded_uris_{i}")
+            for i, annotation in enumerate(annotations)
         }
+        return storage
+
+    @pytest.fixture(autouse=True)
+    def _notify_annotation_event(self, patch):
+        return patch("h.streamer.messages._notify_annotation_event")
+
+    @pytest.fixture(autouse=True)
+    def _notify_annotations_deleted(self, patch):
+        return patch("h.streamer.messages._notify_annotations_deleted")
+
+    @pytest.fixture(autouse=True)
+    def request_context(self, patch):
+        return patch("h.streamer.messages.request_context")
 
-        assert socket.send_json.call_args_list == [
-            mock.call(reply),
-            mock.call(reply),
+
+class TestHandleUserEvent:
+    def test_sends_session_change_when_joining_or_leaving_group(
+        self, socket, message, websocket
+    ):
+        message["userid"] = socket.identity.user.userid
+        websocket.WebSocket.instances = [socket, socket]
+
+        messages.handle_user_event(message, None, None)
+
+        websocket.encode_json.assert_called_once_with(
+            {
+                "type": "session-change",
+                "action": "group-join",
+                "model": message["session_model"],
+            }
+        )
+        assert socket.send_encoded.call_args_list == [
+            mock.call(websocket.encode_json.return_value),
+            mock.call(websocket.encode_json.return_value),
         ]
 
-    def test_no_send_when_socket_is_not_event_users(self, socket, message):
+    def test_no_send_when_socket_is_not_event_users(self, socket, message, websocket):
         """Don't send session-change events if the event user is not the socket user."""
         message["userid"] = "amy"
         socket.identity.user.username = "bob"
+        websocket.WebSocket.instances = [socket]
 
-        messages.handle_user_event(message, [socket], None, None)
+        messages.handle_user_event(message, None, None)
 
-        socket.send_json.assert_not_called()
+        socket.send_encoded.assert_not_called()
+
+    @pytest.fixture
+    def websocket(self, patch):
+        return patch("h.streamer.messages.websocket")
 
     @pytest.fixture
     def message(self):
@@ -1,6 +1,8 @@
+from itertools import islice
 from unittest import mock
 
 import pytest
+from gevent.queue import Queue
 
 from h.streamer import messages, streamer, websocket
 from h.streamer.streamer import TOPIC_HANDLERS, UnknownMessageType
@@ -47,6 +49,45 @@ class TestProcessWorkQueue:
         assert context_manager.__enter__.call_count == len(messages)
         assert context_manager.__exit__.call_count == len(messages)
 
+    def test_it_processes_batches_of_annotation_messages(
+        self, process_work_queue, registry, session, _batch_messages, db
+    ):
+        registry.settings["h.streamer.batch_size"] = 10
+        registry.settings["h.streamer.batch_timeout_ms"] = 50
+        batch = [
+            messages.Message(topic=streamer.ANNOTATION_TOPIC, payload="foo"),
+            messages.Message(topic=streamer.ANNOTATION_TOPIC, payload="bar"),
+        ]
+        _batch_messages.return_value = [batch]
+
+        process_work_queue(queue=mock.sentinel.queue)
+
+        _batch_messages.assert_called_once_with(mock.sentinel.queue, 10, 0.05)
+        messages.handle_annotation_events.assert_called_once_with(  # pylint:disable=no-member
+            batch, registry, session
+        )
+        db.read_only_transaction.return_value.__enter__.assert_called_once_with()
+
+    def test_it_handles_single_messages_from_batches(
+        self, process_work_queue, registry, session, _batch_messages, message
+    ):
+        registry.settings["h.streamer.batch_size"] = 10
+        _batch_messages.return_value = [[message]]
+
+        process_work_queue(queue=mock.sentinel.queue)
+
+        messages.handle_message.assert_called_once_with(  # pylint:disable=no-member
+            message, registry, session, topic_handlers=TOPIC_HANDLERS
+        )
+
+    @pytest.fixture
+    def _batch_messages(self, patch):
+        return patch("h.streamer.streamer._batch_messages")
+
+    @pytest.fixture(autouse=True)
+    def handle_annotation_events(self, patch):
+        return patch("h.streamer.messages.handle_annotation_events")
+
     @pytest.fixture
     def process_work_queue(self, registry, message):
         def process_work_queue(queue=None):
@@ -83,3 +124,42 @@ class TestProcessWorkQueue:
     @pytest.fixture(autouse=True)
     def messages_handle_message(self, patch):
         return patch("h.streamer.messages.handle_message")
+
+
+class TestBatchMessages:
+    def test_it_groups_consecutive_annotation_messages(self, queue):
+        annotation_messages = [self.annotation_message(i) for i in range(5)]
+        user_message = messages.Message(topic=streamer.USER_TOPIC, payload="user")
+        ws_message = websocket.Message(socket=mock.sentinel.socket, payload="ws")
+        for msg in [
+            *annotation_messages[:3],
+            user_message,
+            ws_message,
+            *annotation_messages[3:],
+        ]:
+            queue.put(msg)
+
+        batches = list(islice(streamer._batch_messages(queue, 2, 0), 5))
+
+        assert batches == [
+            annotation_messages[0:2],
+            annotation_messages[2:3],
+            [user_message],
+            [ws_message],
+            annotation_messages[3:5],
+        ]
+
+    def test_it_yields_a_partial_batch_after_the_timeout(self, queue):
+        annotation_message = self.annotation_message(1)
+        queue.put(annotation_message)
+
+        batch = next(streamer._batch_messages(queue, 10, 0.01))
+
+        assert batch == [annotation_message]
+
+    def annotation_message(self, payload):
+        return messages.Message(topic=streamer.ANNOTATION_TOPIC, payload=payload)
+
+    @pytest.fixture
+    def queue(self):
+        return Queue()
@@ -5,6 +5,7 @@ import pytest
 from gevent.queue import Queue
 from h_matchers import Any
 from jsonschema import ValidationError
+from ws4py.messaging import TextMessage
 
 from h.security import Identity
 from h.streamer import websocket
@@ -56,6 +57,13 @@ class TestMessage:
         assert not socket.send_json.called
 
 
+class TestEncodeJSON:
+    def test_it(self):
+        frame = websocket.encode_json({"foo": "bar"})
+
+        assert frame == TextMessage('{"foo": "bar"}').single()
+
+
 class TestWebSocket:
     def test_stores_instance_list(self, fake_environ):
         clients = [
@@ -79,6 +87,11 @@ class TestWebSocket:
         # A second closure (however unusual) should not raise
         client1.closed(1000)
 
+    def test_removes_self_from_filter_index_when_closed(self, client, SocketFilter):
+        client.closed(1000)
+
+        SocketFilter.remove.assert_called_once_with(client)
+
     def test_enqueues_incoming_messages(self, client, queue):
         """Valid messages are pushed onto the queue."""
         message = FakeMessage('{"foo":"bar"}')
@@ -129,21 +142,37 @@ class TestWebSocket:
     def test_socket_sets_auth_data_from_environ(self, client, fake_environ):
         assert client.identity == fake_environ["h.ws.identity"]
 
-    def test_socket_send_json(self, client, fake_socket_send):
+    def test_socket_send_json(self, client, fake_socket_write):
         payload = {"foo": "bar"}
 
         client.send_json(payload)
 
-        fake_socket_send.assert_called_once_with(client, '{"foo": "bar"}')
+        fake_socket_write.assert_called_once_with(
+            client, websocket.encode_json(payload)
+        )
 
     def test_socket_send_json_skips_when_terminated(
-        self, client, fake_socket_send, fake_socket_terminated
+        self, client, fake_socket_write, fake_socket_terminated
     ):
         fake_socket_terminated.return_value = True
 
         client.send_json({"foo": "bar"})
 
-        assert not fake_socket_send.called
+        assert not fake_socket_write.called
+
+    def test_socket_send_encoded(self, client, fake_socket_write):
+        client.send_encoded(b"frame")
+
+        fake_socket_write.assert_called_once_with(client, b"frame")
+
+    def test_socket_send_encoded_skips_when_terminated(
+        self, client, fake_socket_write, fake_socket_terminated
+    ):
+        fake_socket_terminated.return_value = True
+
+        client.send_encoded(b"frame")
+
+        assert not fake_socket_write.called
 
     @pytest.fixture(autouse=True)
     def with_no_socket_instances(self):
@@ -168,13 +197,17 @@ class TestWebSocket:
             "h.ws.streamer_work_queue": queue,
         }
 
+    @pytest.fixture
+    def SocketFilter(self, patch):
+        return patch("h.streamer.websocket.SocketFilter")
+
     @pytest.fixture
     def fake_socket_close(self, patch):
         return patch("h.streamer.websocket.WebSocket.close")
 
     @pytest.fixture
-    def fake_socket_send(self, patch):
-        return patch("h.streamer.websocket.WebSocket.send")
+    def fake_socket_write(self, patch):
+        return patch("h.streamer.websocket.WebSocket._write")
 
     @pytest.fixture
     def fake_socket_terminated(self, patch):
@@ -1,11 +1,12 @@
 from unittest import mock
 
 import pytest
+from h_matchers import Any
 from kombu.exceptions import OperationalError
 from transaction import TransactionManager
 
 from h import subscribers
-from h.events import AnnotationEvent
+from h.events import AnnotationEvent, AnnotationsDeletedEvent
 from h.exceptions import RealtimeMessageQueueError
 
 
@@ -99,6 +100,49 @@ class TestPublishAnnotationEvent:
         return event
 
 
+class TestPublishAnnotationsDeletedEvent:
+    def test_it_publishes_the_realtime_event(self, event):
+        event.request.headers = {"X-Client-Id": "client_id"}
+
+        subscribers.publish_annotations_deleted_event(event)
+
+        event.request.realtime.publish_annotation.assert_called_once_with(
+            {
+                "action": "bulk-delete",
+                "annotation_ids": event.annotation_ids,
+                "src_client_id": "client_id",
+            }
+        )
+
+    def test_it_publishes_the_ids_in_chunks(self, event, monkeypatch):
+        monkeypatch.setattr(subscribers, "BULK_DELETE_CHUNK_SIZE", 2)
+        event.annotation_ids = ["id_1", "id_2", "id_3"]
+
+        subscribers.publish_annotations_deleted_event(event)
+
+        assert event.request.realtime.publish_annotation.call_args_list == [
+            mock.call(Any.dict.containing({"annotation_ids": ["id_1", "id_2"]})),
+            mock.call(Any.dict.containing({"annotation_ids": ["id_3"]})),
+        ]
+
+    def test_it_exits_cleanly_when_RealtimeMessageQueueError_is_raised(
+        self, event, monkeypatch
+    ):
+        monkeypatch.setattr(subscribers, "BULK_DELETE_CHUNK_SIZE", 1)
+        event.request.realtime.publish_annotation.side_effect = (
+            RealtimeMessageQueueError
+        )
+
+        subscribers.publish_annotations_deleted_event(event)
+
+        event.request.realtime.publish_annotation.assert_called_once()
+
+    @pytest.fixture
+    def event(self, pyramid_request):
+        pyramid_request.realtime = mock.Mock()
+        return AnnotationsDeletedEvent(pyramid_request, ["id_1", "id_2"])
+
+
 class TestSendReplyNotifications:
     def test_it_sends_emails(
         self,
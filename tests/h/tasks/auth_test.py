@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from h.tasks.auth import extend_auth_tickets
+
+NEW_EXPIRES = datetime.utcnow() + timedelta(days=7)
+
+
+@pytest.mark.usefixtures("celery")
+class TestExtendAuthTickets:
+    def test_it_extends_the_tickets(self, factories, db_session):
+        tickets = factories.AuthTicket.create_batch(
+            2, expires=datetime.utcnow() + timedelta(days=1)
+        )
+        other_ticket = factories.AuthTicket(
+            expires=datetime.utcnow() + timedelta(days=1)
+        )
+
+        extend_auth_tickets([ticket.id for ticket in tickets], NEW_EXPIRES)
+
+        db_session.refresh(other_ticket)
+        for ticket in tickets:
+            db_session.refresh(ticket)
+            assert ticket.expires == NEW_EXPIRES
+        assert other_ticket.expires < NEW_EXPIRES
+
+    def test_it_leaves_expired_tickets(self, factories, db_session):
+        ticket = factories.AuthTicket(expires=datetime.utcnow() - timedelta(days=1))
+
+        extend_auth_tickets([ticket.id], NEW_EXPIRES)
+
+        db_session.refresh(ticket)
+        assert ticket.expires < datetime.utcnow()
+
+    def test_it_doesnt_shorten_tickets(self, factories, db_session):
+        expires = NEW_EXPIRES + timedelta(days=1)
+        ticket = factories.AuthTicket(expires=expires)
+
+        extend_auth_tickets([ticket.id], NEW_EXPIRES)
+
+        db_session.refresh(ticket)
+        assert ticket.expires == expires
+
+
+@pytest.fixture
+def celery(patch, db_session):
+    cel = patch("h.tasks.auth.celery", autospec=False)
+    cel.request.db = db_session
+    return cel
@@ -1,8 +1,13 @@
 from datetime import datetime, timedelta
+from unittest import mock
 
 import pytest
+from h_matchers import Any
 
-from h.models import Annotation, AuthTicket, AuthzCode, Token
+from h import cache
+from h.models import AuthTicket, AuthzCode, Token
+from h.services.annotation_purge import AnnotationPurgeService
+from h.services.auth_token import TOKEN_CACHE, token_cache_key
 from h.tasks.cleanup import (
     purge_deleted_annotations,
     purge_expired_auth_tickets,
@@ -14,37 +19,59 @@ from h.tasks.cleanup import (
 
 @pytest.mark.usefixtures("celery")
 class TestPurgeDeletedAnnotations:
-    @pytest.mark.parametrize(
-        "deleted,mins_ago,purged",
-        [
-            # Deleted more than 10 minutes ago... should be purged.
-            (True, 30, True),
-            (True, 3600, True),
-            # Deleted less than 10 minutes ago... should NOT be purged.
-            (True, -30, False),  # annotation from the future! wooOOOooo!
-            (True, 0, False),
-            (True, 1, False),
-            (True, 9, False),
-            # Not deleted... should NOT be purged.
-            (False, -30, False),
-            (False, 0, False),
-            (False, 1, False),
-            (False, 9, False),
-            (False, 30, False),
-            (False, 3600, False),
-        ],
-    )
-    def test_purge(self, db_session, factories, deleted, mins_ago, purged):
-        updated = datetime.utcnow() - timedelta(minutes=mins_ago)
-        annotation = factories.Annotation(deleted=deleted, updated=updated)
-        db_session.add(annotation)
+    def test_it_purges_annotations_deleted_more_than_10_minutes_ago(
+        self, celery, annotation_purge_service
+    ):
+        before = datetime.utcnow()
+
+        purge_deleted_annotations(max_batches=5)
+
+        celery.request.find_service.assert_called_once_with(name="annotation_purge")
+        annotation_purge_service.purge.assert_called_once_with(
+            Any.instance_of(datetime), max_batches=5
+        )
+        cutoff = annotation_purge_service.purge.call_args[0][0]
+        assert (
+            before - timedelta(minutes=10)
+            <= cutoff
+            <= datetime.utcnow() - timedelta(minutes=10)
+        )
+
+    def test_it_records_the_metrics_of_each_batch(
+        self, annotation_purge_service, newrelic
+    ):
+        annotation_purge_service.purge.return_value = [
+            {"Purged": 1000, "Duration/Total": 0.5},
+            {"Purged": 10, "Duration/Total": 0.1},
+        ]
 
         purge_deleted_annotations()
 
-        if purged:
-            assert not db_session.query(Annotation).count()
-        else:
-            assert db_session.query(Annotation).count() == 1
+        assert newrelic.agent.record_custom_metrics.call_args_list == [
+            mock.call(
+                [
+                    ("Custom/PurgeDeletedAnnotations/Purged", 1000),
+                    ("Custom/PurgeDeletedAnnotations/Duration/Total", 0.5),
+                ]
+            ),
+            mock.call(
+                [
+                    ("Custom/PurgeDeletedAnnotations/Purged", 10),
+                    ("Custom/PurgeDeletedAnnotations/Duration/Total", 0.1),
+                ]
+            ),
+        ]
+
+    @pytest.fixture
+    def annotation_purge_service(self, celery):
+        svc = mock.create_autospec(AnnotationPurgeService, instance=True, spec_set=True)
+        svc.purge.return_value = []
+        celery.request.find_service.return_value = svc
+        return svc
+
+    @pytest.fixture(autouse=True)
+    def newrelic(self, patch):
+        return patch("h.tasks.cleanup.newrelic")
 
 
 @pytest.mark.usefixtures("celery")
@@ -143,6 +170,21 @@ class TestPurgeExpiredTokens:
         purge_expired_tokens()
         assert db_session.query(Token).count() == 2
 
+    def test_it_invalidates_the_cached_tokens_it_removes(self, db_session, factories):
+        expired = factories.DeveloperToken(
+            expires=datetime(2014, 5, 6, 7, 8, 9),
+            refresh_token_expires=datetime(2014, 5, 13, 7, 8, 9),
+        )
+        valid = factories.DeveloperToken(expires=None)
+        for token in (expired, valid):
+            TOKEN_CACHE.set(token_cache_key(token.value), mock.sentinel.token)
+
+        purge_expired_tokens()
+        cache._after_commit(db_session)  # pylint:disable=protected-access
+
+        assert TOKEN_CACHE.get(token_cache_key(expired.value)) is TOKEN_CACHE.MISSING
+        assert TOKEN_CACHE.get(token_cache_key(valid.value)) == mock.sentinel.token
+
 
 @pytest.mark.usefixtures("celery")
 class TestPurgeRemovedFeatures:
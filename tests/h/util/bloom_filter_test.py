@@ -0,0 +1,64 @@
+import pytest
+
+from h.util.bloom_filter import BloomFilter
+
+
+class TestBloomFilter:
+    def test_it_contains_added_items(self, bloom_filter):
+        bloom_filter.add("httpx://example.com")
+        bloom_filter.update(["httpx://example.com/1", "httpx://example.com/2"])
+
+        assert "httpx://example.com" in bloom_filter
+        assert "httpx://example.com/1" in bloom_filter
+        assert "httpx://example.com/2" in bloom_filter
+
+    def test_it_does_not_contain_other_items(self, bloom_filter):
+        bloom_filter.add("httpx://example.com")
+
+        assert "httpx://example.org" not in bloom_filter
+
+    def test_for_capacity_meets_the_error_rate(self):
+        bloom_filter = BloomFilter.for_capacity(1000, 0.01)
+        bloom_filter.update(f"httpx://example.com/{i}" for i in range(1000))
+
+        false_positives = sum(
+            f"httpx://example.org/{i}" in bloom_filter for i in range(10000)
+        )
+
+        assert false_positives < 200
+
+    def test_save_and_load(self, bloom_filter, tmp_path):
+        path = str(tmp_path / "filter.bloom")
+        bloom_filter.add("httpx://example.com")
+        bloom_filter.watermark = 42
+        bloom_filter.save(path)
+
+        loaded = BloomFilter.load(path)
+
+        assert loaded.num_bits == bloom_filter.num_bits
+        assert loaded.num_hashes == bloom_filter.num_hashes
+        assert loaded.watermark == 42
+        assert "httpx://example.com" in loaded
+        assert "httpx://example.org" not in loaded
+
+    def test_adding_to_a_loaded_filter_does_not_change_the_file(
+        self, bloom_filter, tmp_path
+    ):
+        path = str(tmp_path / "filter.bloom")
+        bloom_filter.save(path)
+
+        BloomFilter.load(path).add("httpx://example.com")
+
+        assert "httpx://example.com" not in BloomFilter.load(path)
+
+    @pytest.mark.parametrize("contents", (b"x", b"not a bloom filter at all!" * 2))
+    def test_load_raises_for_other_files(self, tmp_path, contents):
+        path = tmp_path / "filter.bloom"
+        path.write_bytes(contents)
+
+        with pytest.raises(ValueError):
+            BloomFilter.load(str(path))
+
+    @pytest.fixture
+    def bloom_filter(self):
+        return BloomFilter.for_capacity(100, 0.001)
@@ -3,7 +3,7 @@ import string
 import pytest
 import sqlalchemy as sa
 
-from h.util.query import column_windows
+from h.util.query import column_boundaries, column_windows
 
 ASCII_LOWERCASE = string.ascii_lowercase
 
@@ -67,6 +67,33 @@ class TestColumnWindows:
         assert window_query_results(db_session, windows, filter_) == expected
 
 
+@pytest.mark.usefixtures("cw_table")
+class TestColumnBoundaries:
+    @pytest.mark.parametrize(
+        "windowsize,expected",
+        [(100, ["a"]), (10, ["a", "k", "u"]), (1, list(ASCII_LOWERCASE))],
+    )
+    def test_it(self, db_session, windowsize, expected):
+        testdata = [{"name": char, "enabled": True} for char in ASCII_LOWERCASE]
+        db_session.execute(test_cw.insert().values(testdata))
+
+        boundaries = column_boundaries(
+            db_session, test_cw.c.name, windowsize=windowsize
+        )
+
+        assert boundaries == expected
+
+    def test_it_respects_the_where_clause(self, db_session):
+        testdata = [{"name": char, "enabled": char > "m"} for char in ASCII_LOWERCASE]
+        db_session.execute(test_cw.insert().values(testdata))
+
+        boundaries = column_boundaries(
+            db_session, test_cw.c.name, windowsize=5, where=test_cw.c.enabled
+        )
+
+        assert boundaries == ["n", "s", "x"]
+
+
 def window_query_results(session, windows, filter_=None):
     """
     Fetch results using the passed windows and optional filter.
@@ -0,0 +1,122 @@
+import random
+import timeit
+
+import pytest
+
+from h.util import uri
+
+HOSTS = [
+    "example.com",
+    "www.nytimes.com",
+    "en.wikipedia.org",
+    "arxiv.org",
+    "WWW.Example.ORG",
+    "docs.google.com",
+    "user:pass@example.net:8080",
+    "[::1]:443",
+]
+
+PATHS = [
+    "",
+    "/",
+    "/2023/05/04/science/some-long-article-title.html",
+    "/wiki/Uniform_Resource_Identifier",
+    "/pdf/2101.00001v2.pdf",
+    "/document/d/1aBcDeFgHiJkLmNoPqRsTuVwXyZ/edit",
+    "/foo%2Fbar/baz%20qux/",
+    "/caf%C3%A9/%7Euser/",
+]
+
+QUERIES = [
+    "",
+    "?a=1&b=2",
+    "?b=2&a=1",
+    "?utm_source=twitter&utm_medium=social&id=42",
+    "?gclid=abc123&q=search+terms",
+    "?X-Amz-Security-Token=secret&page=2",
+    "?q=%7Efoo+bar&lang=en",
+    "?a&b=",
+]
+
+FRAGMENTS = ["", "#section-2", "#"]
+
+NON_HTTP = [
+    "urn:x-pdf:c83fa94bd1d522276a32f81682a43d29",
+    "doi:10.1000/12345",
+    "file:///home/user/Documents/paper.pdf",
+    "ftp://example.org/pub/file.txt",
+]
+
+
+@pytest.mark.skip("Only of use during development")
+class TestNormalizeSpeed:  # pragma: no cover
+    def test_variants_give_the_same_output_as_the_uncached_function(self, corpus):
+        expected = [uri.normalize.__wrapped__(url) for url in corpus]
+
+        uri.normalize.cache_clear()
+        assert [uri.normalize(url) for url in corpus] == expected
+        # And again, now every URL is cached
+        assert [uri.normalize(url) for url in corpus] == expected
+
+        uri.normalize.cache_clear()
+        assert uri.normalize_many(corpus) == expected
+
+    @pytest.mark.parametrize(
+        "variant", ("uncached", "cold cache", "warm cache", "normalize_many")
+    )
+    def test_speed(self, corpus, variant):
+        def uncached():
+            for url in corpus:
+                uri.normalize.__wrapped__(url)
+
+        def cold_cache():
+            uri.normalize.cache_clear()
+            for url in corpus:
+                uri.normalize(url)
+
+        def warm_cache():
+            for url in corpus:
+                uri.normalize(url)
+
+        def normalize_many():
+            uri.normalize.cache_clear()
+            uri.normalize_many(corpus)
+
+        func = {
+            "uncached": uncached,
+            "cold cache": cold_cache,
+            "warm cache": warm_cache,
+            "normalize_many": normalize_many,
+        }[variant]
+
+        warm_cache()
+        best = min(timeit.repeat(func, number=1, repeat=5))
+
+        print(
+            f"{variant} x {len(corpus)} ({len(set(corpus))} distinct): "
+            f"{best * 1000} ms, {best / len(corpus) * 1e6} us/URL"
+        )
+
+    @pytest.fixture(scope="class")
+    def corpus(self):
+        # The URLs are drawn with a skewed distribution so that some appear
+        # many times, as the URLs of popular pages do in real traffic
+        rng = random.Random(0)
+        size = 20000
+
+        distinct = list(NON_HTTP)
+        for _ in range(size // 10):
+            url = (
+                rng.choice(["http", "https", "HTTPS"])
+                + "://"
+                + rng.choice(HOSTS)
+                + rng.choice(PATHS)
+                + rng.choice(QUERIES)
+                + rng.choice(FRAGMENTS)
+            )
+            if rng.random() < 0.05:
+                url = uri.VIA_PREFIX + url
+            distinct.append(url)
+
+        weights = [1 / rank for rank in range(1, len(distinct) + 1)]
+        return rng.choices(distinct, weights=weights, k=size)
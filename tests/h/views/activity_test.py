@@ -33,7 +33,10 @@ class TestSearchController:
         controller.search()
 
         query.execute.assert_called_once_with(
-            pyramid_request, query.extract.return_value, page_size=activity.PAGE_SIZE
+            pyramid_request,
+            query.extract.return_value,
+            page_size=activity.PAGE_SIZE,
+            extra_searches=[],
         )
 
     def test_search_allows_to_specify_the_page_size(
@@ -44,7 +47,10 @@ class TestSearchController:
         controller.search()
 
         query.execute.assert_called_once_with(
-            pyramid_request, query.extract.return_value, page_size=100
+            pyramid_request,
+            query.extract.return_value,
+            page_size=100,
+            extra_searches=[],
         )
 
     def test_search_uses_default_page_size_when_value_is_a_string(
@@ -55,7 +61,10 @@ class TestSearchController:
         controller.search()
 
         query.execute.assert_called_once_with(
-            pyramid_request, query.extract.return_value, page_size=activity.PAGE_SIZE
+            pyramid_request,
+            query.extract.return_value,
+            page_size=activity.PAGE_SIZE,
+            extra_searches=[],
         )
 
     def test_search_uses_passed_in_page_size_for_pagination(
@@ -588,14 +597,42 @@ class TestGroupSearchController:
         controller,
         test_group,
         test_user,
-        annotation_stats_service,
+        search,
     ):
-        result = controller.search()["stats"]
-        annotation_stats_service.group_annotation_count.assert_called_with(
-            test_group.pubid
+        search.return_value["search_results"] = ActivityResults(
+            total=200,
+            aggregations={},
+            timeframes=[],
+            extra_results=(mock.Mock(total=5),),
         )
+
+        result = controller.search()["stats"]
+
         assert result["annotation_count"] == 5
 
+    @pytest.mark.usefixtures("query")
+    def test_extra_searches_includes_the_group_annotation_count(
+        self, controller, group, annotation_stats_service
+    ):
+        extra_searches = controller._extra_searches()  # pylint:disable=protected-access
+
+        annotation_stats_service.group_annotation_count_search.assert_called_once_with(
+            group.pubid
+        )
+        assert extra_searches == [
+            annotation_stats_service.group_annotation_count_search.return_value
+        ]
+
+    def test_extra_searches_is_empty_when_searching_only_the_group(
+        self, controller, group, annotation_stats_service
+    ):
+        controller.parsed_query_params = MultiDict({"group": group.pubid})
+
+        extra_searches = controller._extra_searches()  # pylint:disable=protected-access
+
+        annotation_stats_service.group_annotation_count_search.assert_not_called()
+        assert not extra_searches
+
     @pytest.mark.parametrize(
         "test_group,test_user",
         [("group", "member")],
@@ -616,6 +653,7 @@ class TestGroupSearchController:
         controller.parsed_query_params = MultiDict({"group": test_group})
         result = controller.search()["stats"]
         annotation_stats_service.group_annotation_count.assert_not_called()
+        annotation_stats_service.group_annotation_count_search.assert_not_called()
         assert result["annotation_count"] == 200
 
     @pytest.mark.parametrize(
@@ -928,12 +966,42 @@ class TestUserSearchController:
         assert username == user.display_name
 
     def test_search_passes_the_user_annotation_counts_to_the_template(
-        self, controller, annotation_stats_service, user
+        self, controller, search
     ):
+        search.return_value["search_results"] = ActivityResults(
+            total=200,
+            aggregations={},
+            timeframes=[],
+            extra_results=(mock.Mock(total=6),),
+        )
+
         result = controller.search()["stats"]
-        annotation_stats_service.user_annotation_count.assert_called_with(user.userid)
+
         assert result["annotation_count"] == 6
 
+    @pytest.mark.usefixtures("query")
+    def test_extra_searches_includes_the_user_annotation_count(
+        self, controller, annotation_stats_service, user
+    ):
+        extra_searches = controller._extra_searches()  # pylint:disable=protected-access
+
+        annotation_stats_service.user_annotation_count_search.assert_called_once_with(
+            user.userid
+        )
+        assert extra_searches == [
+            annotation_stats_service.user_annotation_count_search.return_value
+        ]
+
+    def test_extra_searches_is_empty_when_searching_only_the_user(
+        self, controller, annotation_stats_service, user
+    ):
+        controller.parsed_query_params = MultiDict({"user": user.username})
+
+        extra_searches = controller._extra_searches()  # pylint:disable=protected-access
+
+        annotation_stats_service.user_annotation_count_search.assert_not_called()
+        assert not extra_searches
+
     @pytest.mark.usefixtures("query")
     def test_search_reuses_user_annotation_count_if_able(
         self, controller, annotation_stats_service, user
@@ -945,6 +1013,7 @@ class TestUserSearchController:
         controller.parsed_query_params = MultiDict({"user": user})
         result = controller.search()["stats"]
         annotation_stats_service.user_annotation_count.assert_not_called()
+        annotation_stats_service.user_annotation_count_search.assert_not_called()
         assert result["annotation_count"] == 200
 
     def test_search_passes_the_other_user_details_to_the_template(
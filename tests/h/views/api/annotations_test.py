@@ -46,6 +46,17 @@ class TestSearch:
 
         assert views.search(pyramid_request) == expected
 
+    def test_it_returns_the_cursor(
+        self, pyramid_request, search_run, annotation_json_service
+    ):
+        search_run.return_value = SearchResult(
+            2, ["row-1", "row-2"], [], {}, cursor="next-page"
+        )
+
+        result = views.search(pyramid_request)
+
+        assert result["cursor"] == "next-page"
+
     def test_it_presents_replies(
         self, pyramid_request, search_run, annotation_json_service
     ):
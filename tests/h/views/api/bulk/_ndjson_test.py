@@ -1,4 +1,5 @@
 import json
+from unittest.mock import Mock
 
 import pytest
 from pyramid.response import Response
@@ -20,6 +21,43 @@ class TestGetNDJSONResponse:
         lines = [json.loads(line) for line in lines if line]
         assert lines == return_values
 
+    def test_it_streams_the_results(self):
+        consumed = []
+
+        def results():
+            for id_ in range(3):
+                consumed.append(id_)
+                yield {"id": id_}
+
+        result = get_ndjson_response(results())
+
+        # Only the first result is read before the response is sent
+        assert consumed == [0]
+        assert result.content_length is None
+        assert list(result.app_iter) == [
+            f'{{"id": {id_}}}\n'.encode("utf-8") for id_ in range(3)
+        ]
+
+    def test_it_closes_the_results_when_the_response_is_closed(self):
+        results = Mock(spec_set=["__iter__", "__next__", "close"])
+        results.__iter__ = Mock(return_value=results)
+        results.__next__ = Mock(return_value={"id": 1})
+
+        result = get_ndjson_response(results)
+        next(result.app_iter)
+        result.app_iter.close()
+
+        results.close.assert_called_once_with()
+
+    def test_it_closes_the_results_if_there_are_none(self):
+        results = Mock(spec_set=["__iter__", "__next__", "close"])
+        results.__iter__ = Mock(return_value=results)
+        results.__next__ = Mock(side_effect=StopIteration)
+
+        get_ndjson_response(results)
+
+        results.close.assert_called_once_with()
+
     def test_it_with_zero_items(self):
         result = get_ndjson_response([])
 
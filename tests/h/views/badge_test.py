@@ -85,9 +85,14 @@ class TestBadge:
         assert cache_control.public
         assert cache_control.max_age > 0
 
-    def test_it_returns_0_if_uri_never_annotated(self, badge_request, search_run):
+    def test_it_returns_0_if_uri_never_annotated(
+        self, badge_request, search_run, annotated_uri_service
+    ):
         result = badge_request("http://example.com", annotated=False, blocked=False)
 
+        annotated_uri_service.has_ever_been_annotated.assert_called_once_with(
+            "http://example.com"
+        )
         search_run.assert_not_called()
         assert result == {"total": 0}
 
@@ -104,12 +109,9 @@ class TestBadge:
             badge(mock.Mock(params={}))
 
     @pytest.fixture
-    def badge_request(self, pyramid_request, factories, Blocklist):
+    def badge_request(self, pyramid_request, annotated_uri_service, Blocklist):
         def caller(uri, annotated=True, blocked=False):
-            if annotated:
-                factories.DocumentURI(uri=uri)
-                pyramid_request.db.flush()
-
+            annotated_uri_service.has_ever_been_annotated.return_value = annotated
             Blocklist.is_blocked.return_value = blocked
 
             pyramid_request.params["uri"] = uri